@@ -0,0 +1,322 @@
+import math
+import random
+import time
+from bisect import bisect_left
+
+from GreedyScheduler import GreedyScheduler
+
+
+class AnnealingSolver:
+    """
+    Simulated annealing over the duties of a RoutingProblem instance.
+
+    The state is one time-ordered trip sequence per bus plus a pool of unassigned trips. A duty is
+    feasible when its trips do not overlap in time, the bus has the seats for every trip, every trip lies
+    inside the planning horizon and the total energy fits in the bus's remaining range. Moves only
+    produce feasible duties:
+    - relocate: move a trip (or an unassigned trip) into another bus's duty,
+    - swap: exchange two trips between two buses,
+    - 2-opt*: exchange the tails of two duties after a common cut time,
+    - chain exchange: exchange the trips two duties serve within a common time window.
+
+    The cost of a duty is the fixed plus energy cost of its bus type; each unassigned trip costs
+    UNASSIGNED_PENALTY. The search starts from the greedy schedule and stops on a time budget.
+    """
+    UNASSIGNED_PENALTY = 1e4  # Cost of leaving a trip unserved
+    MOVES = ("relocate", "swap", "two_opt_star", "chain_exchange")
+
+    def __init__(self, problem, time_budget=5.0, seed=None, initial_temp=50.0, final_temp=0.01,
+                 max_window=4):
+        """
+        Initialize an AnnealingSolver object.
+
+        Parameters:
+        - problem: RoutingProblem (or any object with electric_buses, diesel_buses, trips, depot,
+          `_compatibility` and the cost constants of RoutingProblem).
+        - time_budget: Wall-clock budget of `solve` in seconds.
+        - seed: Seed of the random move generator.
+        - initial_temp, final_temp: Temperature at the start and at the end of the budget; it decreases
+          geometrically with elapsed time.
+        - max_window: Longest time window, in hours, used by chain exchange.
+        """
+        self.problem = problem
+        self.time_budget = time_budget
+        self.rng = random.Random(seed)
+        self.initial_temp = initial_temp
+        self.final_temp = final_temp
+        self.max_window = max_window
+
+        self.bus_type = {}
+        for bus in problem.electric_buses:
+            self.bus_type[bus.bus_id] = "electric"
+        for bus in problem.diesel_buses:
+            self.bus_type[bus.bus_id] = "diesel"
+        self.buses = {bus.bus_id: bus for bus in problem.electric_buses + problem.diesel_buses}
+        self.bus_ids = list(self.buses)
+        self.trips = {trip.trip_id: trip for trip in problem.trips}
+        self.trip_ids = list(self.trips)
+        self.compatible, self.bus_rows = problem._compatibility()  # [bus, trip] pairs passing _can_serve
+        self.trip_columns = {trip_id: column for column, trip_id in enumerate(self.trip_ids)}
+
+        self.duties = {bus_id: [] for bus_id in self.bus_ids}
+        self.starts = {bus_id: [] for bus_id in self.bus_ids}  # Start times of each duty, for bisection
+        self.energy = {bus_id: 0.0 for bus_id in self.bus_ids}
+        self.location = {}  # trip_id -> bus_id
+        self.unassigned = {}  # Trip IDs as dict keys: an ordered set, so a seed replays the same run
+        self.cost = 0.0
+        self.stats = {}
+
+    # State
+
+    def _duty_cost(self, bus_id, energy, empty):
+        """
+        Cost of a bus duty with the given energy use.
+        """
+        if empty:
+            return 0.0
+        if self.bus_type[bus_id] == "electric":
+            return self.problem.FIXED_COST_ELECTRIC + self.problem.UNIT_COST_ELECTRIC * energy
+        return self.problem.FIXED_COST_DIESEL + self.problem.UNIT_COST_DIESEL * energy
+
+    def _trip_fits_bus(self, bus, trip):
+        """
+        Check seats, horizon and single-trip range of a trip on a bus.
+        """
+        return bool(self.compatible[self.bus_rows[bus.bus_id], self.trip_columns[trip.trip_id]])
+
+    def _evaluate(self, bus_id, trips):
+        """
+        Check a candidate duty.
+
+        Returns:
+        - The energy of the duty, or None if it is infeasible.
+        """
+        bus = self.buses[bus_id]
+        energy = 0.0
+        previous = None
+        for trip in trips:
+            if previous is not None and previous.end_time > trip.start_time:
+                return None
+            if not self._trip_fits_bus(bus, trip):
+                return None
+            energy += trip.distance * bus.consumption_rate
+            previous = trip
+        if energy > bus.remaining_range:
+            return None
+        return energy
+
+    def _set_duty(self, bus_id, trips, energy):
+        """
+        Replace the duty of a bus and update the cost.
+        """
+        self.cost += (self._duty_cost(bus_id, energy, not trips) -
+                      self._duty_cost(bus_id, self.energy[bus_id], not self.duties[bus_id]))
+        self.duties[bus_id] = trips
+        self.starts[bus_id] = [trip.start_time for trip in trips]
+        self.energy[bus_id] = energy
+        for trip in trips:
+            self.location[trip.trip_id] = bus_id
+
+    def _initialize(self):
+        """
+        Start from the greedy schedule, without recharging so every duty fits in the range.
+        """
+        scheduler = GreedyScheduler(self.problem.electric_buses, self.problem.diesel_buses, self.problem.trips,
+                                    self.problem.depot, replenish=False)
+        assignment = scheduler.schedule()
+        self.cost = 0.0
+        self.unassigned = dict.fromkeys(self.trip_ids)
+        for bus_type in ("electric", "diesel"):
+            for bus_id, trip_ids in assignment[bus_type].items():
+                trips = sorted((self.trips[trip_id] for trip_id in trip_ids), key=lambda trip: trip.start_time)
+                energy = self._evaluate(bus_id, trips)
+                if energy is None:
+                    continue  # e.g. a trip outside the horizon; leave the whole duty to the search
+                self._set_duty(bus_id, trips, energy)
+                for trip in trips:
+                    self.unassigned.pop(trip.trip_id, None)
+        self.cost += self.UNASSIGNED_PENALTY * len(self.unassigned)
+
+    # Moves; each returns (delta, changes) or None, where changes is a list of (bus_id, trips, energy)
+
+    def _changes_delta(self, changes):
+        """
+        Cost delta of replacing the given duties.
+        """
+        return sum(self._duty_cost(bus_id, energy, not trips) -
+                   self._duty_cost(bus_id, self.energy[bus_id], not self.duties[bus_id])
+                   for bus_id, trips, energy in changes)
+
+    def _relocate(self):
+        """
+        Move a trip from its duty, or from the unassigned pool, into another bus's duty.
+        """
+        if self.unassigned and self.rng.random() < 0.5:
+            trip = self.trips[self.rng.choice(tuple(self.unassigned))]
+        else:
+            trip = self.trips[self.rng.choice(self.trip_ids)]
+        source = None if trip.trip_id in self.unassigned else self.location[trip.trip_id]
+        target = self.rng.choice(self.bus_ids)
+        if target == source:
+            return None
+        bus = self.buses[target]
+        if not self._trip_fits_bus(bus, trip):
+            return None
+
+        duty = self.duties[target]
+        position = bisect_left(self.starts[target], trip.start_time)
+        if position > 0 and duty[position - 1].end_time > trip.start_time:
+            return None
+        if position < len(duty) and duty[position].start_time < trip.end_time:
+            return None
+        energy = self.energy[target] + trip.distance * bus.consumption_rate
+        if energy > bus.remaining_range:
+            return None
+
+        changes = [(target, duty[:position] + [trip] + duty[position:], energy)]
+        delta = 0.0
+        if source is None:
+            delta -= self.UNASSIGNED_PENALTY
+        else:
+            source_trips = [other for other in self.duties[source] if other.trip_id != trip.trip_id]
+            source_bus = self.buses[source]
+            changes.append((source, source_trips,
+                            self.energy[source] - trip.distance * source_bus.consumption_rate))
+        return delta + self._changes_delta(changes), changes
+
+    def _swap(self):
+        """
+        Exchange two trips served by different buses.
+        """
+        first = self.trips[self.rng.choice(self.trip_ids)]
+        second = self.trips[self.rng.choice(self.trip_ids)]
+        if first.trip_id in self.unassigned or second.trip_id in self.unassigned:
+            return None
+        bus_a, bus_b = self.location[first.trip_id], self.location[second.trip_id]
+        if bus_a == bus_b:
+            return None
+        trips_a = sorted([trip for trip in self.duties[bus_a] if trip is not first] + [second],
+                         key=lambda trip: trip.start_time)
+        trips_b = sorted([trip for trip in self.duties[bus_b] if trip is not second] + [first],
+                         key=lambda trip: trip.start_time)
+        return self._two_duty_move(bus_a, trips_a, bus_b, trips_b)
+
+    def _two_opt_star(self):
+        """
+        Exchange the tails of two duties after a common cut time.
+        """
+        if len(self.bus_ids) < 2:
+            return None
+        bus_a, bus_b = self.rng.sample(self.bus_ids, 2)
+        duty_a, duty_b = self.duties[bus_a], self.duties[bus_b]
+        if not duty_a and not duty_b:
+            return None
+        cut = self.rng.choice(duty_a or duty_b).start_time
+        split_a = bisect_left(self.starts[bus_a], cut)
+        split_b = bisect_left(self.starts[bus_b], cut)
+        return self._two_duty_move(bus_a, duty_a[:split_a] + duty_b[split_b:],
+                                   bus_b, duty_b[:split_b] + duty_a[split_a:])
+
+    def _chain_exchange(self):
+        """
+        Exchange the trips two duties start within a common time window.
+        """
+        if len(self.bus_ids) < 2:
+            return None
+        bus_a, bus_b = self.rng.sample(self.bus_ids, 2)
+        duty_a, duty_b = self.duties[bus_a], self.duties[bus_b]
+        if not duty_a and not duty_b:
+            return None
+        window_start = self.rng.choice(duty_a or duty_b).start_time
+        window_end = window_start + self.rng.randint(1, self.max_window)
+        start_a = bisect_left(self.starts[bus_a], window_start)
+        end_a = bisect_left(self.starts[bus_a], window_end)
+        start_b = bisect_left(self.starts[bus_b], window_start)
+        end_b = bisect_left(self.starts[bus_b], window_end)
+        return self._two_duty_move(bus_a, duty_a[:start_a] + duty_b[start_b:end_b] + duty_a[end_a:],
+                                   bus_b, duty_b[:start_b] + duty_a[start_a:end_a] + duty_b[end_b:])
+
+    def _two_duty_move(self, bus_a, trips_a, bus_b, trips_b):
+        """
+        Check two rebuilt duties and return the move, or None if either is infeasible.
+        """
+        energy_a = self._evaluate(bus_a, trips_a)
+        if energy_a is None:
+            return None
+        energy_b = self._evaluate(bus_b, trips_b)
+        if energy_b is None:
+            return None
+        changes = [(bus_a, trips_a, energy_a), (bus_b, trips_b, energy_b)]
+        return self._changes_delta(changes), changes
+
+    def _apply(self, changes):
+        """
+        Apply the duty changes of an accepted move.
+        """
+        for bus_id, trips, energy in changes:
+            for trip in trips:
+                self.unassigned.pop(trip.trip_id, None)
+        for bus_id, trips, energy in changes:
+            self._set_duty(bus_id, trips, energy)
+
+    # Driver
+
+    def solve(self):
+        """
+        Run the annealing search until the time budget is spent.
+
+        Returns:
+        - Assignment dictionary {"electric": {bus_id: [trip_ids]}, "diesel": {bus_id: [trip_ids]}}, with the
+          trips of each bus in service order.
+        """
+        start = time.perf_counter()
+        self._initialize()
+        moves = [getattr(self, "_" + name) for name in self.MOVES]
+        best_cost, best = self.cost, self._snapshot()
+        best_pending = False  # The current state is the best one and has not been copied yet
+        self.stats = {name: {"tried": 0, "feasible": 0, "accepted": 0} for name in self.MOVES}
+        ratio = self.final_temp / self.initial_temp
+        temperature = self.initial_temp
+        iterations = 0
+
+        while True:
+            if iterations % 256 == 0:
+                elapsed = time.perf_counter() - start
+                if elapsed >= self.time_budget:
+                    break
+                temperature = self.initial_temp * ratio ** (elapsed / self.time_budget)
+            iterations += 1
+
+            index = self.rng.randrange(len(moves))
+            record = self.stats[self.MOVES[index]]
+            record["tried"] += 1
+            move = moves[index]()
+            if move is None:
+                continue
+            record["feasible"] += 1
+            delta, changes = move
+            if delta <= 0 or self.rng.random() < math.exp(-delta / temperature):
+                record["accepted"] += 1
+                if delta > 0 and best_pending:
+                    best, best_pending = self._snapshot(), False
+                self._apply(changes)
+                if self.cost < best_cost - 1e-9:
+                    best_cost, best_pending = self.cost, True
+
+        if best_pending:
+            best = self._snapshot()
+        self.stats["iterations"] = iterations
+        self.stats["best_cost"] = best_cost
+        self.best_cost = best_cost
+        self.assignment = best
+        return best
+
+    def _snapshot(self):
+        """
+        Current state as an assignment dictionary.
+        """
+        assignment = {"electric": {}, "diesel": {}}
+        for bus_id, trips in self.duties.items():
+            if trips:
+                assignment[self.bus_type[bus_id]][bus_id] = [trip.trip_id for trip in trips]
+        return assignment
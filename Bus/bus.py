@@ -3,6 +3,8 @@ class Bus:
     Base class for all types of buses (Electric and Diesel).
     Contains common attributes and methods.
     """
+    __slots__ = ("bus_id", "capacity", "consumption_rate", "max_range", "remaining_range")
+
     def __init__(self, bus_id, capacity, consumption_rate, max_range):
         """
         Parameters:
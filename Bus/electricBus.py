@@ -1,8 +1,10 @@
-from .Bus import Bus
+from .bus import Bus
 class ElectricBus(Bus):
     """
     Represents an electric bus, subclass of Bus.
     """
+    __slots__ = ("charging_rate", "battery_capacity")
+
     def __init__(self, bus_id, capacity, consumption_rate, battery_capacity, charging_rate):
         """
         Initialize an ElectricBus object.
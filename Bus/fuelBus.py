@@ -1,8 +1,10 @@
-from .Bus import Bus
+from .bus import Bus
 class FuelBus(Bus):
     """
     Represents a diesel bus, subclass of Bus.
     """
+    __slots__ = ("fuel_capacity",)
+
     def __init__(self, bus_id, capacity, consumption_rate, fuel_capacity):
         """
         Initialize a DieselBus object.
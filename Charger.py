@@ -2,6 +2,8 @@ class Charger:
     """
     Represents a charging station for electric buses.
     """
+    __slots__ = ("charger_id", "charging_rate", "schedule")
+
     def __init__(self, charger_id, charging_rate):
         """
         Initialize a Charger object.
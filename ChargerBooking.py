@@ -0,0 +1,255 @@
+import math
+
+
+class ChargerBooking:
+    """
+    Booking engine for the depot chargers, indexed by time slot instead of by charger.
+
+    For every booked slot a bitset (a Python int, bit i for the i-th charger) records which chargers are
+    busy, and for every session length in use a second bitset over the slots records the start slots at
+    which no charger is free for that many consecutive slots. Finding the earliest start at or after a
+    slot is then a shift and a lowest-zero-bit lookup, and picking the charger a lowest-set-bit lookup,
+    instead of a scan over the chargers; the work per query does not grow with the number of chargers
+    beyond the word-parallel bit operations. Booking or releasing a session only updates the slots around
+    it.
+
+    Sessions span one or more consecutive slots of `slot_length` hours, so sub-hour resolutions work by
+    choosing a shorter slot (use `first_slot_from`, `last_start_before` and `slots_for` to convert times).
+    The bookings are mirrored in each `Charger.schedule` ({time_slot: bus_id}, one entry per slot of a
+    session), which the model constraints read. Bookings made on the chargers directly are picked up by
+    `refresh`, which `book` also runs by itself when the slot it found turns out to be taken.
+    """
+    def __init__(self, chargers, horizon=None, slot_length=1.0):
+        """
+        Initialize a ChargerBooking object.
+
+        Parameters:
+        - chargers: List of Charger objects (the list is kept, not copied). On a tie the earlier charger
+          in the list is booked first, as `Depot.schedule_charging` always did.
+        - horizon: Optional number of slots; sessions must end within it.
+        - slot_length: Length of a slot in hours.
+        """
+        self.chargers = chargers
+        self.horizon = horizon
+        self.slot_length = slot_length
+        self.refresh()
+
+    def refresh(self):
+        """
+        Rebuild the index from the `Charger.schedule` dictionaries. Call it after booking or releasing
+        slots on the chargers directly.
+        """
+        self._num_chargers = len(self.chargers)
+        self._all = (1 << self._num_chargers) - 1
+        self._busy = {}      # slot -> bitset of busy chargers
+        self._blocked = {}   # session length -> bitset of start slots without a free charger
+        self.sessions = {}   # bus_id -> list of (charger_index, start_slot, num_slots)
+        for position, charger in enumerate(self.chargers):
+            session = None
+            for time_slot in sorted(charger.schedule):
+                bus_id = charger.schedule[time_slot]
+                self._busy[time_slot] = self._busy.get(time_slot, 0) | (1 << position)
+                if session is not None and session[0] == bus_id and session[1] + session[2] == time_slot:
+                    session[2] += 1
+                    continue
+                if session is not None:
+                    self.sessions.setdefault(session[0], []).append((position, session[1], session[2]))
+                session = [bus_id, time_slot, 1]
+            if session is not None:
+                self.sessions.setdefault(session[0], []).append((position, session[1], session[2]))
+
+    def first_slot_from(self, time):
+        """
+        First slot starting at or after a time given in hours (unlike `TimeGrid.slot_at`, which returns
+        the slot holding the time).
+        """
+        return max(0, math.ceil(time / self.slot_length - 1e-9))
+
+    def last_start_before(self, time, num_slots=1):
+        """
+        Last start slot of a session of `num_slots` slots that ends at or before a time given in hours.
+        """
+        return math.floor(time / self.slot_length + 1e-9) - num_slots
+
+    def slots_for(self, duration):
+        """
+        Number of slots covering a duration given in hours.
+        """
+        return max(1, math.ceil(duration / self.slot_length - 1e-9))
+
+    def _free_chargers(self, start, num_slots):
+        """
+        Bitset of the chargers free over [start, start + num_slots).
+        """
+        busy = 0
+        for time_slot in range(start, start + num_slots):
+            busy |= self._busy.get(time_slot, 0)
+        return ~busy & self._all
+
+    def _blocked_starts(self, num_slots):
+        """
+        Bitset of the start slots at which no charger is free for `num_slots` slots, built on first use.
+        """
+        blocked = self._blocked.get(num_slots)
+        if blocked is None:
+            blocked = 0
+            for start in {slot - offset for slot in self._busy for offset in range(num_slots)}:
+                if start >= 0 and not self._free_chargers(start, num_slots):
+                    blocked |= 1 << start
+            self._blocked[num_slots] = blocked
+        return blocked
+
+    def _update(self, start, num_slots):
+        """
+        Recompute the blocked start slots affected by a change of the slots [start, start + num_slots).
+        """
+        for length, blocked in self._blocked.items():
+            for slot in range(max(0, start - length + 1), start + num_slots):
+                if self._free_chargers(slot, length):
+                    blocked &= ~(1 << slot)
+                else:
+                    blocked |= 1 << slot
+            self._blocked[length] = blocked
+
+    def _earliest(self, start, num_slots, latest_start):
+        """
+        Position of the charger and start slot of the earliest fitting session, or None.
+        """
+        if len(self.chargers) != self._num_chargers:
+            self.refresh()
+        if not self.chargers:
+            return None
+        start = max(0, start)
+        shifted = self._blocked_starts(num_slots) >> start
+        slot = start + (~shifted & (shifted + 1)).bit_length() - 1  # lowest start slot that is not blocked
+        if latest_start is not None and slot > latest_start:
+            return None
+        if self.horizon is not None and slot + num_slots > self.horizon:
+            return None
+        free = self._free_chargers(slot, num_slots)
+        return (free & -free).bit_length() - 1, slot
+
+    def earliest(self, start, num_slots=1, latest_start=None):
+        """
+        Earliest session of `num_slots` consecutive slots on a single charger starting at or after `start`.
+
+        Parameters:
+        - start: Earliest start slot.
+        - num_slots: Session length in slots.
+        - latest_start: Optional latest acceptable start slot.
+
+        Returns:
+        - Tuple (charger, start_slot), or None if no charger is free in time.
+        """
+        found = self._earliest(start, num_slots, latest_start)
+        return None if found is None else (self.chargers[found[0]], found[1])
+
+    def book(self, bus_id, start, num_slots=1, latest_start=None):
+        """
+        Book the earliest session found by `earliest`.
+
+        Returns:
+        - Tuple (charger, start_slot).
+
+        Raises:
+        - ValueError if no charger is free in time.
+        """
+        found = self._earliest(start, num_slots, latest_start)
+        if found is not None and not all(self.chargers[found[0]].is_available(time_slot)
+                                         for time_slot in range(found[1], found[1] + num_slots)):
+            self.refresh()  # The schedules were changed on the chargers directly
+            found = self._earliest(start, num_slots, latest_start)
+        if found is None:
+            raise ValueError(f"No charger free for {num_slots} slot(s) from time slot {start}")
+        position, slot = found
+        self._occupy(bus_id, position, slot, num_slots)
+        return self.chargers[position], slot
+
+    def _occupy(self, bus_id, position, slot, num_slots):
+        charger = self.chargers[position]
+        for time_slot in range(slot, slot + num_slots):
+            charger.schedule_charging(bus_id, time_slot)
+            self._busy[time_slot] = self._busy.get(time_slot, 0) | (1 << position)
+        self.sessions.setdefault(bus_id, []).append((position, slot, num_slots))
+        self._update(slot, num_slots)
+
+    def _vacate(self, position, slot, num_slots):
+        charger = self.chargers[position]
+        for time_slot in range(slot, slot + num_slots):
+            charger.schedule.pop(time_slot, None)
+            busy = self._busy.get(time_slot, 0) & ~(1 << position)
+            if busy:
+                self._busy[time_slot] = busy
+            else:
+                self._busy.pop(time_slot, None)
+        self._update(slot, num_slots)
+
+    def book_batch(self, requests):
+        """
+        Book many sessions in one call, earliest requested start first (longer sessions first on a tie).
+
+        Parameters:
+        - requests: List of tuples (bus_id, earliest_start, num_slots) or
+          (bus_id, earliest_start, num_slots, latest_start).
+
+        Returns:
+        - List aligned with the requests of tuples (charger, start_slot), or None where no charger was free.
+        """
+        results = [None] * len(requests)
+        order = sorted(range(len(requests)), key=lambda i: (requests[i][1], -requests[i][2]))
+        for i in order:
+            bus_id, start, num_slots = requests[i][:3]
+            latest_start = requests[i][3] if len(requests[i]) > 3 else None
+            try:
+                results[i] = self.book(bus_id, start, num_slots, latest_start)
+            except ValueError:
+                pass
+        return results
+
+    def release(self, bus_id, start=None):
+        """
+        Release the sessions of a bus, or only the one starting at `start`.
+
+        Returns:
+        - Number of sessions released.
+        """
+        kept, released = [], 0
+        for position, slot, num_slots in self.sessions.pop(bus_id, []):
+            if start is not None and slot != start:
+                kept.append((position, slot, num_slots))
+                continue
+            self._vacate(position, slot, num_slots)
+            released += 1
+        if kept:
+            self.sessions[bus_id] = kept
+        return released
+
+    def reschedule(self, bus_id, start, new_start, num_slots=None, latest_start=None):
+        """
+        Move the session of a bus starting at `start` to the earliest free slot at or after `new_start`.
+        The old session is kept if the new one cannot be booked.
+
+        Parameters:
+        - bus_id: ID of the bus.
+        - start: Start slot of the booked session.
+        - new_start: Earliest start slot of the new session.
+        - num_slots: Length of the new session (default: same as the old one).
+        - latest_start: Optional latest acceptable start slot.
+
+        Returns:
+        - Tuple (charger, start_slot) of the new session.
+
+        Raises:
+        - KeyError if the bus has no session starting at `start`.
+        - ValueError if no charger is free in time.
+        """
+        session = next((entry for entry in self.sessions.get(bus_id, []) if entry[1] == start), None)
+        if session is None:
+            raise KeyError(f"Bus {bus_id} has no charging session at time slot {start}")
+        position, _, old_slots = session
+        self.release(bus_id, start)
+        try:
+            return self.book(bus_id, new_start, old_slots if num_slots is None else num_slots, latest_start)
+        except ValueError:
+            self._occupy(bus_id, position, start, old_slots)
+            raise
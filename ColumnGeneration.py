@@ -0,0 +1,625 @@
+import numpy as np
+from pyomo.environ import (ConcreteModel, Var, VarList, Objective, Constraint, SolverFactory, Suffix, Binary,
+                           NonNegativeReals, UnitInterval, Any, minimize)
+from pyomo.opt import TerminationCondition
+from pyomo.solvers.plugins.solvers.persistent_solver import PersistentSolver
+from TripSuccessionIndex import TripSuccessionIndex
+from SolverConfig import SolverConfig
+
+try:
+    import highspy
+except ImportError:  # The master then goes through Pyomo
+    highspy = None
+
+HIGHS_SOLVERS = ("highs", "appsi_highs")  # Solver names served by the incremental HiGHS master
+
+
+class Duty:
+    """
+    A column of the master problem: one bus serving a sequence of trips over the day.
+    """
+    def __init__(self, bus_id, bus_type, trip_ids, energy, cost):
+        """
+        Initialize a Duty object.
+
+        Parameters:
+        - bus_id: ID of the bus operating the duty.
+        - bus_type: "electric" or "diesel".
+        - trip_ids: Trip IDs in the order they are served.
+        - energy: Total charge/fuel used by the duty.
+        - cost: Operating cost of the duty.
+        """
+        self.bus_id = bus_id
+        self.bus_type = bus_type
+        self.trip_ids = tuple(trip_ids)
+        self.energy = energy
+        self.cost = cost
+
+    def key(self):
+        """
+        Identity of the duty, used to avoid adding the same column twice.
+        """
+        return self.bus_id, self.trip_ids
+
+    def __str__(self):
+        """
+        String representation of the Duty object.
+        """
+        return f"Duty {self.bus_id} ({self.bus_type}) - Trips: {list(self.trip_ids)}, Cost: {self.cost:.2f}"
+
+
+class _Label:
+    """
+    Partial path of the resource-constrained shortest path search.
+    """
+    __slots__ = ("reduced_cost", "energy", "trip", "parent")
+
+    def __init__(self, reduced_cost, energy, trip, parent):
+        self.reduced_cost = reduced_cost
+        self.energy = energy
+        self.trip = trip
+        self.parent = parent
+
+    def trip_ids(self):
+        """
+        Trip IDs of the path ending at this label, in service order.
+        """
+        trip_ids = []
+        label = self
+        while label is not None:
+            trip_ids.append(label.trip.trip_id)
+            label = label.parent
+        return trip_ids[::-1]
+
+
+class MasterProblem:
+    """
+    Set partitioning master problem that grows one column at a time.
+
+    The model is built once with the artificial columns only. Adding a duty appends a single variable
+    and puts its coefficients on the rows of the trips it covers and of its bus. With "highs" or
+    "appsi_highs" (and highspy installed) the master is one HiGHS model kept across iterations: the
+    column is added to it directly and the next LP solve starts from the previous basis, so an
+    iteration costs the new columns plus the simplex pivots they cause. With a persistent Pyomo solver
+    (e.g. 'gurobi_persistent', 'cplex_persistent', 'xpress_persistent') the column is pushed into the
+    solver model the same way. Other solvers (glpk, cbc) get the whole master written out on every
+    solve.
+    """
+    def __init__(self, trip_ids, uncovered_penalty, solver_name="glpk"):
+        """
+        Initialize a MasterProblem object.
+
+        Parameters:
+        - trip_ids: IDs of the trips to be covered.
+        - uncovered_penalty: Objective cost of the artificial column of each trip.
+        - solver_name: Pyomo solver name; "highs"/"appsi_highs" and persistent interfaces are updated
+          incrementally.
+        """
+        self.columns = []  # (duty, var) in insertion order; var is a HiGHS column index with highspy
+        self.solver_name = solver_name
+        self.highs = None
+        self.persistent = False
+        if solver_name in HIGHS_SOLVERS and highspy is not None:
+            self._build_highs(list(trip_ids), uncovered_penalty)
+            return
+
+        self.model = ConcreteModel()
+        self.model.lam = VarList(domain=UnitInterval)
+        self.model.uncovered = Var(list(trip_ids), domain=NonNegativeReals)
+        self.model.cover = Constraint(list(trip_ids), rule=lambda m, trip_id: m.uncovered[trip_id] == 1)
+        self.model.one_duty_per_bus = Constraint(Any)
+        self.model.objective = Objective(
+            expr=uncovered_penalty * sum(self.model.uncovered[trip_id] for trip_id in trip_ids),
+            sense=minimize
+        )
+        self.model.dual = Suffix(direction=Suffix.IMPORT)
+
+        self.solver = SolverFactory(solver_name)
+        self.persistent = isinstance(self.solver, PersistentSolver)
+        if self.persistent:
+            self.solver.set_instance(self.model)
+
+    def _build_highs(self, trip_ids, uncovered_penalty):
+        """
+        Build the master as a HiGHS model: one row per trip and one artificial column per trip.
+        """
+        self.highs = highspy.Highs()
+        self.highs.setOptionValue("output_flag", False)
+        self.cover_rows = {trip_id: row for row, trip_id in enumerate(trip_ids)}
+        self.bus_rows = {}
+        self.highs.addRows(len(trip_ids), [1.0] * len(trip_ids), [1.0] * len(trip_ids), 0, [], [], [])
+        for row in range(len(trip_ids)):
+            self.highs.addCol(uncovered_penalty, 0.0, highspy.kHighsInf, 1, [row], [1.0])
+        self.values = []
+
+    def add_column(self, duty):
+        """
+        Append a duty variable and its coefficients to the affected rows.
+
+        Parameters:
+        - duty: Duty object to add.
+        """
+        if self.highs is not None:
+            if duty.bus_id not in self.bus_rows:
+                self.bus_rows[duty.bus_id] = self.highs.getNumRow()
+                self.highs.addRow(-highspy.kHighsInf, 1.0, 0, [], [])
+            rows = [self.cover_rows[trip_id] for trip_id in duty.trip_ids] + [self.bus_rows[duty.bus_id]]
+            self.columns.append((duty, self.highs.getNumCol()))
+            self.highs.addCol(duty.cost, 0.0, 1.0, len(rows), rows, [1.0] * len(rows))
+            return
+
+        var = self.model.lam.add()
+        self.columns.append((duty, var))
+        rows = [self.model.cover[trip_id] for trip_id in duty.trip_ids]
+
+        if self.persistent:
+            self.solver.add_column(self.model, var, duty.cost, rows, [1] * len(rows))
+        else:
+            self.model.objective.expr += duty.cost * var
+            for row in rows:
+                lower, body, upper = row.to_bounded_expression()
+                row.set_value((lower, body + var, upper))
+
+        if duty.bus_id in self.model.one_duty_per_bus:
+            row = self.model.one_duty_per_bus[duty.bus_id]
+            if self.persistent:
+                self.solver.remove_constraint(row)
+            lower, body, upper = row.to_bounded_expression()
+            row.set_value((lower, body + var, upper))
+        else:
+            self.model.one_duty_per_bus[duty.bus_id] = var <= 1
+            row = self.model.one_duty_per_bus[duty.bus_id]
+        if self.persistent:
+            self.solver.add_constraint(row)
+
+    def solve(self):
+        """
+        Solve the master problem and return its objective value.
+        """
+        if self.highs is not None:
+            self.highs.run()
+            status = self.highs.getModelStatus()
+            if status != highspy.HighsModelStatus.kOptimal:
+                raise RuntimeError(f"Master LP not solved: {self.highs.modelStatusToString(status)}")
+            self.values = list(self.highs.getSolution().col_value)
+            return self.highs.getInfo().objective_function_value
+        if self.persistent:
+            results = self.solver.solve(load_solutions=False)
+        else:
+            results = self.solver.solve(self.model, load_solutions=False)
+        condition = results.solver.termination_condition
+        if condition != TerminationCondition.optimal:
+            raise RuntimeError(f"Master LP not solved: {condition}")
+        if self.persistent:
+            self.solver.load_vars()
+            if self.model.dual.import_enabled():
+                self.solver.load_duals()
+        else:
+            self.model.solutions.load_from(results)
+        return self.model.objective.expr()
+
+    def duals(self):
+        """
+        Return the duals of the last LP solve.
+
+        Returns:
+        - Tuple (trip_duals, bus_duals) of dictionaries keyed by trip ID and bus ID.
+        """
+        if self.highs is not None:
+            row_dual = self.highs.getSolution().row_dual
+            return ({trip_id: row_dual[row] for trip_id, row in self.cover_rows.items()},
+                    {bus_id: row_dual[row] for bus_id, row in self.bus_rows.items()})
+        dual = self.model.dual
+        trip_duals = {trip_id: dual.get(self.model.cover[trip_id], 0.0) for trip_id in self.model.cover}
+        bus_duals = {bus_id: dual.get(self.model.one_duty_per_bus[bus_id], 0.0)
+                     for bus_id in self.model.one_duty_per_bus}
+        return trip_duals, bus_duals
+
+    def make_integer(self):
+        """
+        Turn the duty variables into binaries for the final integer solve. Duals are no longer
+        imported, since a MIP has none.
+        """
+        if self.highs is not None:
+            columns = [column for _, column in self.columns]
+            self.highs.changeColsIntegrality(len(columns), columns,
+                                             [highspy.HighsVarType.kInteger] * len(columns))
+            return
+        self.model.dual.direction = Suffix.LOCAL
+        for _, var in self.columns:
+            var.domain = Binary
+            if self.persistent:
+                self.solver.update_var(var)
+
+    def solve_integer(self, config, incumbent=()):
+        """
+        Solve the master as an integer program over the generated columns, within the time limit and
+        MIP gap of `config` and starting from `incumbent` when the solver accepts a MIP start.
+
+        Parameters:
+        - config: SolverConfig of the integer solve (its solver name is not used).
+        - incumbent: Duties of the pool forming a feasible start (disjoint trips, one duty per bus).
+
+        Returns:
+        - Tuple (status, objective): status "optimal", "feasible" (stopped on time or gap with a
+          solution) or "no solution", and the objective value (None without solution).
+        """
+        self.make_integer()
+        chosen = {duty.key() for duty in incumbent}
+        if self.highs is not None:
+            return self._solve_integer_highs(config, chosen)
+
+        for duty, var in self.columns:
+            var.set_value(1 if duty.key() in chosen else 0)
+        covered = {trip_id for duty, _ in self.columns if duty.key() in chosen for trip_id in duty.trip_ids}
+        for trip_id, var in self.model.uncovered.items():
+            var.set_value(0 if trip_id in covered else 1)
+        options = {"options": config.pyomo_options()}
+        if self.persistent:
+            self.solver.options.update(config.pyomo_options())
+            results = self.solver.solve(tee=config.verbose, load_solutions=False)
+        else:
+            if incumbent and self.solver.warm_start_capable():
+                options["warmstart"] = True
+            results = self.solver.solve(self.model, tee=config.verbose, load_solutions=False, **options)
+        condition = results.solver.termination_condition
+        if len(results.solution) == 0 or condition not in (TerminationCondition.optimal,
+                                                           TerminationCondition.feasible,
+                                                           TerminationCondition.maxTimeLimit):
+            return "no solution", None
+        self.model.solutions.load_from(results)
+        status = "optimal" if condition == TerminationCondition.optimal else "feasible"
+        return status, self.model.objective.expr()
+
+    def _solve_integer_highs(self, config, chosen):
+        highs = self.highs
+        highs.setOptionValue("output_flag", bool(config.verbose))
+        if config.time_limit is not None:
+            highs.setOptionValue("time_limit", float(config.time_limit))
+        if config.mip_gap is not None:
+            highs.setOptionValue("mip_rel_gap", float(config.mip_gap))
+        if config.threads is not None:
+            highs.setOptionValue("threads", int(config.threads))
+        if chosen:
+            start = [0.0] * highs.getNumCol()
+            covered = set()
+            for duty, column in self.columns:
+                if duty.key() in chosen:
+                    start[column] = 1.0
+                    covered.update(duty.trip_ids)
+            for trip_id, row in self.cover_rows.items():
+                start[row] = 0.0 if trip_id in covered else 1.0  # Artificial column i covers row i
+            solution = highspy.HighsSolution()
+            solution.col_value = start
+            highs.setSolution(solution)
+        highs.run()
+        if highs.getInfo().primal_solution_status != 2:  # No feasible solution
+            return "no solution", None
+        self.values = list(highs.getSolution().col_value)
+        optimal = highs.getModelStatus() == highspy.HighsModelStatus.kOptimal
+        return ("optimal" if optimal else "feasible"), highs.getInfo().objective_function_value
+
+    def selected_duties(self):
+        """
+        Return the duties selected in the last solution.
+        """
+        if self.highs is not None:
+            return [duty for duty, column in self.columns if column < len(self.values) and self.values[column] > 0.5]
+        return [duty for duty, var in self.columns if var.value is not None and var.value > 0.5]
+
+
+class ColumnGenerationSolver:
+    """
+    Column generation over bus duties for a RoutingProblem.
+
+    The master problem is a set partitioning model: every trip is covered by exactly one selected duty
+    and every bus operates at most one duty. Its LP relaxation is solved over a restricted pool of
+    duties, and the duals drive a pricing subproblem per bus type: a resource-constrained shortest
+    path over the trip-succession DAG, with the battery/fuel range as the resource. Columns with a
+    negative reduced cost are added until none is left, then the master is solved as an integer
+    program over the generated pool.
+    """
+    UNCOVERED_PENALTY = 1e4  # Cost of the artificial column covering a trip no duty covers
+
+    INTEGER_TIME_LIMIT = 60  # Default time limit in seconds of the final integer master
+    INTEGER_MIP_GAP = 0.01  # Default relative MIP gap of the final integer master
+
+    def __init__(self, problem, solver_name=None, max_labels_per_trip=10, max_successors=None,
+                 columns_per_group=5, reduced_cost_tolerance=1e-6, gap_tolerance=1e-3, integer_config=None):
+        """
+        Initialize a ColumnGenerationSolver object.
+
+        Parameters:
+        - problem: RoutingProblem providing the fleet, trips and cost parameters.
+        - solver_name: Pyomo solver used for the master LP and the final integer solve; defaults to
+          "highs" (incremental master, see MasterProblem) when highspy is installed, "glpk" otherwise.
+        - max_labels_per_trip: Cap on non-dominated labels kept per trip during pricing. When the cap
+          drops labels, convergence is confirmed by a pricing pass without the cap.
+        - max_successors: Optional cap K on the successors explored from each trip during pricing; the
+          lower bound then only holds over the duties using those arcs.
+        - columns_per_group: Maximum number of new duties priced per group of identical buses.
+        - reduced_cost_tolerance: A column enters only if its reduced cost is below -tolerance.
+        - gap_tolerance: Stop once the relative gap between the LP objective and the Lagrangian lower
+          bound drops below this value.
+        - integer_config: SolverConfig of the final integer master (time limit, MIP gap, threads,
+          verbosity); defaults to INTEGER_TIME_LIMIT seconds and a gap of INTEGER_MIP_GAP.
+        """
+        if solver_name is None:
+            solver_name = "highs" if highspy is not None else "glpk"
+        self.problem = problem
+        self.solver_name = solver_name
+        self.integer_config = integer_config or SolverConfig(solver_name, time_limit=self.INTEGER_TIME_LIMIT,
+                                                             mip_gap=self.INTEGER_MIP_GAP)
+        self.integer_status = None
+        self.lower_bound = None  # Lagrangian bound of the last round, None if its pricing was truncated
+        self.truncated = False   # The last pricing pass dropped non-dominated labels
+        self.max_labels_per_trip = max_labels_per_trip
+        self.columns_per_group = columns_per_group
+        self.reduced_cost_tolerance = reduced_cost_tolerance
+        self.gap_tolerance = gap_tolerance
+        self.succession_index = TripSuccessionIndex(problem.trips, max_successors=max_successors)
+        self.trip_order = {trip.trip_id: i for i, trip in enumerate(self.succession_index.sorted_trips)}
+        self.compatible, self.bus_rows = problem._compatibility()  # [bus, trip] pairs passing _can_serve
+        self.trip_columns = {trip.trip_id: column for column, trip in enumerate(problem.trips)}
+        self.duties = []
+        self._duty_keys = set()
+        self.master = MasterProblem([trip.trip_id for trip in problem.trips], self.UNCOVERED_PENALTY,
+                                    solver_name=solver_name)
+
+    # Master problem
+
+    def _bus_costs(self, bus_type):
+        """
+        Return the (fixed, unit) operating costs of a bus type.
+        """
+        if bus_type == "electric":
+            return self.problem.FIXED_COST_ELECTRIC, self.problem.UNIT_COST_ELECTRIC
+        return self.problem.FIXED_COST_DIESEL, self.problem.UNIT_COST_DIESEL
+
+    def _buses(self):
+        """
+        Iterate over all buses with their type.
+        """
+        for bus in self.problem.electric_buses:
+            yield "electric", bus
+        for bus in self.problem.diesel_buses:
+            yield "diesel", bus
+
+    def add_duty(self, duty):
+        """
+        Add a duty to the column pool and to the master problem unless it is already there.
+
+        Returns:
+        - True if the duty was added, False otherwise.
+        """
+        if duty.key() in self._duty_keys:
+            return False
+        self._duty_keys.add(duty.key())
+        self.duties.append(duty)
+        self.master.add_column(duty)
+        return True
+
+    def _initial_duties(self):
+        """
+        Build a first-fit initial column pool: trips are taken in time order and appended to the first
+        bus that is free, compatible and still has range for them. Trips no bus can take are left to
+        the artificial columns of the master.
+
+        Returns:
+        - List of Duty objects, at most one per bus.
+        """
+        chains = {}
+        for trip in self.succession_index.sorted_trips:
+            for bus_type, bus in self._buses():
+                chain = chains.get(bus.bus_id)
+                energy = trip.distance * bus.consumption_rate
+                if not self.compatible[self.bus_rows[bus.bus_id], self.trip_columns[trip.trip_id]]:
+                    continue
+                if chain is None:
+                    chains[bus.bus_id] = (bus_type, bus, [trip], energy)
+                    break
+                _, _, chain_trips, chain_energy = chain
+                if chain_trips[-1].end_time <= trip.start_time and chain_energy + energy <= bus.remaining_range:
+                    chains[bus.bus_id] = (bus_type, bus, chain_trips + [trip], chain_energy + energy)
+                    break
+
+        duties = []
+        for bus_type, bus, chain_trips, energy in chains.values():
+            fixed_cost, unit_cost = self._bus_costs(bus_type)
+            duties.append(Duty(bus.bus_id, bus_type, [trip.trip_id for trip in chain_trips], energy,
+                               fixed_cost + unit_cost * energy))
+        return duties
+
+    # Pricing subproblem
+
+    def _bus_groups(self):
+        """
+        Group buses with identical type, capacity, consumption rate and remaining range; they share
+        the same pricing subproblem up to their own convexity dual.
+        """
+        groups = {}
+        for bus_type, bus in self._buses():
+            key = (bus_type, bus.capacity, bus.consumption_rate, bus.remaining_range)
+            groups.setdefault(key, []).append(bus)
+        return groups
+
+    def _price_group(self, bus_type, sample_bus, trip_duals, label_limit):
+        """
+        Solve the resource-constrained shortest path for one bus group.
+
+        Trips are processed in time order. A label at a trip is a duty ending with that trip; it is
+        extended along the succession arcs while the accumulated energy stays within the bus range.
+        Labels dominated in both reduced cost and energy are discarded, and at most `label_limit`
+        labels (None: no limit) are kept per trip.
+
+        Returns:
+        - List of the best labels (lowest reduced cost, excluding the bus dual), best first.
+        """
+        fixed_cost, unit_cost = self._bus_costs(bus_type)
+        rate = sample_bus.consumption_rate
+        budget = sample_bus.remaining_range
+        labels = {}
+        completed = []
+
+        servable = {self.problem.trips[column].trip_id
+                    for column in np.flatnonzero(self.compatible[self.bus_rows[sample_bus.bus_id]])}
+
+        for trip in self.succession_index.sorted_trips:
+            if trip.trip_id not in servable:
+                continue
+            energy = trip.distance * rate
+            # Start a new duty at this trip
+            start = _Label(fixed_cost + unit_cost * energy - trip_duals[trip.trip_id], energy, trip, None)
+            bucket = self._insert_label(labels.setdefault(trip.trip_id, []), start, label_limit)
+
+            position = self.trip_order[trip.trip_id]
+            for label in bucket:
+                completed.append(label)
+                for next_trip in self.succession_index.successors(trip.trip_id):
+                    if next_trip.trip_id not in servable or self.trip_order[next_trip.trip_id] <= position:
+                        continue
+                    next_energy = label.energy + next_trip.distance * rate
+                    if next_energy > budget:
+                        continue
+                    extended = _Label(
+                        label.reduced_cost + unit_cost * next_trip.distance * rate - trip_duals[next_trip.trip_id],
+                        next_energy, next_trip, label
+                    )
+                    self._insert_label(labels.setdefault(next_trip.trip_id, []), extended, label_limit)
+
+        completed.sort(key=lambda label: label.reduced_cost)
+        return completed
+
+    def _insert_label(self, bucket, label, label_limit):
+        """
+        Insert a label into the bucket of its trip, keeping only non-dominated labels, at most
+        `label_limit` of them (None: no limit). Dropping a non-dominated label sets `self.truncated`.
+
+        Returns:
+        - The updated bucket.
+        """
+        for other in bucket:
+            if other.reduced_cost <= label.reduced_cost and other.energy <= label.energy:
+                return bucket
+        bucket[:] = [other for other in bucket
+                     if not (label.reduced_cost <= other.reduced_cost and label.energy <= other.energy)]
+        bucket.append(label)
+        if label_limit is not None and len(bucket) > label_limit:
+            bucket.sort(key=lambda other: other.reduced_cost)
+            del bucket[label_limit:]
+            self.truncated = True
+        return bucket
+
+    def _price(self, trip_duals, bus_duals, exact=False):
+        """
+        Find duties with a negative reduced cost for every bus group.
+
+        Parameters:
+        - exact: Keep every non-dominated label instead of `max_labels_per_trip` per trip.
+
+        Returns:
+        - Tuple (new_duties, lagrangian_gain): the new Duty objects, and the sum over buses of the best
+          negative reduced cost found. Added to the LP objective it gives a lower bound, unless labels
+          were dropped (`self.truncated`), in which case it is only a heuristic estimate.
+        """
+        new_duties = []
+        lagrangian_gain = 0.0
+        self.truncated = False
+        label_limit = None if exact else self.max_labels_per_trip
+        for (bus_type, _, _, _), buses in self._bus_groups().items():
+            fixed_cost, unit_cost = self._bus_costs(bus_type)
+            labels = self._price_group(bus_type, buses[0], trip_duals, label_limit)
+            if labels:
+                lagrangian_gain += sum(min(0.0, labels[0].reduced_cost - bus_duals.get(bus.bus_id, 0.0)) for bus in buses)
+            # Buses with the largest convexity dual get the best paths first
+            buses = sorted(buses, key=lambda bus: bus_duals.get(bus.bus_id, 0.0), reverse=True)
+            added = 0
+            seen_paths = set()
+            for label in labels:
+                if added >= self.columns_per_group:
+                    break
+                if label.reduced_cost - bus_duals.get(buses[0].bus_id, 0.0) >= -self.reduced_cost_tolerance:
+                    break
+                trip_ids = tuple(label.trip_ids())
+                if trip_ids in seen_paths:
+                    continue
+                seen_paths.add(trip_ids)
+                # Spread the paths over the buses of the group; a bus may get several alternatives
+                bus = buses[added % len(buses)]
+                if label.reduced_cost - bus_duals.get(bus.bus_id, 0.0) >= -self.reduced_cost_tolerance:
+                    bus = buses[0]
+                duty = Duty(bus.bus_id, bus_type, trip_ids, label.energy,
+                            fixed_cost + unit_cost * label.energy)
+                if self.add_duty(duty):
+                    new_duties.append(duty)
+                    added += 1
+        return new_duties, lagrangian_gain
+
+    # Driver
+
+    def solve(self, max_iterations=100):
+        """
+        Run column generation and solve the final integer master over the generated pool, within the
+        time limit and gap of `integer_config` and starting from the first-fit duties. Its outcome
+        ("optimal", "feasible" or "no solution") is kept in `self.integer_status`; without a solution
+        the first-fit duties are returned.
+
+        Parameters:
+        - max_iterations: Maximum number of pricing rounds.
+
+        Returns:
+        - Assignment dictionary {"electric": {bus_id: [trip_ids]}, "diesel": {bus_id: [trip_ids]}}.
+        """
+        initial_duties = self._initial_duties()
+        for duty in initial_duties:
+            self.add_duty(duty)
+
+        for iteration in range(max_iterations):
+            objective_value = self.master.solve()
+            trip_duals, bus_duals = self.master.duals()
+            new_duties, lagrangian_gain = self._price(trip_duals, bus_duals)
+            converging = (not new_duties or -lagrangian_gain <= self.gap_tolerance * max(1.0, abs(objective_value)))
+            if converging and self.truncated:
+                # Truncated pricing proves nothing; confirm with a pass keeping every label
+                more_duties, lagrangian_gain = self._price(trip_duals, bus_duals, exact=True)
+                new_duties += more_duties
+            bound = objective_value + lagrangian_gain
+            self.lower_bound = None if self.truncated else bound
+            print(f"Iteration {iteration + 1}: LP objective {objective_value}, "
+                  f"{'heuristic bound estimate' if self.truncated else 'lower bound'} {bound}, "
+                  f"columns {len(self.duties)}, new columns {len(new_duties)}")
+
+            if not new_duties:
+                print("Convergence achieved: no column with negative reduced cost.")
+                break
+            if (self.lower_bound is not None and
+                    objective_value - self.lower_bound <= self.gap_tolerance * max(1.0, abs(objective_value))):
+                print("Convergence achieved: LP objective within tolerance of the lower bound.")
+                break
+
+        self.integer_status, objective_value = self.master.solve_integer(self.integer_config,
+                                                                         incumbent=initial_duties)
+        if self.integer_status == "no solution":
+            print("No integer master solution within the time limit; using the initial duties.")
+            return self._duties_assignment(initial_duties)
+        print(f"Integer master objective: {objective_value} ({self.integer_status})")
+        return self.assignment()
+
+    def selected_duties(self):
+        """
+        Return the duties selected in the last master solution.
+        """
+        return self.master.selected_duties()
+
+    def assignment(self):
+        """
+        Return the selected duties as an assignment dictionary keyed by bus type and bus ID.
+        """
+        return self._duties_assignment(self.selected_duties())
+
+    @staticmethod
+    def _duties_assignment(duties):
+        assignment = {"electric": {}, "diesel": {}}
+        for duty in duties:
+            assignment[duty.bus_type][duty.bus_id] = list(duty.trip_ids)
+        return assignment
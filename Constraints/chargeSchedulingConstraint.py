@@ -1,34 +1,121 @@
+from pyomo.environ import Constraint as PyomoConstraint, Any
 from .constraint import Constraint
+from TripSuccessionIndex import TripSuccessionIndex
+from TimeGrid import TimeGrid
 
 class ChargerSchedulingConstraint(Constraint):
-    def apply(self, model, electric_buses, diesel_buses, trips, chargers, **kwargs):
-        def charger_scheduling_rule(model, bus_id, trip_id, next_trip_id):
-            bus = next(e for e in electric_buses if e.bus_id == bus_id)
-            trip = next(t for t in trips if t.trip_id == trip_id)
-            next_trip = next(t for t in trips if t.trip_id == next_trip_id)
-            
-            # Convert to integer to make it compatible with Pyomo
-            charging_needed = int((trip.distance + next_trip.distance) * bus.consumption_rate > bus.remaining_range)
-            
-            return model.charge[bus_id, trip.end_time] >= charging_needed * model.x_e[bus_id, next_trip_id]
-        
+    """
+    Forces an electric bus to charge after a trip when it cannot cover that trip and the next one
+    on its remaining range.
+
+    In lazy mode no row is created up front: `RoutingProblem.solve` solves without them, adds the rows
+    the solution violates (`separate`) and solves again until no row is violated. The streaming writer
+    (`rows`) always writes every row, since a model file is solved in one go. Either way, pairs the bus can
+    cover without charging get no row, since it would only read `charge >= 0`.
+    """
+    def __init__(self, max_successors=None, lazy=False):
+        """
+        Parameters:
+        - max_successors: Optional cap K on the successors considered per trip (K nearest in time).
+        - lazy: Generate the rows lazily, only when the current solution violates them.
+        """
+        self.max_successors = max_successors
+        self.lazy = lazy
+
+    @staticmethod
+    def _charger_scheduling_rule(model, bus, trip, next_trip, time_grid):
+        # Convert to integer to make it compatible with Pyomo
+        charging_needed = int((trip.distance + next_trip.distance) * bus.consumption_rate > bus.remaining_range)
+
+        return (model.charge[bus.bus_id, time_grid.slot_at(trip.end_time)] >=
+                charging_needed * model.x_e[bus.bus_id, next_trip.trip_id])
+
+    def apply(self, model, electric_buses, diesel_buses, trips, chargers, succession_index=None, time_grid=None,
+              **kwargs):
+        if time_grid is None:
+            time_grid = TimeGrid()
+        if self.lazy:
+            # Filled by `separate` with the rows the solutions violate
+            model.charger_scheduling = PyomoConstraint(Any)
+            print("Charge scheduling Constraint (lazy)")
+            return
+
+        if succession_index is None:
+            succession_index = TripSuccessionIndex(trips, max_successors=self.max_successors)
+        pairs = list(succession_index.pairs())
+
         # Use a dictionary to store the constraints before adding them to the model
         charger_constraints = {}
-        
-        # Dynamically create and apply constraints only for valid trip pairs
+
+        # Only valid trip pairs whose next trip has an assignment variable for the bus get a row; with an
+        # event-based time grid, pairs whose first trip does not end in one of the bus's charge slots are
+        # left out as well, since the bus cannot serve that trip. Pairs the bus covers without charging
+        # would only give charge >= 0 and are skipped, as in `rows` and `separate`
         for e in electric_buses:
-            for t in trips:
-                for n in trips:
-                    if t.trip_id != n.trip_id and t.end_time <= n.start_time:
-                        constraint_name = f"charger_scheduling_{e.bus_id}_{t.trip_id}_{n.trip_id}"
-                        charger_constraints[(e.bus_id, t.trip_id, n.trip_id)] = charger_scheduling_rule(
-                            model, e.bus_id, t.trip_id, n.trip_id
-                        )
-        
+            for t, n in pairs:
+                if (t.distance + n.distance) * e.consumption_rate <= e.remaining_range:
+                    continue
+                if (e.bus_id, n.trip_id) in model.x_e and (e.bus_id, time_grid.slot_at(t.end_time)) in model.charge:
+                    charger_constraints[(e.bus_id, t.trip_id, n.trip_id)] = self._charger_scheduling_rule(
+                        model, e, t, n, time_grid
+                    )
+
         # Add all constraints as a single indexed constraint block to the model
-        model.charger_scheduling = Constraint(
+        model.charger_scheduling = PyomoConstraint(
             charger_constraints.keys(),
             rule=lambda model, bus_id, trip_id, next_trip_id: charger_constraints[(bus_id, trip_id, next_trip_id)]
         )
 
         print("Charge scheduling Constraint")
+
+    def separate(self, model, electric_buses, diesel_buses, trips, chargers, succession_index=None, time_grid=None,
+                 **kwargs):
+        """
+        Add the rows violated by the solution loaded in the model, in one pass over the assigned trips:
+        for every trip a bus serves, the trips it can follow and that, together with it, exceed the bus's
+        remaining range while the bus does not charge after them.
+
+        Returns:
+        - Number of rows added.
+        """
+        if time_grid is None:
+            time_grid = TimeGrid()
+        if succession_index is None:
+            succession_index = TripSuccessionIndex(trips, max_successors=self.max_successors)
+        buses = {e.bus_id: e for e in electric_buses}
+        added = 0
+        for (bus_id, trip_id), var in model.x_e.items():
+            if var.value is None or var.value < 0.5:
+                continue
+            bus = buses[bus_id]
+            next_trip = succession_index.trips_by_id[trip_id]
+            for trip in succession_index.predecessors(trip_id):
+                if (trip.distance + next_trip.distance) * bus.consumption_rate <= bus.remaining_range:
+                    continue  # The row holds whatever the charging decision
+                slot = time_grid.slot_at(trip.end_time)
+                if (bus_id, slot) not in model.charge:
+                    continue
+                charge = model.charge[bus_id, slot].value
+                key = (bus_id, trip.trip_id, trip_id)
+                if (charge is not None and charge > 0.5) or key in model.charger_scheduling:
+                    continue
+                model.charger_scheduling[key] = self._charger_scheduling_rule(model, bus, trip, next_trip, time_grid)
+                added += 1
+        return added
+
+    def rows(self, index, electric_buses, diesel_buses, trips, chargers, succession_index=None, time_grid=None,
+             **kwargs):
+        if time_grid is None:
+            time_grid = TimeGrid()
+        if succession_index is None:
+            succession_index = TripSuccessionIndex(trips, max_successors=self.max_successors)
+        pairs = list(succession_index.pairs())
+        for e in electric_buses:
+            for t, n in pairs:
+                column = index.x_e.get((e.bus_id, n.trip_id))
+                charge_column = index.charge.get((e.bus_id, time_grid.slot_at(t.end_time)))
+                if column is None or charge_column is None:
+                    continue
+                if (t.distance + n.distance) * e.consumption_rate <= e.remaining_range:
+                    continue  # charge >= 0 holds whatever the charging decision
+                yield [charge_column, column], [1, -1], ">=", 0
@@ -1,13 +1,94 @@
+from pyomo.environ import Constraint as PyomoConstraint
 from .constraint import Constraint
 class ChargingCapacityConstraint(Constraint):
     """
-    Ensures that only one electric bus uses a charger at any time.
+    Limits the number of electric buses charging in each time slot to the number of chargers available
+    at the depot in that slot. One row is created per time grid slot that holds charge variables rather
+    than per (charger, slot); the charger schedules must use the same slots as the grid. Use
+    `assign_chargers` after solving to map the charging buses back to individual chargers.
     """
-    def apply(self, model, electric_buses, diesel_buses, trips, chargers):
-        def charger_capacity_rule(model, charger_id, time_slot):
-            return sum(model.charge[e.bus_id, time_slot] for e in electric_buses) <= 1
-        model.charging_capacity = model.Constraint(
-            [(charger.charger_id, t) for charger in chargers for t in range(24)],
+    def __init__(self, weighted=False):
+        """
+        Parameters:
+        - weighted: If True, also bound the charging power: the sum of the charging rates of the buses
+          charging in a slot may not exceed the sum of the charging rates of the chargers available in
+          that slot. The bound on the number of buses is kept, since every bus needs its own charger.
+        """
+        self.weighted = weighted
+
+    def apply(self, model, electric_buses, diesel_buses, trips, chargers, **kwargs):
+        rates = {e.bus_id: e.charging_rate for e in electric_buses}
+        slot_vars = {}
+        for (bus_id, time_slot), var in model.charge.items():
+            slot_vars.setdefault(time_slot, []).append((bus_id, var))
+
+        def charger_capacity_rule(model, time_slot):
+            available = [charger for charger in chargers if charger.is_available(time_slot)]
+            return sum(var for _, var in slot_vars[time_slot]) <= len(available)
+
+        def charging_power_rule(model, time_slot):
+            available = [charger for charger in chargers if charger.is_available(time_slot)]
+            return (sum(rates[bus_id] * var for bus_id, var in slot_vars[time_slot])
+                    <= sum(charger.charging_rate for charger in available))
+        # One row per time grid slot holding charge variables
+        model.charging_capacity = PyomoConstraint(
+            sorted(slot_vars),
             rule=charger_capacity_rule
         )
+        if self.weighted:
+            model.charging_power = PyomoConstraint(sorted(slot_vars), rule=charging_power_rule)
         print("charging capacity constraint")
+
+    def rows(self, index, electric_buses, diesel_buses, trips, chargers, **kwargs):
+        rates = {e.bus_id: e.charging_rate for e in electric_buses}
+        slot_columns = {}
+        for (bus_id, time_slot), column in index.charge.items():
+            slot_columns.setdefault(time_slot, []).append((bus_id, column))
+        for time_slot in sorted(slot_columns):
+            available = [charger for charger in chargers if charger.is_available(time_slot)]
+            columns = [column for _, column in slot_columns[time_slot]]
+            yield columns, [1] * len(columns), "<=", len(available)
+            if self.weighted:
+                yield (columns, [rates[bus_id] for bus_id, _ in slot_columns[time_slot]], "<=",
+                       sum(charger.charging_rate for charger in available))
+
+    def assign_chargers(self, model, electric_buses, chargers, book=False):
+        """
+        Map the aggregated charging solution back to individual chargers.
+
+        In each slot, the charging buses are matched to the available chargers, fastest bus to fastest
+        charger.
+
+        Parameters:
+        - model: Solved Pyomo model.
+        - electric_buses: List of ElectricBus objects.
+        - chargers: List of Charger objects.
+        - book: If True, record the sessions in each `Charger.schedule`.
+
+        Returns:
+        - Dictionary {time_slot: {charger_id: bus_id}}.
+
+        Raises:
+        - ValueError if more buses charge in a slot than there are available chargers.
+        """
+        buses = {e.bus_id: e for e in electric_buses}
+        charging_by_slot = {}
+        for (bus_id, time_slot), var in model.charge.items():
+            if var.value is not None and var.value > 0.5:
+                charging_by_slot.setdefault(time_slot, []).append(buses[bus_id])
+
+        assignment = {}
+        for time_slot in sorted(charging_by_slot):
+            charging = charging_by_slot[time_slot]
+            available = [charger for charger in chargers if charger.is_available(time_slot)]
+            if len(charging) > len(available):
+                raise ValueError(f"{len(charging)} buses charge at time slot {time_slot} "
+                                 f"but only {len(available)} chargers are available")
+            charging.sort(key=lambda e: e.charging_rate, reverse=True)
+            available.sort(key=lambda charger: charger.charging_rate, reverse=True)
+            assignment[time_slot] = {}
+            for bus, charger in zip(charging, available):
+                assignment[time_slot][charger.charger_id] = bus.bus_id
+                if book:
+                    charger.schedule_charging(bus.bus_id, time_slot)
+        return assignment
@@ -12,3 +12,17 @@ class Constraint:
         - model: The Pyomo model to which the constraint is added.
         """
         raise NotImplementedError("Subclasses should implement this method.")
+
+    def rows(self, index, **kwargs):
+        """
+        Generate the rows of the constraint without building Pyomo expressions, for the streaming
+        LP/MPS writer (see LPWriter.py). Takes the same keyword arguments as `apply`.
+
+        Parameters:
+        - index: ModelIndex mapping the model variables (x_e, x_d, charge, refuel, z_e, z_d) to column
+          numbers.
+
+        Yields:
+        - Tuples (columns, coefficients, sense, rhs), where sense is "<=", ">=" or "=".
+        """
+        raise NotImplementedError("Subclasses should implement this method.")
@@ -1,20 +1,33 @@
+from pyomo.environ import Constraint as PyomoConstraint
 from .constraint import Constraint
 
 class DepotReturnConstraint(Constraint):
-    def apply(self, model, electric_buses, diesel_buses, trips, chargers):
+    def apply(self, model, electric_buses, diesel_buses, trips, chargers, **kwargs):
         final_trip_id = max(trip.trip_id for trip in trips)  # assuming trips are sequentially ordered
         
         def depot_return_rule_electric(model, bus_id):
+            if (bus_id, final_trip_id) not in model.x_e:
+                return PyomoConstraint.Skip  # Bus cannot serve the final trip in sparse mode
             return model.x_e[bus_id, final_trip_id] >= 1  # Ensure last trip returns to depot
-        model.depot_return_electric = Constraint(
+        model.depot_return_electric = PyomoConstraint(
             [e.bus_id for e in electric_buses],
             rule=depot_return_rule_electric
         )
 
         def depot_return_rule_diesel(model, bus_id):
+            if (bus_id, final_trip_id) not in model.x_d:
+                return PyomoConstraint.Skip  # Bus cannot serve the final trip in sparse mode
             return model.x_d[bus_id, final_trip_id] >= 1  # Ensure last trip returns to depot
-        model.depot_return_diesel = Constraint(
+        model.depot_return_diesel = PyomoConstraint(
             [d.bus_id for d in diesel_buses],
             rule=depot_return_rule_diesel
         )
         print("Depot Return Constraint")
+
+    def rows(self, index, electric_buses, diesel_buses, trips, chargers, **kwargs):
+        final_trip_id = max(trip.trip_id for trip in trips)  # assuming trips are sequentially ordered
+        for variables, buses in ((index.x_e, electric_buses), (index.x_d, diesel_buses)):
+            for bus in buses:
+                column = variables.get((bus.bus_id, final_trip_id))
+                if column is not None:
+                    yield [column], [1], ">=", 1
@@ -1,11 +1,16 @@
+from pyomo.environ import Constraint as PyomoConstraint
 from .constraint import Constraint
 
 class DieselRefuelCapacityConstraint(Constraint):
-    def apply(self, model, electric_buses, diesel_buses, trips, chargers):
+    def apply(self, model, electric_buses, diesel_buses, trips, chargers, **kwargs):
         def refuel_capacity_rule(model, bus_id, time_slot):
             return model.refuel[bus_id, time_slot] <= 1  # Only one refuel session per bus per slot
-        model.refuel_capacity = model.Constraint(
-            [(d.bus_id, t) for d in diesel_buses for t in range(24)],
+        model.refuel_capacity = PyomoConstraint(
+            list(model.refuel.keys()),
             rule=refuel_capacity_rule
         )
-        print("Diesel Refuel Capacity constraint")
\ No newline at end of file
+        print("Diesel Refuel Capacity constraint")
+
+    def rows(self, index, electric_buses, diesel_buses, trips, chargers, **kwargs):
+        for column in index.refuel.values():
+            yield [column], [1], "<=", 1
\ No newline at end of file
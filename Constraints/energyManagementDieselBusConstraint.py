@@ -1,13 +1,26 @@
+from pyomo.environ import Constraint as PyomoConstraint
 from .constraint import Constraint
+from FleetRegistry import FleetRegistry
 
 class EnergyManagementDieselConstraint(Constraint):
-    def apply(self, model, electric_buses, diesel_buses, trips, chargers):
+    def apply(self, model, electric_buses, diesel_buses, trips, chargers, registry=None, **kwargs):
+        if registry is None:
+            registry = FleetRegistry(electric_buses, diesel_buses, trips, chargers)
+
         def energy_management_diesel_rule(model, bus_id, trip_id):
-            bus = next(d for d in diesel_buses if d.bus_id == bus_id)
-            trip = next(t for t in trips if t.trip_id == trip_id)
+            bus = registry.diesel_bus(bus_id)
+            trip = registry.trip(trip_id)
             return model.x_d[bus_id, trip_id] * bus.remaining_range >= trip.distance * bus.consumption_rate
-        model.energy_management_diesel = model.Constraint(
-            [(d.bus_id, t.trip_id) for d in diesel_buses for t in trips],
+        model.energy_management_diesel = PyomoConstraint(
+            list(model.x_d.keys()),
             rule=energy_management_diesel_rule
         )
         print("Energy Management Diesel Bus")
+
+    def rows(self, index, electric_buses, diesel_buses, trips, chargers, registry=None, **kwargs):
+        if registry is None:
+            registry = FleetRegistry(electric_buses, diesel_buses, trips, chargers)
+        for (bus_id, trip_id), column in index.x_d.items():
+            bus = registry.diesel_bus(bus_id)
+            trip = registry.trip(trip_id)
+            yield [column], [bus.remaining_range], ">=", trip.distance * bus.consumption_rate
@@ -1,18 +1,31 @@
+from pyomo.environ import Constraint as PyomoConstraint
 from .constraint import Constraint
+from FleetRegistry import FleetRegistry
 
 class EnergyManagementElectricConstraint(Constraint):
     """
     Ensures that electric buses have enough charge to complete assigned trips.
     """
-    def apply(self, model, electric_buses, diesel_buses, trips, chargers, **kwargs):
+    def apply(self, model, electric_buses, diesel_buses, trips, chargers, registry=None, **kwargs):
+        if registry is None:
+            registry = FleetRegistry(electric_buses, diesel_buses, trips, chargers)
+
         def energy_management_electric_rule(model, bus_id, trip_id):
-            bus = next(e for e in electric_buses if e.bus_id == bus_id)
-            trip = next(t for t in trips if t.trip_id == trip_id)
+            bus = registry.electric_bus(bus_id)
+            trip = registry.trip(trip_id)
             return model.x_e[bus_id, trip_id] * bus.remaining_range >= trip.distance * bus.consumption_rate
-        
-        # Use model.Constraint, not Constraint
-        model.energy_management_electric = model.Constraint(
-            [(e.bus_id, t.trip_id) for e in electric_buses for t in trips],
+
+        # Only the assignment variables that exist in the model get a row
+        model.energy_management_electric = PyomoConstraint(
+            list(model.x_e.keys()),
             rule=energy_management_electric_rule
         )
         print("Energy Management Electric Bus")
+
+    def rows(self, index, electric_buses, diesel_buses, trips, chargers, registry=None, **kwargs):
+        if registry is None:
+            registry = FleetRegistry(electric_buses, diesel_buses, trips, chargers)
+        for (bus_id, trip_id), column in index.x_e.items():
+            bus = registry.electric_bus(bus_id)
+            trip = registry.trip(trip_id)
+            yield [column], [bus.remaining_range], ">=", trip.distance * bus.consumption_rate
@@ -1,3 +1,4 @@
+from pyomo.environ import Constraint as PyomoConstraint
 from .constraint import Constraint
 
 class FleetSizeConstraint(Constraint):
@@ -5,10 +6,15 @@ class FleetSizeConstraint(Constraint):
     Limits the number of electric and diesel buses used to the available fleet.
     """
     def apply(self, model, electric_buses, diesel_buses, trips, chargers, **kwargs):
-        model.fleet_size_electric = model.Constraint(
+        model.fleet_size_electric = PyomoConstraint(
             expr=sum(model.z_e[e.bus_id] for e in electric_buses) <= len(electric_buses)
         )
-        model.fleet_size_diesel = model.Constraint(
+        model.fleet_size_diesel = PyomoConstraint(
             expr=sum(model.z_d[d.bus_id] for d in diesel_buses) <= len(diesel_buses)
         )
-        print("Fleet size")
\ No newline at end of file
+        print("Fleet size")
+
+    def rows(self, index, electric_buses, diesel_buses, trips, chargers, **kwargs):
+        for variables, buses in ((index.z_e, electric_buses), (index.z_d, diesel_buses)):
+            columns = [variables[bus.bus_id] for bus in buses]
+            yield columns, [1] * len(columns), "<=", len(buses)
\ No newline at end of file
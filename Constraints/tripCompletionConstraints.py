@@ -1,3 +1,4 @@
+from pyomo.environ import Constraint as PyomoConstraint
 from .constraint import Constraint
 
 class TripCompletionConstraint(Constraint):
@@ -5,15 +6,31 @@ class TripCompletionConstraint(Constraint):
     Ensures that each trip is served by exactly one bus (either electric or diesel).
     """
     def apply(self, model, electric_buses, diesel_buses, trips, chargers, **kwargs):
+        # Group the existing assignment variables by trip so each row only visits its own terms
+        trip_vars = {trip.trip_id: [] for trip in trips}
+        for (bus_id, trip_id), var in model.x_e.items():
+            trip_vars[trip_id].append(var)
+        for (bus_id, trip_id), var in model.x_d.items():
+            trip_vars[trip_id].append(var)
+
         def trip_completion_rule(model, trip_id):
-            return (
-                sum(model.x_e[e.bus_id, trip_id] for e in electric_buses if (e.bus_id, trip_id) in model.x_e) +
-                sum(model.x_d[d.bus_id, trip_id] for d in diesel_buses if (d.bus_id, trip_id) in model.x_d)
-            ) == 1
+            if not trip_vars[trip_id]:
+                return PyomoConstraint.Infeasible  # No bus is able to serve this trip
+            return sum(trip_vars[trip_id]) == 1
 
-        # Use model.Constraint, not Constraint
-        model.trip_completion_constraint = model.Constraint(
+        model.trip_completion_constraint = PyomoConstraint(
             [trip.trip_id for trip in trips], rule=trip_completion_rule
         )
 
         print("each trip is served by exactly one bus ")
+
+    def rows(self, index, electric_buses, diesel_buses, trips, chargers, **kwargs):
+        trip_columns = {trip.trip_id: [] for trip in trips}
+        for variables in (index.x_e, index.x_d):
+            for (bus_id, trip_id), column in variables.items():
+                trip_columns[trip_id].append(column)
+        for trip in trips:
+            columns = trip_columns[trip.trip_id]
+            if not columns:
+                raise ValueError(f"No bus is able to serve trip {trip.trip_id}")
+            yield columns, [1] * len(columns), "=", 1
@@ -0,0 +1,210 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from pyomo.opt import TerminationCondition
+
+from Depot import Depot
+from RoutingProblem import RoutingProblem
+from SolverConfig import SolverConfig
+from Constraints.chargingCapacityConstraint import ChargingCapacityConstraint
+
+
+def _solve_block(electric_buses, diesel_buses, trips, chargers, location, constraints, sparse, config,
+                 time_grid=None):
+    """
+    Solve one block as its own RoutingProblem in a worker process. A solution charging more buses in a
+    slot than the block has chargers is reported as not solved.
+
+    Returns:
+    - Tuple (assignment, charger_sessions, refueling, solved, seconds), where charger_sessions is
+      {time_slot: {charger_id: bus_id}} on the block's chargers and refueling is {bus_id: [time_slots]}.
+    """
+    start = time.perf_counter()
+    depot = Depot(location, electric_buses, diesel_buses, chargers)
+    problem = RoutingProblem(electric_buses, diesel_buses, trips, depot, constraints, sparse=sparse,
+                             time_grid=time_grid)
+
+    solver = config.create()
+    results = solver.solve(problem.model, load_solutions=False)
+    solved = (len(results.solution) > 0 and
+              results.solver.termination_condition in (TerminationCondition.optimal,
+                                                        TerminationCondition.feasible,
+                                                        TerminationCondition.maxTimeLimit))
+    if not solved:
+        return {"electric": {}, "diesel": {}}, {}, {}, False, time.perf_counter() - start
+
+    problem.model.solutions.load_from(results)
+    try:
+        charger_sessions = ChargingCapacityConstraint().assign_chargers(problem.model, electric_buses, chargers)
+    except ValueError as error:  # no charging capacity rows in the block model
+        print(f"Block charges beyond its chargers, left unsolved: {error}")
+        return {"electric": {}, "diesel": {}}, {}, {}, False, time.perf_counter() - start
+    refueling = {}
+    for (bus_id, time_slot), var in problem.model.refuel.items():
+        if var.value is not None and var.value > 0.5:
+            refueling.setdefault(bus_id, []).append(time_slot)
+    return problem.extract_assignment(), charger_sessions, refueling, True, time.perf_counter() - start
+
+
+class ComponentDecomposer:
+    """
+    Splits a RoutingProblem into independent blocks and solves them in parallel.
+
+    The bus-trip compatibility graph links a bus to every trip it can serve (range, seats, planning
+    horizon; see `RoutingProblem._can_serve`). Its connected components share no assignment variable,
+    so each one is a RoutingProblem of its own. The only rows coupling them are the per-slot charger
+    capacity rows; the depot chargers are therefore divided between the blocks in proportion to their
+    electric buses, which keeps the merged charging plan within the depot capacity.
+
+    Only compatibility separates the blocks. Trips apart in time are not split, since a bus serving both
+    links them. On instances where most buses can serve most trips there is therefore a single block;
+    it is then solved in this process without starting the pool, and the decomposer only adds the
+    removal of the trips no bus can serve. Use RollingHorizonSolver to split the day in time instead.
+
+    Trips no bus can serve form components without buses; they are reported in `unassigned`, as are the
+    trips of a block without a solution. A block whose solution charges more buses in a slot than it has
+    chargers (when the constraints hold no charger capacity rows) counts as without a solution.
+    """
+    def __init__(self, problem, max_workers=None, solver_name='glpk', time_limit=None, config=None):
+        """
+        Initialize a ComponentDecomposer object.
+
+        Parameters:
+        - problem: RoutingProblem to decompose; build it with `build_model=False`, the blocks build
+          their own models with its constraints and `sparse` setting.
+        - max_workers: Number of worker processes (default: one per CPU).
+        - solver_name: Pyomo solver name used for every block.
+        - time_limit: Optional time limit in seconds for each block.
+        - config: Optional SolverConfig (MIP gap, threads) for every block; it replaces `solver_name` and
+          `time_limit`.
+        """
+        self.problem = problem
+        self.max_workers = max_workers
+        self.config = config or SolverConfig(solver_name, time_limit=time_limit)
+        self.assignment = None
+        self.charging = {}     # bus_id -> list of charging slots
+        self.refueling = {}    # bus_id -> list of refueling slots
+        self.unassigned = []   # trip IDs no bus can serve, or of blocks without solution
+        self.block_stats = []
+
+    def _compatibility(self):
+        """
+        Boolean matrix [bus, trip] of the pairs passing `RoutingProblem._can_serve`, electric buses first.
+        """
+        return self.problem._compatibility()[0]
+
+    def components(self):
+        """
+        Connected components of the bus-trip compatibility graph.
+
+        Labels are propagated over the bipartite graph (each trip takes the smallest label of its buses,
+        each bus the smallest label of its trips) until they stop changing.
+
+        Returns:
+        - List of tuples (electric_buses, diesel_buses, trips), largest first; components without
+          trips are left out, components without buses have empty bus lists.
+        """
+        electric, diesel, trips = self.problem.electric_buses, self.problem.diesel_buses, self.problem.trips
+        buses = electric + diesel
+        if not trips:
+            return []
+        compatible = self._compatibility()
+
+        no_label = len(buses) + len(trips)
+        bus_label = np.arange(len(buses))
+        while True:
+            trip_label = np.where(compatible, bus_label[:, None], no_label).min(axis=0)
+            new_bus_label = np.minimum(bus_label, np.where(compatible, trip_label[None, :], no_label).min(axis=1))
+            if np.array_equal(new_bus_label, bus_label):
+                break
+            bus_label = new_bus_label
+        # Trips without any bus get a label of their own
+        orphans = trip_label == no_label
+        trip_label[orphans] = no_label + np.arange(orphans.sum())
+
+        groups = {}
+        for index, trip in enumerate(trips):
+            groups.setdefault(int(trip_label[index]), ([], [], []))[2].append(trip)
+        for index, bus in enumerate(buses):
+            group = groups.get(int(bus_label[index]))
+            if group is not None:
+                group[0 if index < len(electric) else 1].append(bus)
+        return sorted(groups.values(), key=lambda group: len(group[2]), reverse=True)
+
+    def _split_chargers(self, blocks):
+        """
+        Divide the depot chargers between the blocks in proportion to their electric buses (largest
+        remainder).
+
+        Returns:
+        - List with the chargers of each block.
+        """
+        chargers = self.problem.depot.chargers
+        weights = [len(electric) for electric, _, _ in blocks]
+        total = sum(weights)
+        if total == 0:
+            return [[] for _ in blocks]
+        quotas = [len(chargers) * weight / total for weight in weights]
+        counts = [int(quota) for quota in quotas]
+        by_remainder = sorted(range(len(blocks)), key=lambda index: quotas[index] - counts[index], reverse=True)
+        for index in by_remainder[:len(chargers) - sum(counts)]:
+            counts[index] += 1
+
+        shares, position = [], 0
+        for count in counts:
+            shares.append(chargers[position:position + count])
+            position += count
+        return shares
+
+    def solve(self):
+        """
+        Solve every block in the process pool and merge the results. The merged charging sessions are
+        booked on the depot chargers.
+
+        Returns:
+        - Assignment dictionary {"electric": {bus_id: [trip_ids]}, "diesel": {bus_id: [trip_ids]}}.
+        """
+        self.assignment = {"electric": {}, "diesel": {}}
+        self.charging = {}
+        self.refueling = {}
+        self.unassigned = []
+        self.block_stats = []
+
+        blocks = []
+        for electric, diesel, trips in self.components():
+            if electric or diesel:
+                blocks.append((electric, diesel, trips))
+            else:
+                self.unassigned.extend(trip.trip_id for trip in trips)
+        shares = self._split_chargers(blocks)
+        print(f"{len(blocks)} independent blocks, {len(self.unassigned)} trips no bus can serve")
+
+        chargers_by_id = {charger.charger_id: charger for charger in self.problem.depot.chargers}
+        tasks = [(electric, diesel, trips, share, self.problem.depot.location, self.problem.constraints,
+                  self.problem.sparse, self.config, self.problem.time_grid)
+                 for (electric, diesel, trips), share in zip(blocks, shares)]
+        if len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                # Largest blocks first so the pool is not left waiting on one big block at the end
+                futures = [executor.submit(_solve_block, *task) for task in tasks]
+                results = [future.result() for future in futures]
+        else:
+            results = [_solve_block(*task) for task in tasks]  # Nothing to run in parallel
+
+        for (electric, diesel, trips), result in zip(blocks, results):
+            assignment, charger_sessions, refueling, solved, seconds = result
+            self.block_stats.append({"electric_buses": len(electric), "diesel_buses": len(diesel),
+                                     "trips": len(trips), "solved": solved, "seconds": seconds})
+            if not solved:
+                self.unassigned.extend(trip.trip_id for trip in trips)
+                continue
+            for bus_type in ("electric", "diesel"):
+                self.assignment[bus_type].update(assignment[bus_type])
+            for time_slot, sessions in charger_sessions.items():
+                for charger_id, bus_id in sessions.items():
+                    chargers_by_id[charger_id].schedule_charging(bus_id, time_slot)
+                    self.charging.setdefault(bus_id, []).append(time_slot)
+            self.refueling.update(refueling)
+        self.problem.depot.booking.refresh()  # The sessions were booked on given chargers
+        return self.assignment
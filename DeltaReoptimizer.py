@@ -0,0 +1,356 @@
+import time
+from bisect import bisect_left
+
+from pyomo.opt import TerminationCondition
+
+from Depot import Depot
+from SolverConfig import SolverConfig
+
+TRIP_FIELDS = ("start_time", "end_time", "distance", "demand", "origin", "destination")
+BUS_FIELDS = ("capacity", "consumption_rate", "max_range", "remaining_range")
+
+
+class ScheduleDelta:
+    """
+    Changes between two versions of an instance: trips added, cancelled or retimed, buses added or
+    withdrawn, chargers added or taken out of service.
+    """
+    def __init__(self, added_trips=(), removed_trips=(), retimed_trips=(), added_buses=(), removed_buses=(),
+                 added_chargers=(), removed_chargers=()):
+        """
+        Initialize a ScheduleDelta object.
+
+        Parameters:
+        - added_trips: List of new Trip objects.
+        - removed_trips: IDs of cancelled trips.
+        - retimed_trips: List of Trip objects replacing the trips with the same ID (new times, distance,
+          demand or locations).
+        - added_buses: List of new ElectricBus or FuelBus objects.
+        - removed_buses: IDs of withdrawn buses.
+        - added_chargers: List of new Charger objects.
+        - removed_chargers: IDs of chargers out of service.
+        """
+        self.added_trips = list(added_trips)
+        self.removed_trips = set(removed_trips)
+        self.retimed_trips = list(retimed_trips)
+        self.added_buses = list(added_buses)
+        self.removed_buses = set(removed_buses)
+        self.added_chargers = list(added_chargers)
+        self.removed_chargers = set(removed_chargers)
+
+    @classmethod
+    def between(cls, old_trips, new_trips, old_buses=(), new_buses=(), old_chargers=(), new_chargers=()):
+        """
+        Compute the delta between two timetables (and optionally two fleets and two charger lists),
+        matching objects by ID. A bus whose attributes changed is withdrawn and added again; a charger
+        whose rate changed likewise.
+
+        Returns:
+        - ScheduleDelta.
+        """
+        old = {trip.trip_id: trip for trip in old_trips}
+        new = {trip.trip_id: trip for trip in new_trips}
+        retimed = [trip for trip_id, trip in new.items() if trip_id in old and
+                   any(getattr(trip, field) != getattr(old[trip_id], field) for field in TRIP_FIELDS)]
+
+        old_fleet = {bus.bus_id: bus for bus in old_buses}
+        new_fleet = {bus.bus_id: bus for bus in new_buses}
+        changed = {bus_id for bus_id, bus in new_fleet.items() if bus_id in old_fleet and
+                   (type(bus) is not type(old_fleet[bus_id]) or
+                    any(getattr(bus, field) != getattr(old_fleet[bus_id], field) for field in BUS_FIELDS))}
+
+        old_rates = {charger.charger_id: charger.charging_rate for charger in old_chargers}
+        new_rates = {charger.charger_id: charger.charging_rate for charger in new_chargers}
+        replaced = {charger_id for charger_id, rate in new_rates.items()
+                    if charger_id in old_rates and old_rates[charger_id] != rate}
+
+        return cls(added_trips=[trip for trip_id, trip in new.items() if trip_id not in old],
+                   removed_trips=[trip_id for trip_id in old if trip_id not in new],
+                   retimed_trips=retimed,
+                   added_buses=[bus for bus_id, bus in new_fleet.items() if bus_id not in old_fleet or bus_id in changed],
+                   removed_buses=[bus_id for bus_id in old_fleet if bus_id not in new_fleet or bus_id in changed],
+                   added_chargers=[charger for charger in new_chargers
+                                   if charger.charger_id not in old_rates or charger.charger_id in replaced],
+                   removed_chargers=[charger_id for charger_id in old_rates
+                                     if charger_id not in new_rates or charger_id in replaced])
+
+    def __str__(self):
+        return (f"ScheduleDelta - Trips: +{len(self.added_trips)} -{len(self.removed_trips)} "
+                f"~{len(self.retimed_trips)}, Buses: +{len(self.added_buses)} -{len(self.removed_buses)}, "
+                f"Chargers: +{len(self.added_chargers)} -{len(self.removed_chargers)}")
+
+
+class DeltaReoptimizer:
+    """
+    Repairs a previous schedule after a small change to the instance instead of solving it again from
+    scratch.
+
+    Only the assignments near the change are reopened: the new and retimed trips, the trips of withdrawn
+    buses, and for every changed trip the `neighborhood` assigned trips closest to it in start time. The
+    buses holding a reopened assignment, the added buses and a few idle `spare_buses` form a small
+    RoutingProblem over the reopened trips, warm-started from the previous assignment and solved with the
+    same constraints; everything else in their duties, and every other duty, is kept as it is. The model
+    therefore grows with the size of the change, not with the size of the instance.
+
+    The charger schedules (`Charger.schedule`) are taken as the bookings of the previous schedule: the
+    sessions of the buses in the subproblem are released before it is built, so its charging capacity
+    rows see the chargers the kept duties still use, and the new sessions are booked afterwards. When a
+    charger is removed, the buses that charged in the slots it leaves short are planned again as well.
+    """
+    def __init__(self, problem, previous_assignment, previous_charging=None, previous_refueling=None,
+                 neighborhood=10, spare_buses=2, solver_name='glpk', time_limit=None, tee=False, config=None):
+        """
+        Initialize a DeltaReoptimizer object.
+
+        Parameters:
+        - problem: RoutingProblem of the previous instance (build it with `build_model=False`); its
+          constraints, `sparse` setting and time grid are used for the subproblems.
+        - previous_assignment: Assignment dictionary {"electric": {bus_id: [trip_ids]}, "diesel": {...}}.
+        - previous_charging: Optional dictionary {bus_id: [time_slots]} of electric bus charging sessions.
+        - previous_refueling: Optional dictionary {bus_id: [time_slots]} of diesel bus refueling events.
+        - neighborhood: Number of assigned trips, nearest in start time, reopened around each changed trip.
+        - spare_buses: Number of idle buses of each type offered to the subproblem.
+        - solver_name: Pyomo solver name.
+        - time_limit: Optional time limit in seconds for each re-solve.
+        - tee: Show the solver output.
+        - config: Optional SolverConfig (MIP gap, threads) for the re-solves; it replaces `solver_name` and
+          `time_limit`.
+        """
+        self.problem = problem
+        self.constraints = problem.constraints
+        self.neighborhood = neighborhood
+        self.spare_buses = spare_buses
+        self.config = config or SolverConfig(solver_name, time_limit=time_limit)
+        self.tee = tee
+
+        self.electric_buses = list(problem.electric_buses)
+        self.diesel_buses = list(problem.diesel_buses)
+        self.trips = list(problem.trips)
+        self.depot = problem.depot
+        self.assignment = {bus_type: {bus_id: list(trip_ids) for bus_id, trip_ids in duties.items()}
+                           for bus_type, duties in previous_assignment.items()}
+        self.charging = {bus_id: list(slots) for bus_id, slots in (previous_charging or {}).items()}
+        self.refueling = {bus_id: list(slots) for bus_id, slots in (previous_refueling or {}).items()}
+        served = {trip_id for duties in self.assignment.values() for trip_ids in duties.values() for trip_id in trip_ids}
+        self.unassigned = [trip.trip_id for trip in self.trips if trip.trip_id not in served]
+        self.stats = {}
+
+    def reoptimize(self, delta):
+        """
+        Apply a change to the instance and repair the schedule. The reoptimizer then holds the new
+        instance (`electric_buses`, `diesel_buses`, `trips`, `depot`) and schedule (`assignment`,
+        `charging`, `refueling`, `unassigned`), so further deltas can follow.
+
+        Parameters:
+        - delta: ScheduleDelta.
+
+        Returns:
+        - Assignment dictionary {"electric": {bus_id: [trip_ids]}, "diesel": {bus_id: [trip_ids]}}.
+
+        Raises:
+        - ValueError if the delta removes or retimes an unknown trip, or adds a trip that already exists.
+        """
+        start = time.perf_counter()
+        old_trips = {trip.trip_id: trip for trip in self.trips}
+        for trip_id in delta.removed_trips | {trip.trip_id for trip in delta.retimed_trips}:
+            if trip_id not in old_trips:
+                raise ValueError(f"Trip {trip_id} is not part of the current timetable")
+        for trip in delta.added_trips:
+            if trip.trip_id in old_trips:
+                raise ValueError(f"Trip {trip.trip_id} is already part of the current timetable")
+
+        self._apply(delta)
+        open_trips, open_buses = self._reopen(delta, old_trips)
+
+        # Split the duties of the buses in the subproblem into kept trips and reopened trips
+        changed = {trip.trip_id for trip in delta.added_trips} | {trip.trip_id for trip in delta.retimed_trips}
+        previous = {"electric": {}, "diesel": {}}
+        for bus_type, duties in self.assignment.items():
+            for bus_id in list(duties):
+                if bus_id in delta.removed_buses:
+                    del duties[bus_id]
+                    continue
+                trip_ids = [trip_id for trip_id in duties[bus_id] if trip_id not in delta.removed_trips]
+                if bus_id in open_buses:
+                    previous[bus_type][bus_id] = [trip_id for trip_id in trip_ids
+                                                  if trip_id in open_trips and trip_id not in changed]
+                    trip_ids = [trip_id for trip_id in trip_ids if trip_id not in open_trips]
+                if trip_ids:
+                    duties[bus_id] = trip_ids
+                else:
+                    del duties[bus_id]
+        for bus_id in delta.removed_buses:
+            self.charging.pop(bus_id, None)
+            self.refueling.pop(bus_id, None)
+
+        previous_charging = {bus_id: self.charging.pop(bus_id) for bus_id in list(self.charging)
+                             if bus_id in open_buses}
+        previous_refueling = {bus_id: self.refueling.pop(bus_id) for bus_id in list(self.refueling)
+                              if bus_id in open_buses}
+        for bus_id in open_buses | delta.removed_buses:
+            self.depot.release_charging(bus_id)
+
+        sub_electric = [bus for bus in self.electric_buses if bus.bus_id in open_buses]
+        sub_diesel = [bus for bus in self.diesel_buses if bus.bus_id in open_buses]
+        sub_trips = [trip for trip in self.trips if trip.trip_id in open_trips]
+        new_ids = {trip.trip_id for trip in self.trips}
+        self.unassigned = [trip_id for trip_id in self.unassigned if trip_id in new_ids and trip_id not in open_trips]
+        print(f"{delta}: {len(sub_trips)} trips reopened on {len(sub_electric) + len(sub_diesel)} buses")
+
+        status = "unchanged"
+        if sub_trips:
+            status = self._solve(sub_electric, sub_diesel, sub_trips, previous, previous_charging,
+                                 previous_refueling)
+
+        self.stats = {
+            "open_trips": len(sub_trips),
+            "open_buses": len(sub_electric) + len(sub_diesel),
+            "kept_trips": len(self.trips) - len(sub_trips),
+            "status": status,
+            "unassigned": len(self.unassigned),
+            "seconds": time.perf_counter() - start,
+        }
+        return self.assignment
+
+    def _apply(self, delta):
+        """
+        Build the new instance from the delta.
+        """
+        retimed = {trip.trip_id: trip for trip in delta.retimed_trips}
+        self.trips = [retimed.get(trip.trip_id, trip) for trip in self.trips
+                      if trip.trip_id not in delta.removed_trips] + delta.added_trips
+
+        self.electric_buses = [bus for bus in self.electric_buses if bus.bus_id not in delta.removed_buses]
+        self.diesel_buses = [bus for bus in self.diesel_buses if bus.bus_id not in delta.removed_buses]
+        for bus in delta.added_buses:
+            if hasattr(bus, "charging_rate"):
+                self.electric_buses.append(bus)
+            else:
+                self.diesel_buses.append(bus)
+
+        chargers = [charger for charger in self.depot.chargers if charger.charger_id not in delta.removed_chargers]
+        self.depot = Depot(self.depot.location, self.electric_buses, self.diesel_buses,
+                           chargers + delta.added_chargers)
+
+    def _reopen(self, delta, old_trips):
+        """
+        Select the assignments to plan again.
+
+        Returns:
+        - Tuple (open_trips, open_buses) of trip IDs and bus IDs.
+        """
+        new_ids = {trip.trip_id for trip in self.trips}
+        touched = delta.removed_trips | {trip.trip_id for trip in delta.retimed_trips}
+        open_trips = {trip.trip_id for trip in delta.added_trips + delta.retimed_trips}
+        open_buses = {bus.bus_id for bus in delta.added_buses}
+
+        duty_of = {}
+        for duties in self.assignment.values():
+            for bus_id, trip_ids in duties.items():
+                for trip_id in trip_ids:
+                    duty_of[trip_id] = bus_id
+        for trip_id, bus_id in duty_of.items():
+            if trip_id in touched:
+                open_buses.add(bus_id)
+            if bus_id in delta.removed_buses and trip_id in new_ids:
+                open_trips.add(trip_id)
+
+        # The assigned trips nearest in start time to each changed trip (old and new times)
+        assigned = sorted((old_trips[trip_id].start_time, trip_id) for trip_id in duty_of
+                          if trip_id in new_ids and trip_id not in touched)
+        starts = [start_time for start_time, _ in assigned]
+        changed_starts = [old_trips[trip_id].start_time for trip_id in touched]
+        changed_starts += [trip.start_time for trip in delta.added_trips + delta.retimed_trips]
+        for start_time in changed_starts:
+            low = high = bisect_left(starts, start_time)
+            while high - low < self.neighborhood and (low > 0 or high < len(assigned)):
+                if high >= len(assigned) or (low > 0 and start_time - starts[low - 1] <= starts[high] - start_time):
+                    low -= 1
+                else:
+                    high += 1
+            open_trips.update(trip_id for _, trip_id in assigned[low:high])
+
+        # Slots where fewer chargers remain than buses charged in the previous schedule
+        if delta.removed_chargers:
+            charging = {}
+            for bus_id, slots in self.charging.items():
+                for time_slot in slots:
+                    charging.setdefault(time_slot, []).append(bus_id)
+            for time_slot, bus_ids in charging.items():
+                available = sum(1 for charger in self.depot.chargers if charger.is_available(time_slot) or
+                                charger.schedule[time_slot] in self.charging)
+                if len(bus_ids) > available:
+                    open_buses.update(bus_ids)
+                    open_trips.update(trip_id for trip_id, bus_id in duty_of.items()
+                                      if bus_id in bus_ids and trip_id in new_ids)
+
+        open_buses.update(duty_of[trip_id] for trip_id in open_trips if trip_id in duty_of)
+        open_buses -= delta.removed_buses
+
+        # A few idle buses of each type, with the most range, give the subproblem room to move trips
+        for buses in (self.electric_buses, self.diesel_buses):
+            idle = [bus for bus in buses if bus.bus_id not in open_buses and
+                    bus.bus_id not in self.assignment["electric"] and bus.bus_id not in self.assignment["diesel"]]
+            idle.sort(key=lambda bus: bus.remaining_range, reverse=True)
+            open_buses.update(bus.bus_id for bus in idle[:self.spare_buses])
+        return open_trips, open_buses
+
+    def _solve(self, electric_buses, diesel_buses, trips, previous, previous_charging, previous_refueling):
+        """
+        Solve the subproblem warm-started from the previous assignment and merge its solution into the
+        kept duties. Without a solution, the previous assignment of the reopened trips is restored and the
+        new and retimed trips stay unassigned.
+
+        Returns:
+        - "solved" or "no solution".
+        """
+        problem = type(self.problem)(electric_buses, diesel_buses, trips, self.depot, self.constraints,
+                                     sparse=self.problem.sparse, time_grid=self.problem.time_grid)
+        problem.load_warm_start(previous, previous_charging, previous_refueling)
+
+        solver = self.config.create()
+        options = {'warmstart': True} if solver.warm_start_capable() else {}
+        try:
+            results = solver.solve(problem.model, tee=self.tee, load_solutions=False, **options)
+        except Exception as error:  # solver missing or crashed
+            print(f"Solver failed ({error}); keeping the previous assignment.")
+            results = None
+        solved = (results is not None and len(results.solution) > 0 and
+                  results.solver.termination_condition in (TerminationCondition.optimal,
+                                                            TerminationCondition.feasible,
+                                                            TerminationCondition.maxTimeLimit))
+
+        if solved:
+            problem.model.solutions.load_from(results)
+            sub_assignment = problem.extract_assignment()
+            charging, refueling = {}, {}
+            for variables, events in ((problem.model.charge, charging), (problem.model.refuel, refueling)):
+                for (bus_id, time_slot), var in variables.items():
+                    if var.value is not None and var.value > 0.5:
+                        events.setdefault(bus_id, []).append(time_slot)
+        else:
+            print("No solution for the reopened trips; keeping the previous assignment.")
+            sub_assignment, charging, refueling = previous, previous_charging, previous_refueling
+
+        buses = {bus.bus_id: bus for bus in electric_buses}
+        for bus_id, slots in charging.items():
+            for time_slot in slots:
+                try:
+                    self.depot.schedule_charging(buses[bus_id], time_slot)
+                except ValueError:
+                    print(f"No charger free for bus {bus_id} at slot {time_slot}; charging session dropped.")
+                    continue
+                self.charging.setdefault(bus_id, []).append(time_slot)
+        for bus_id, slots in refueling.items():
+            self.refueling.setdefault(bus_id, []).extend(slots)
+
+        start_of = {trip.trip_id: trip.start_time for trip in self.trips}
+        served = set()
+        for bus_type, duties in sub_assignment.items():
+            for bus_id, trip_ids in duties.items():
+                if trip_ids:
+                    duty = self.assignment[bus_type].get(bus_id, []) + list(trip_ids)
+                    self.assignment[bus_type][bus_id] = sorted(duty, key=lambda trip_id: start_of[trip_id])
+                    served.update(trip_ids)
+        self.unassigned += [trip.trip_id for trip in trips if trip.trip_id not in served]
+        return "solved" if solved else "no solution"
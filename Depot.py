@@ -1,5 +1,6 @@
-from Bus.ElectricBus import ElectricBus
-from Bus.FuelBus import FuelBus
+from Bus.electricBus import ElectricBus
+from Bus.fuelBus import FuelBus
+from ChargerBooking import ChargerBooking
 class Depot:
     """
     Represents the depot where buses start, end, recharge, and refuel.
@@ -18,6 +19,18 @@ class Depot:
         self.electric_buses = electric_buses  # List of ElectricBus instances
         self.diesel_buses = diesel_buses      # List of DieselBus instances
         self.chargers = chargers              # List of Charger instances
+        self.booking = ChargerBooking(chargers)  # Hourly slot index over the charger schedules
+
+    def set_time_grid(self, time_grid):
+        """
+        Book the chargers in the slots of a time grid, so that the bookings and the charge variables of a
+        model on that grid use the same slot indices. Sessions must then end within the grid's horizon.
+
+        Parameters:
+        - time_grid: TimeGrid object.
+        """
+        self.booking = ChargerBooking(self.chargers, horizon=time_grid.num_slots,
+                                      slot_length=time_grid.slot_length)
 
     def assign_bus(self, bus, trip):
         """
@@ -43,22 +56,38 @@ class Depot:
         else:
             raise ValueError("Unknown bus type")
 
-    def schedule_charging(self, bus, time_slot):
+    def schedule_charging(self, bus, time_slot, num_slots=1, latest_start=None):
         """
         Schedule charging for an electric bus at the depot's available chargers.
 
         Parameters:
         - bus: ElectricBus object that needs to be charged.
-        - time_slot: Time slot for the charging session.
+        - time_slot: Time slot for the charging session, or with `latest_start` the earliest one.
+        - num_slots: Length of the session in time slots.
+        - latest_start: Optional latest start slot; the session then starts in the earliest slot from
+          `time_slot` to `latest_start` in which a charger is free.
+
+        Returns:
+        - Tuple (charger, start_slot) of the session booked.
 
         Raises:
         - ValueError if no charger is available at the given time slot.
         """
-        for charger in self.chargers:
-            if charger.is_available(time_slot):
-                charger.schedule_charging(bus.bus_id, time_slot)
-                return
-        raise ValueError("No available chargers at the specified time slot")
+        if latest_start is None:
+            latest_start = time_slot
+        try:
+            return self.booking.book(bus.bus_id, time_slot, num_slots, latest_start=latest_start)
+        except ValueError:
+            raise ValueError("No available chargers at the specified time slot") from None
+
+    def release_charging(self, bus_id, time_slot=None):
+        """
+        Cancel the charging sessions of a bus, or only the one starting at the given time slot.
+
+        Returns:
+        - Number of sessions cancelled.
+        """
+        return self.booking.release(bus_id, time_slot)
 
     def __str__(self):
         """
@@ -0,0 +1,205 @@
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+
+from SolverConfig import SolverConfig
+
+SOLVER_COMMANDS = {"glpk": "glpsol", "cbc": "cbc", "highs": "highs"}
+
+
+def _glpk_command(model_path, solution_path, config):
+    command = ["glpsol", "--mps" if model_path.endswith(".mps") else "--lp", model_path, "-o", solution_path]
+    if config.time_limit is not None:
+        command += ["--tmlim", str(int(max(1, config.time_limit)))]
+    if config.mip_gap is not None:
+        command += ["--mipgap", str(config.mip_gap)]
+    for option, value in config.options.items():
+        command += [f"--{option}"] + ([] if value is True else [str(value)])
+    return command
+
+
+def _read_glpk(solution_path):
+    """
+    Parse the printable solution written by `glpsol -o`.
+    """
+    status, objective, values = "unknown", None, {}
+    in_columns = False
+    with open(solution_path) as file:
+        for line in file:
+            if line.startswith("Status:"):
+                status = line.split(":", 1)[1].strip().lower()
+            elif line.startswith("Objective:"):
+                match = re.search(r"=\s*(\S+)", line)
+                objective = float(match.group(1)) if match else None
+            elif re.match(r"\s*No\.\s+Column name", line):
+                in_columns = True
+            elif in_columns:
+                match = re.match(r"\s*\d+\s+(x\d+)\s+\*?\s*(\S+)", line)
+                if match:
+                    values[match.group(1)] = float(match.group(2))
+                elif line.strip() and not line.startswith("---"):
+                    in_columns = False
+    if status in ("optimal", "integer optimal"):
+        status = "optimal"
+    elif status in ("feasible", "integer non-optimal"):
+        status = "feasible"
+    return status, objective, values
+
+
+def _cbc_command(model_path, solution_path, config):
+    command = ["cbc", model_path]
+    if config.time_limit is not None:
+        command += ["sec", str(config.time_limit)]
+    if config.mip_gap is not None:
+        command += ["ratio", str(config.mip_gap)]
+    if config.threads is not None:
+        command += ["threads", str(config.threads)]
+    for option, value in config.options.items():
+        command += [option, str(value)]
+    return command + ["solve", "solu", solution_path]
+
+
+def _read_cbc(solution_path):
+    """
+    Parse the solution written by `cbc ... solu`; only nonzero columns are listed.
+    """
+    values = {}
+    with open(solution_path) as file:
+        first = file.readline()
+        for line in file:
+            fields = line.replace("**", " ").split()
+            if len(fields) >= 3:
+                values[fields[1]] = float(fields[2])
+    lowered = first.lower()
+    if lowered.startswith("optimal"):
+        status = "optimal"
+    elif "infeasible" in lowered:
+        status = "infeasible"
+    elif values:
+        status = "feasible"  # stopped on time or gap with an incumbent
+    else:
+        status = "no solution"
+    match = re.search(r"objective value\s+(\S+)", first)
+    return status, (float(match.group(1)) if match else None), values
+
+
+def _highs_command(model_path, solution_path, config):
+    command = ["highs", "--model_file", model_path, "--solution_file", solution_path]
+    if config.time_limit is not None:
+        command += ["--time_limit", str(config.time_limit)]
+    options = _highs_options(config)
+    options.pop("time_limit", None)
+    if options:  # The other options are only read from an options file
+        options_path = os.path.join(os.path.dirname(solution_path), "highs.opt")
+        with open(options_path, "w") as file:
+            file.writelines(f"{option} = {value}\n" for option, value in options.items())
+        command += ["--options_file", options_path]
+    return command
+
+
+def _highs_options(config):
+    options = {"output_flag": "true" if config.verbose else "false"}
+    options.update(config.pyomo_options())
+    return options
+
+
+def _read_highs(solution_path):
+    """
+    Parse the raw solution file written by `highs --solution_file`.
+    """
+    status, objective, values = "unknown", None, {}
+    with open(solution_path) as file:
+        lines = file.read().splitlines()
+    for position, line in enumerate(lines):
+        if line.startswith("Model status") and position + 1 < len(lines):
+            status = lines[position + 1].strip().lower()
+        elif line.startswith("Objective"):
+            objective = float(line.split()[-1])
+        elif line.startswith("# Columns"):
+            for entry in lines[position + 1:position + 1 + int(line.split()[-1])]:
+                name, value = entry.split()[:2]
+                values[name] = float(value)
+            break
+    if status == "optimal":
+        return status, objective, values
+    return ("feasible" if values else status), objective, values
+
+
+def _solve_with_highspy(model_path, config):
+    """
+    Solve a model file with the HiGHS Python bindings when the `highs` executable is not installed.
+    """
+    import highspy
+    highs = highspy.Highs()
+    for option, value in _highs_options(config).items():
+        if option == "output_flag":
+            value = value == "true"
+        elif option in ("time_limit", "mip_rel_gap"):
+            value = float(value)
+        highs.setOptionValue(option, value)
+    highs.readModel(model_path)
+    highs.run()
+    model_status = highs.modelStatusToString(highs.getModelStatus()).lower()
+    info = highs.getInfo()
+    if info.primal_solution_status == 0:  # no primal solution
+        return model_status, None, {}
+    lp = highs.getLp()
+    column_values = highs.getSolution().col_value
+    values = dict(zip(lp.col_names_, column_values))
+    status = "optimal" if model_status == "optimal" else "feasible"
+    return status, info.objective_function_value, values
+
+
+RUNNERS = {
+    "glpk": (_glpk_command, _read_glpk),
+    "cbc": (_cbc_command, _read_cbc),
+    "highs": (_highs_command, _read_highs),
+}
+
+
+def solve_file(model_path, solver_name="glpk", time_limit=None, tee=False, config=None):
+    """
+    Solve an LP or MPS model file with a solver executable.
+
+    Parameters:
+    - model_path: Model file written by StreamingModel.write_lp (".lp") or write_mps (".mps").
+    - solver_name: "glpk" (glpsol), "cbc" or "highs". Without a `highs` executable, the highspy
+      bindings are used if installed.
+    - time_limit: Optional time limit in seconds.
+    - tee: Show the solver output.
+    - config: Optional SolverConfig (time limit, MIP gap, threads, verbosity); it replaces
+      `solver_name`, `time_limit` and `tee`.
+
+    Returns:
+    - Dictionary with the keys status ("optimal", "feasible", "infeasible", ...), objective (None without
+      solution) and values ({column name: value}; CBC only reports nonzero columns).
+
+    Raises:
+    - ValueError if the solver is unknown.
+    - RuntimeError if the solver executable is not installed.
+    """
+    if config is None:
+        config = SolverConfig(solver_name, time_limit=time_limit, verbose=tee)
+    solver_name, tee = config.solver_name, config.verbose
+    if solver_name not in RUNNERS:
+        raise ValueError(f"Unknown solver {solver_name}; choose from {sorted(RUNNERS)}")
+    if shutil.which(SOLVER_COMMANDS[solver_name]) is None:
+        if solver_name == "highs":
+            try:
+                status, objective, values = _solve_with_highspy(model_path, config)
+                return {"status": status, "objective": objective, "values": values}
+            except ImportError:
+                pass
+        raise RuntimeError(f"The {solver_name} executable ({SOLVER_COMMANDS[solver_name]}) is not installed")
+
+    build_command, read_solution = RUNNERS[solver_name]
+    with tempfile.TemporaryDirectory() as directory:
+        solution_path = os.path.join(directory, "solution.txt")
+        subprocess.run(build_command(os.path.abspath(model_path), solution_path, config), check=False,
+                       stdout=None if tee else subprocess.DEVNULL, stderr=None if tee else subprocess.STDOUT)
+        if not os.path.exists(solution_path):
+            return {"status": "error", "objective": None, "values": {}}
+        status, objective, values = read_solution(solution_path)
+    return {"status": status, "objective": objective, "values": values}
@@ -0,0 +1,63 @@
+class FleetRegistry:
+    """
+    Lookup tables for the entities of a routing problem, built once and shared by every constraint.
+    Gives O(1) access from an ID to its object and to its integer position in the input lists.
+    """
+    def __init__(self, electric_buses, diesel_buses, trips, chargers):
+        """
+        Initialize a FleetRegistry object.
+
+        Parameters:
+        - electric_buses: List of ElectricBus objects.
+        - diesel_buses: List of FuelBus objects.
+        - trips: List of Trip objects.
+        - chargers: List of Charger objects.
+        """
+        self.electric_by_id = {e.bus_id: e for e in electric_buses}
+        self.diesel_by_id = {d.bus_id: d for d in diesel_buses}
+        self.trip_by_id = {t.trip_id: t for t in trips}
+        self.charger_by_id = {c.charger_id: c for c in chargers}
+
+        self.electric_position = {e.bus_id: i for i, e in enumerate(electric_buses)}
+        self.diesel_position = {d.bus_id: i for i, d in enumerate(diesel_buses)}
+        self.trip_position = {t.trip_id: i for i, t in enumerate(trips)}
+        self.charger_position = {c.charger_id: i for i, c in enumerate(chargers)}
+
+    def electric_bus(self, bus_id):
+        """
+        Return the ElectricBus with the given ID.
+        """
+        return self.electric_by_id[bus_id]
+
+    def diesel_bus(self, bus_id):
+        """
+        Return the FuelBus with the given ID.
+        """
+        return self.diesel_by_id[bus_id]
+
+    def bus(self, bus_id):
+        """
+        Return the electric or diesel bus with the given ID.
+        """
+        if bus_id in self.electric_by_id:
+            return self.electric_by_id[bus_id]
+        return self.diesel_by_id[bus_id]
+
+    def trip(self, trip_id):
+        """
+        Return the Trip with the given ID.
+        """
+        return self.trip_by_id[trip_id]
+
+    def charger(self, charger_id):
+        """
+        Return the Charger with the given ID.
+        """
+        return self.charger_by_id[charger_id]
+
+    def __str__(self):
+        """
+        String representation of the FleetRegistry object.
+        """
+        return (f"FleetRegistry - Electric Buses: {len(self.electric_by_id)}, Diesel Buses: {len(self.diesel_by_id)}, "
+                f"Trips: {len(self.trip_by_id)}, Chargers: {len(self.charger_by_id)}")
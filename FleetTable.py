@@ -0,0 +1,200 @@
+import numpy as np
+
+from TripTable import numeric_column
+
+
+class BusView:
+    """
+    View of one row of a FleetTable with the attributes and methods of a Bus object. Only
+    `remaining_range` can be written; it is stored back in the table.
+    """
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @property
+    def bus_id(self):
+        return str(self.table.bus_ids[self.index])
+
+    @property
+    def is_electric(self):
+        return bool(self.table.is_electric[self.index])
+
+    @property
+    def capacity(self):
+        return self.table.capacity[self.index].item()
+
+    @property
+    def consumption_rate(self):
+        return self.table.consumption_rate[self.index].item()
+
+    @property
+    def max_range(self):
+        return self.table.max_range[self.index].item()
+
+    @property
+    def charging_rate(self):
+        return self.table.charging_rate[self.index].item()
+
+    @property
+    def remaining_range(self):
+        return self.table.remaining_range[self.index].item()
+
+    @remaining_range.setter
+    def remaining_range(self, value):
+        self.table.remaining_range[self.index] = value
+
+    def can_serve_trip(self, trip_distance):
+        """
+        Check if the bus has enough fuel/charge to serve a trip of the given distance.
+        """
+        return self.remaining_range >= trip_distance * self.consumption_rate
+
+    def __str__(self):
+        kind = "ElectricBus" if self.is_electric else "DieselBus"
+        return f"{kind} {self.bus_id} - Capacity: {self.capacity}, Remaining Range: {self.remaining_range}"
+
+
+class FleetTable:
+    """
+    Struct-of-arrays storage of a mixed fleet: one NumPy column per attribute instead of one object per bus.
+
+    Electric and diesel buses share the table and are told apart by `is_electric`; `charging_rate` is NaN
+    for diesel buses. Rows are read as BusView objects (`table[i]`, iteration) or converted back with
+    `to_objects`; vectorized code works on the columns directly, e.g. `can_serve` builds the whole
+    bus-trip compatibility matrix at once.
+    """
+    def __init__(self, bus_ids, is_electric, capacity, consumption_rate, max_range, charging_rate,
+                 remaining_range=None):
+        """
+        Initialize a FleetTable object from column sequences of equal length.
+
+        Parameters:
+        - bus_ids: Unique bus identifiers.
+        - is_electric: True for electric buses, False for diesel buses.
+        - capacity: Passenger capacities.
+        - consumption_rate: Consumption per distance unit.
+        - max_range: Full battery or tank ranges.
+        - charging_rate: Charging rates of the electric buses (ignored for diesel buses).
+        - remaining_range: Current ranges (default: full).
+        """
+        self.bus_ids = np.asarray(bus_ids, dtype=str)
+        self.is_electric = np.asarray(is_electric, dtype=bool)
+        self.capacity = numeric_column(capacity)
+        self.consumption_rate = np.asarray(consumption_rate, dtype=np.float64)
+        self.max_range = numeric_column(max_range)
+        self.charging_rate = np.where(self.is_electric, np.asarray(charging_rate, dtype=np.float64), np.nan)
+        self.remaining_range = (self.max_range.astype(np.float64) if remaining_range is None
+                                else np.asarray(remaining_range, dtype=np.float64).copy())
+        self._positions = None
+
+    @classmethod
+    def from_objects(cls, electric_buses, diesel_buses):
+        """
+        Build a FleetTable from lists of ElectricBus and FuelBus objects, electric buses first.
+        """
+        buses = list(electric_buses) + list(diesel_buses)
+        return cls([bus.bus_id for bus in buses],
+                   [True] * len(electric_buses) + [False] * len(diesel_buses),
+                   [bus.capacity for bus in buses],
+                   [bus.consumption_rate for bus in buses],
+                   [bus.max_range for bus in buses],
+                   [bus.charging_rate for bus in electric_buses] + [np.nan] * len(diesel_buses),
+                   [bus.remaining_range for bus in buses])
+
+    @classmethod
+    def from_arrays(cls, bus_ids, is_electric, capacity, consumption_rate, max_range, charging_rate,
+                    remaining_range):
+        """
+        Build a FleetTable directly on existing columns, without copying them (e.g. memory-mapped arrays).
+        `remaining_range` is written by BusView and must be a writable array.
+        """
+        table = cls.__new__(cls)
+        table.bus_ids = bus_ids
+        table.is_electric = is_electric
+        table.capacity = capacity
+        table.consumption_rate = consumption_rate
+        table.max_range = max_range
+        table.charging_rate = charging_rate
+        table.remaining_range = remaining_range
+        table._positions = None
+        return table
+
+    def to_objects(self):
+        """
+        Convert the table to ElectricBus and FuelBus objects.
+
+        Returns:
+        - Tuple (electric_buses, diesel_buses).
+        """
+        from Bus.electricBus import ElectricBus
+        from Bus.fuelBus import FuelBus
+        electric_buses, diesel_buses = [], []
+        for bus_id, is_electric, capacity, consumption_rate, max_range, charging_rate, remaining_range in zip(
+                self.bus_ids.tolist(), self.is_electric.tolist(), self.capacity.tolist(),
+                self.consumption_rate.tolist(), self.max_range.tolist(), self.charging_rate.tolist(),
+                self.remaining_range.tolist()):
+            if is_electric:
+                bus = ElectricBus(bus_id, capacity, consumption_rate, max_range, charging_rate)
+                electric_buses.append(bus)
+            else:
+                bus = FuelBus(bus_id, capacity, consumption_rate, max_range)
+                diesel_buses.append(bus)
+            if remaining_range != max_range:
+                bus.remaining_range = remaining_range
+        return electric_buses, diesel_buses
+
+    def position(self, bus_id):
+        """
+        Row index of a bus.
+
+        Raises:
+        - KeyError if the bus is unknown.
+        """
+        if self._positions is None:
+            self._positions = {str(bus_id): index for index, bus_id in enumerate(self.bus_ids)}
+        return self._positions[bus_id]
+
+    def can_serve(self, trips, num_time_slots=None, rows=None):
+        """
+        Bus-trip compatibility: enough remaining range, enough seats and, if `num_time_slots` is given,
+        a trip inside the planning horizon (the checks of `RoutingProblem._can_serve`).
+
+        Parameters:
+        - trips: TripTable.
+        - num_time_slots: Optional planning horizon.
+        - rows: Optional bus row indices or boolean mask to restrict the matrix to.
+
+        Returns:
+        - Boolean matrix [bus, trip].
+        """
+        selection = slice(None) if rows is None else rows
+        remaining = self.remaining_range[selection]
+        rate = self.consumption_rate[selection]
+        capacity = self.capacity[selection]
+        compatible = ((remaining[:, None] >= trips.distance[None, :] * rate[:, None]) &
+                      (capacity[:, None] >= trips.demand[None, :]))
+        if num_time_slots is not None:
+            compatible &= trips.fits_time_window(num_time_slots)[None, :]
+        return compatible
+
+    def nbytes(self):
+        """
+        Memory held by the columns, in bytes.
+        """
+        return sum(column.nbytes for column in (self.bus_ids, self.is_electric, self.capacity,
+                                                 self.consumption_rate, self.max_range, self.charging_rate,
+                                                 self.remaining_range))
+
+    def __len__(self):
+        return len(self.bus_ids)
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError("bus index out of range")
+        return BusView(self, index % len(self))
+
+    def __iter__(self):
+        return (BusView(self, index) for index in range(len(self)))
@@ -0,0 +1,150 @@
+import heapq
+
+
+class GreedyScheduler:
+    """
+    Fast constructive scheduler working directly on the Trip, ElectricBus and FuelBus objects.
+
+    Trips are taken in order of start time. Buses returning from a trip wait in a heap keyed by the time
+    they become available; once free, they move to an idle heap keyed by remaining range, and each trip
+    goes to the idle bus with the most range that has enough seats. An electric bus short on range is
+    recharged at the depot in the earliest free slot before the trip (`Depot.schedule_charging`); a diesel bus
+    is refueled. The bus objects themselves are not modified.
+    """
+    def __init__(self, electric_buses, diesel_buses, trips, depot, replenish=True):
+        """
+        Initialize a GreedyScheduler object.
+
+        Parameters:
+        - electric_buses: List of ElectricBus objects.
+        - diesel_buses: List of FuelBus objects.
+        - trips: List of Trip objects.
+        - depot: Depot object whose chargers are booked for recharges.
+        - replenish: If False, buses never recharge or refuel, so every duty fits in the remaining range
+          and no charger is booked.
+        """
+        self.electric_buses = electric_buses
+        self.diesel_buses = diesel_buses
+        self.trips = trips
+        self.depot = depot
+        self.replenish = replenish
+        self.assignment = None
+        self.charging = {}    # bus_id -> list of charging slots of the depot booking
+        self.refueling = {}   # bus_id -> list of refueling times
+        self.unassigned = []  # trip IDs no bus could serve
+        self.booked = []      # (bus_id, start_slot) of the sessions this scheduler holds on the depot
+
+    def schedule(self):
+        """
+        Build the schedule. Charging sessions are booked on the depot chargers; those of a previous
+        call are released first.
+
+        Returns:
+        - Assignment dictionary {"electric": {bus_id: [trip_ids]}, "diesel": {bus_id: [trip_ids]}}.
+        """
+        self.release()
+        self.assignment = {"electric": {}, "diesel": {}}
+        self.charging = {}
+        self.refueling = {}
+        self.unassigned = []
+
+        # Per-bus state: [remaining_range, available_time]
+        states = {}
+        busy = []  # (available_time, -remaining_range, seq, bus_type, bus)
+        idle = {"electric": [], "diesel": []}  # (-remaining_range, seq, bus)
+        seq = 0
+        for bus_type, buses in (("electric", self.electric_buses), ("diesel", self.diesel_buses)):
+            for bus in buses:
+                states[bus.bus_id] = [bus.remaining_range, 0]
+                heapq.heappush(idle[bus_type], (-bus.remaining_range, seq, bus))
+                seq += 1
+
+        for trip in sorted(self.trips, key=lambda trip: (trip.start_time, trip.end_time)):
+            # Release the buses that are back before the trip starts
+            while busy and busy[0][0] <= trip.start_time:
+                _, neg_range, _, bus_type, bus = heapq.heappop(busy)
+                heapq.heappush(idle[bus_type], (neg_range, seq, bus))
+                seq += 1
+
+            chosen = None
+            for bus_type in ("electric", "diesel"):
+                chosen = self._pick_bus(idle[bus_type], states, bus_type, trip)
+                if chosen is not None:
+                    break
+            if chosen is None:
+                self.unassigned.append(trip.trip_id)
+                continue
+
+            bus_type, bus = chosen
+            state = states[bus.bus_id]
+            state[0] -= trip.distance * bus.consumption_rate
+            state[1] = trip.end_time
+            self.assignment[bus_type].setdefault(bus.bus_id, []).append(trip.trip_id)
+            heapq.heappush(busy, (state[1], -state[0], seq, bus_type, bus))
+            seq += 1
+
+        return self.assignment
+
+    def _pick_bus(self, heap, states, bus_type, trip):
+        """
+        Take the idle bus with the most range that can serve the trip, recharging or refueling it first
+        when its range is short. Buses passed over are put back in the heap.
+
+        Returns:
+        - Tuple (bus_type, bus), or None if no idle bus of this type can serve the trip.
+        """
+        skipped = []
+        chosen = None
+        while heap:
+            entry = heapq.heappop(heap)
+            bus = entry[2]
+            if bus.capacity < trip.demand:
+                skipped.append(entry)
+                continue
+            energy = trip.distance * bus.consumption_rate
+            state = states[bus.bus_id]
+            if state[0] >= energy or (self.replenish and bus.max_range >= energy
+                                      and self._replenish(bus_type, bus, state, trip)):
+                chosen = (bus_type, bus)
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        return chosen
+
+    def _replenish(self, bus_type, bus, state, trip):
+        """
+        Bring a bus back to full range before a trip.
+
+        Electric buses book the earliest free charger slot between their return and the trip start.
+        Diesel buses refuel when they return.
+
+        Returns:
+        - True if the bus was recharged or refueled, False otherwise.
+        """
+        if bus_type == "diesel":
+            self.refueling.setdefault(bus.bus_id, []).append(state[1])
+            state[0] = bus.max_range
+            return True
+
+        booking = self.depot.booking
+        # The one-slot session starts once the bus is back and must end before the trip starts
+        try:
+            _, time_slot = self.depot.schedule_charging(bus, booking.first_slot_from(state[1]),
+                                                        latest_start=booking.last_start_before(trip.start_time))
+        except ValueError:
+            return False
+        self.booked.append((bus.bus_id, time_slot))
+        self.charging.setdefault(bus.bus_id, []).append(time_slot)
+        state[0] = bus.max_range
+        state[1] = (time_slot + 1) * booking.slot_length
+        return True
+
+    def release(self):
+        """
+        Cancel the charging sessions this scheduler booked on the depot. The charging plan in
+        `self.charging` is kept.
+        """
+        for bus_id, time_slot in self.booked:
+            self.depot.release_charging(bus_id, time_slot)
+        self.booked = []
@@ -0,0 +1,79 @@
+import random
+
+from Bus.electricBus import ElectricBus
+from Bus.fuelBus import FuelBus
+from Trip import Trip
+from Charger import Charger
+from Depot import Depot
+
+
+def generate_instance(num_electric_buses=500, num_diesel_buses=1500, num_trips=5000, num_chargers=100,
+                      time_slots=24, num_locations=10, seed=None):
+    """
+    Generate a random mixed-fleet instance.
+
+    Buses, trips and chargers are drawn from the same distributions as the example in main.py. Trips start
+    between the first quarter of the day and two slots before its end (6 AM to 10 PM for 24 hourly slots)
+    and last at least one slot.
+
+    Parameters:
+    - num_electric_buses: Number of ElectricBus objects.
+    - num_diesel_buses: Number of FuelBus objects.
+    - num_trips: Number of Trip objects.
+    - num_chargers: Number of Charger objects at the depot.
+    - time_slots: Number of time slots of the day.
+    - num_locations: Number of locations trips start and end at.
+    - seed: Seed of the random generator; the same seed gives the same instance.
+
+    Returns:
+    - Tuple (electric_buses, diesel_buses, trips, chargers, depot).
+    """
+    rng = random.Random(seed)
+    first_start, last_start = time_slots // 4, time_slots - 2
+
+    electric_buses = [
+        ElectricBus(
+            bus_id=f"E{i+1}",
+            capacity=rng.randint(30, 60),
+            consumption_rate=round(rng.uniform(0.15, 0.3), 2),
+            battery_capacity=rng.randint(100, 200),
+            charging_rate=rng.randint(10, 20)
+        )
+        for i in range(num_electric_buses)
+    ]
+
+    diesel_buses = [
+        FuelBus(
+            bus_id=f"D{i+1}",
+            capacity=rng.randint(40, 70),
+            consumption_rate=round(rng.uniform(0.08, 0.15), 2),
+            fuel_capacity=rng.randint(200, 300)
+        )
+        for i in range(num_diesel_buses)
+    ]
+
+    trips = [
+        Trip(
+            trip_id=f"T{i+1}",
+            start_time=rng.randint(first_start, last_start),
+            end_time=rng.randint(first_start, last_start),  # adjusted below to ensure end_time > start_time
+            distance=rng.randint(10, 50),  # Random trip distance between 10 and 50 miles
+            demand=rng.randint(20, 60),  # Random demand between 20 and 60 passengers
+            origin=f"Location{rng.randint(1, num_locations)}",
+            destination=f"Location{rng.randint(1, num_locations)}"
+        )
+        for i in range(num_trips)
+    ]
+
+    # Adjust trips to ensure end_time > start_time
+    for trip in trips:
+        if trip.end_time <= trip.start_time:
+            trip.end_time = trip.start_time + rng.randint(1, 2)
+
+    chargers = [
+        Charger(charger_id=f"C{i+1}", charging_rate=rng.randint(10, 20))
+        for i in range(num_chargers)
+    ]
+
+    depot = Depot(location="Depot", electric_buses=electric_buses, diesel_buses=diesel_buses, chargers=chargers)
+    return electric_buses, diesel_buses, trips, chargers, depot
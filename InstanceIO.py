@@ -0,0 +1,152 @@
+import json
+import os
+
+import numpy as np
+
+from Charger import Charger
+from Depot import Depot
+from FleetTable import FleetTable
+from TripTable import TripTable
+
+FORMAT_NAME = "mixed-fleet-instance"
+FORMAT_VERSION = 1
+HEADER_FILE = "header.json"
+
+FLEET_COLUMNS = ("bus_ids", "is_electric", "capacity", "consumption_rate", "max_range", "charging_rate",
+                 "remaining_range")
+TRIP_COLUMNS = ("trip_ids", "start_time", "end_time", "distance", "demand", "origin", "destination")
+CHARGER_COLUMNS = ("charger_ids", "charging_rate")
+
+
+def save_tables(path, fleet, trips, chargers, depot_location):
+    """
+    Save an instance held in tables.
+
+    The instance is a directory with one `.npy` file per column, which can be memory-mapped, and a
+    small JSON header holding the counts, the location names, the depot, the charger bookings and the
+    dtype and shape of every column.
+
+    Parameters:
+    - path: Directory to write (created if missing; existing instance files are overwritten).
+    - fleet: FleetTable.
+    - trips: TripTable.
+    - chargers: List of Charger objects.
+    - depot_location: Location of the depot.
+    """
+    os.makedirs(path, exist_ok=True)
+    columns = {}
+    for prefix, table, names in (("fleet", fleet, FLEET_COLUMNS), ("trips", trips, TRIP_COLUMNS)):
+        for name in names:
+            columns[f"{prefix}.{name}"] = np.asarray(getattr(table, name))
+    columns["chargers.charger_ids"] = np.asarray([charger.charger_id for charger in chargers], dtype=str)
+    columns["chargers.charging_rate"] = np.asarray([charger.charging_rate for charger in chargers])
+
+    for name, column in columns.items():
+        np.save(os.path.join(path, f"{name}.npy"), column, allow_pickle=False)
+
+    header = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "num_buses": len(fleet),
+        "num_trips": len(trips),
+        "num_chargers": len(chargers),
+        "depot": depot_location,
+        "locations": trips.locations,
+        # JSON keys are strings; the slots are restored as numbers on load
+        "charger_schedules": [[[time_slot, bus_id] for time_slot, bus_id in charger.schedule.items()]
+                              for charger in chargers],
+        "columns": {name: {"dtype": column.dtype.str, "shape": list(column.shape)}
+                    for name, column in columns.items()},
+    }
+    with open(os.path.join(path, HEADER_FILE), "w") as file:
+        json.dump(header, file, indent=2)
+
+
+def save_instance(path, electric_buses, diesel_buses, trips, chargers, depot):
+    """
+    Save an instance made of objects, e.g. the output of `InstanceGenerator.generate_instance`.
+
+    Parameters:
+    - path: Directory to write.
+    - electric_buses: List of ElectricBus objects.
+    - diesel_buses: List of FuelBus objects.
+    - trips: List of Trip objects.
+    - chargers: List of Charger objects.
+    - depot: Depot object.
+    """
+    save_tables(path, FleetTable.from_objects(electric_buses, diesel_buses), TripTable.from_objects(trips),
+                chargers, depot.location)
+
+
+def read_header(path):
+    """
+    Read and check the header of a saved instance.
+
+    Raises:
+    - ValueError if the directory does not hold an instance of a supported version.
+    """
+    with open(os.path.join(path, HEADER_FILE)) as file:
+        header = json.load(file)
+    if header.get("format") != FORMAT_NAME or header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} version {FORMAT_VERSION} directory")
+    return header
+
+
+def load_tables(path, mmap=True):
+    """
+    Load an instance as tables.
+
+    With `mmap=True` the columns are memory-mapped read-only: nothing is read from disk until a column
+    is used, so loading takes milliseconds whatever the instance size. Only the remaining ranges of the
+    fleet are copied, since they change while scheduling.
+
+    Parameters:
+    - path: Directory written by `save_tables` or `save_instance`.
+    - mmap: Memory-map the columns instead of reading them into memory.
+
+    Returns:
+    - Tuple (fleet, trips, chargers, depot_location) with a FleetTable, a TripTable and a list of
+      Charger objects.
+
+    Raises:
+    - ValueError if the header is not supported or a column does not match it.
+    """
+    header = read_header(path)
+    columns = {}
+    for name, spec in header["columns"].items():
+        column = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None, allow_pickle=False)
+        if column.dtype.str != spec["dtype"] or list(column.shape) != spec["shape"]:
+            raise ValueError(f"Column {name} does not match the instance header")
+        columns[name] = column
+
+    fleet = FleetTable.from_arrays(*(columns[f"fleet.{name}"] for name in FLEET_COLUMNS[:-1]),
+                                   np.array(columns["fleet.remaining_range"]))
+    trips = TripTable.from_arrays(*(columns[f"trips.{name}"] for name in TRIP_COLUMNS), header["locations"])
+
+    chargers = []
+    for charger_id, charging_rate, schedule in zip(columns["chargers.charger_ids"],
+                                                   columns["chargers.charging_rate"],
+                                                   header["charger_schedules"]):
+        charger = Charger(str(charger_id), charging_rate.item())
+        for time_slot, bus_id in schedule:
+            charger.schedule_charging(bus_id, time_slot)
+        chargers.append(charger)
+    return fleet, trips, chargers, header["depot"]
+
+
+def load_instance(path, mmap=True):
+    """
+    Load an instance as objects, in the form returned by `InstanceGenerator.generate_instance`.
+
+    Parameters:
+    - path: Directory written by `save_tables` or `save_instance`.
+    - mmap: Memory-map the columns while the objects are built.
+
+    Returns:
+    - Tuple (electric_buses, diesel_buses, trips, chargers, depot).
+    """
+    fleet, trips, chargers, depot_location = load_tables(path, mmap=mmap)
+    electric_buses, diesel_buses = fleet.to_objects()
+    depot = Depot(location=depot_location, electric_buses=electric_buses, diesel_buses=diesel_buses,
+                  chargers=chargers)
+    return electric_buses, diesel_buses, trips.to_objects(), chargers, depot
@@ -0,0 +1,289 @@
+from array import array
+
+import numpy as np
+
+TERMS_PER_LINE = 8  # LP readers limit the line length; long rows continue on the next line
+
+
+class ModelIndex:
+    """
+    Column numbering of the RoutingProblem variables, without creating Pyomo variables.
+
+    The blocks x_e, x_d, charge, refuel, z_e and z_d are dictionaries from the Pyomo index of a variable
+    to its column number; columns are numbered block by block in that order and named "x<column>" in the
+    written files.
+    """
+    def __init__(self, problem):
+        """
+        Initialize a ModelIndex object.
+
+        Parameters:
+        - problem: RoutingProblem (its `sparse` setting decides which assignment pairs exist, its time
+          grid which charge and refuel slots exist).
+        """
+        electric_pairs = problem._assignment_pairs(problem.electric_buses)
+        diesel_pairs = problem._assignment_pairs(problem.diesel_buses)
+        self._number(electric_pairs, diesel_pairs,
+                     [e.bus_id for e in problem.electric_buses], [d.bus_id for d in problem.diesel_buses],
+                     problem._replenish_keys(problem.electric_buses, electric_pairs),
+                     problem._replenish_keys(problem.diesel_buses, diesel_pairs))
+
+    def _number(self, electric_pairs, diesel_pairs, electric_ids, diesel_ids, charge_keys, refuel_keys):
+        """
+        Number all columns from the assignment pairs, the charge and refuel keys and the bus IDs.
+        """
+        self.num_columns = 0
+        self.electric_pairs = electric_pairs
+        self.diesel_pairs = diesel_pairs
+        self.electric_ids = electric_ids
+        self.diesel_ids = diesel_ids
+        self.x_e = self._block(electric_pairs)
+        self.x_d = self._block(diesel_pairs)
+        self.charge = self._block(charge_keys)
+        self.refuel = self._block(refuel_keys)
+        self.z_e = self._block(electric_ids)
+        self.z_d = self._block(diesel_ids)
+
+    def to_dict(self):
+        """
+        JSON-serializable description of the numbering, restored by `from_dict`.
+        """
+        return {"electric_pairs": self.electric_pairs, "diesel_pairs": self.diesel_pairs,
+                "electric_ids": self.electric_ids, "diesel_ids": self.diesel_ids,
+                "charge_keys": list(self.charge), "refuel_keys": list(self.refuel)}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild a ModelIndex from `to_dict` output, without the problem.
+        """
+        index = cls.__new__(cls)
+        index._number([tuple(pair) for pair in data["electric_pairs"]], [tuple(pair) for pair in data["diesel_pairs"]],
+                      data["electric_ids"], data["diesel_ids"], [tuple(key) for key in data["charge_keys"]],
+                      [tuple(key) for key in data["refuel_keys"]])
+        return index
+
+    def _block(self, keys):
+        """
+        Number the given variable keys after the existing columns.
+        """
+        block = {key: self.num_columns + position for position, key in enumerate(keys)}
+        self.num_columns += len(block)
+        return block
+
+    def assignment(self, values):
+        """
+        Read the bus-trip assignment from column values.
+
+        Parameters:
+        - values: Dictionary {column name: value} as returned by FileSolver.
+
+        Returns:
+        - Assignment dictionary {"electric": {bus_id: [trip_ids]}, "diesel": {bus_id: [trip_ids]}}.
+        """
+        assignment = {"electric": {}, "diesel": {}}
+        num_electric = len(self.electric_pairs)
+        for name, value in values.items():
+            column = int(name[1:])
+            if value < 0.5 or column >= num_electric + len(self.diesel_pairs):
+                continue
+            if column < num_electric:
+                bus_id, trip_id = self.electric_pairs[column]
+                assignment["electric"].setdefault(bus_id, []).append(trip_id)
+            else:
+                bus_id, trip_id = self.diesel_pairs[column - num_electric]
+                assignment["diesel"].setdefault(bus_id, []).append(trip_id)
+        return assignment
+
+
+class CSRModel:
+    """
+    The model as a compressed sparse row matrix: rows `indptr`/`indices`/`data`, one `sense`
+    ("<", ">" or "=") and `rhs` per row, and the `objective` coefficients of all columns. All columns are
+    binary.
+    """
+    def __init__(self, indptr, indices, data, sense, rhs, objective, row_counts):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.sense = sense
+        self.rhs = rhs
+        self.objective = objective
+        self.row_counts = row_counts  # constraint class name -> number of rows
+
+    @property
+    def shape(self):
+        return len(self.rhs), len(self.objective)
+
+    def to_scipy(self):
+        """
+        The constraint matrix as a scipy.sparse.csr_matrix (requires scipy).
+        """
+        from scipy.sparse import csr_matrix
+        return csr_matrix((self.data, self.indices, self.indptr), shape=self.shape)
+
+
+class StreamingModel:
+    """
+    Writes a RoutingProblem straight to an LP or MPS file, or to a CSR matrix, from the `rows` of its
+    constraints.
+
+    No Pyomo variable, constraint or expression is created: each row is a short list of column numbers and
+    coefficients that is formatted or packed into arrays and dropped. Build the problem with
+    `build_model=False` so the Pyomo model is skipped as well, then hand the file to a solver with
+    `FileSolver.solve_file`.
+    """
+    def __init__(self, problem):
+        """
+        Initialize a StreamingModel object.
+
+        Parameters:
+        - problem: RoutingProblem whose constraints implement `rows`.
+        """
+        self.problem = problem
+        self.index = ModelIndex(problem)
+        self.row_counts = {}
+
+    def objective(self):
+        """
+        Objective coefficients of the charge and refuel columns (see `RoutingProblem._define_objective`).
+
+        Yields:
+        - Tuples (column, coefficient).
+        """
+        electric_cost = self.problem.FIXED_COST_ELECTRIC + self.problem.UNIT_COST_ELECTRIC
+        diesel_cost = self.problem.FIXED_COST_DIESEL + self.problem.UNIT_COST_DIESEL
+        for column in self.index.charge.values():
+            yield column, electric_cost
+        for column in self.index.refuel.values():
+            yield column, diesel_cost
+
+    def rows(self):
+        """
+        Rows of all constraints, in the order of the constraints list. Rows without terms are checked and
+        left out. `row_counts` is updated as the rows are produced.
+
+        Yields:
+        - Tuples (columns, coefficients, sense, rhs).
+
+        Raises:
+        - ValueError if a row without terms can never be satisfied.
+        """
+        problem = self.problem
+        self.row_counts = {}
+        for constraint in problem.constraints:
+            name = type(constraint).__name__
+            self.row_counts[name] = 0
+            for columns, coefficients, sense, rhs in constraint.rows(
+                    self.index, electric_buses=problem.electric_buses, diesel_buses=problem.diesel_buses,
+                    trips=problem.trips, chargers=problem.depot.chargers, registry=problem.registry,
+                    succession_index=problem._succession_index_for(constraint), time_grid=problem.time_grid):
+                if not columns:
+                    if not ((sense == "<=" and 0 <= rhs) or (sense == ">=" and 0 >= rhs) or
+                            (sense == "=" and rhs == 0)):
+                        raise ValueError(f"{name} produced a row without terms that cannot hold: 0 {sense} {rhs}")
+                    continue
+                self.row_counts[name] += 1
+                yield columns, coefficients, sense, rhs
+
+    @staticmethod
+    def _terms(columns, coefficients):
+        """
+        Format a linear expression, a few terms per line.
+        """
+        terms = [f"{coefficient:+.12g} x{column}" for column, coefficient in zip(columns, coefficients)]
+        if len(terms) <= TERMS_PER_LINE:
+            return " ".join(terms)
+        return "\n   ".join(" ".join(terms[start:start + TERMS_PER_LINE])
+                             for start in range(0, len(terms), TERMS_PER_LINE))
+
+    def write_lp(self, path):
+        """
+        Stream the model to a file in CPLEX LP format, readable by GLPK (`--lp`), CBC and HiGHS.
+
+        Parameters:
+        - path: File to write.
+
+        Returns:
+        - Dictionary {constraint class name: number of rows written}.
+        """
+        with open(path, "w") as file:
+            file.write("\\ Mixed fleet routing model\nMinimize\n")
+            objective = list(zip(*self.objective())) or [(0,), (0,)]
+            file.write(f" obj: {self._terms(*objective)}\n")
+
+            file.write("Subject To\n")
+            for row, (columns, coefficients, sense, rhs) in enumerate(self.rows()):
+                file.write(f" r{row}: {self._terms(columns, coefficients)} {sense} {rhs:.12g}\n")
+
+            file.write("Binaries\n")
+            for start in range(0, self.index.num_columns, TERMS_PER_LINE * 2):
+                stop = min(start + TERMS_PER_LINE * 2, self.index.num_columns)
+                file.write(" " + " ".join(f"x{column}" for column in range(start, stop)) + "\n")
+            file.write("End\n")
+        return dict(self.row_counts)
+
+    def to_csr(self):
+        """
+        Pack the model into a CSRModel. Rows are accumulated in typed arrays, not Python lists.
+
+        Returns:
+        - CSRModel.
+        """
+        indptr, indices, data, rhs = array("q", [0]), array("q"), array("d"), array("d")
+        sense = bytearray()
+        for columns, coefficients, row_sense, row_rhs in self.rows():
+            indices.extend(columns)
+            data.extend(coefficients)
+            indptr.append(len(indices))
+            sense.append(ord(row_sense[0]))
+            rhs.append(row_rhs)
+
+        objective = np.zeros(self.index.num_columns)
+        for column, coefficient in self.objective():
+            objective[column] = coefficient
+        return CSRModel(np.frombuffer(indptr, dtype=np.int64), np.frombuffer(indices, dtype=np.int64),
+                        np.frombuffer(data, dtype=np.float64), np.frombuffer(bytes(sense), dtype="S1"),
+                        np.frombuffer(rhs, dtype=np.float64), objective, dict(self.row_counts))
+
+    def write_mps(self, path, csr=None):
+        """
+        Write the model in free MPS format. MPS lists the matrix by column, so the rows are first packed
+        into a CSR matrix (see `to_csr`) and transposed.
+
+        Parameters:
+        - path: File to write.
+        - csr: Optional CSRModel already built for this model.
+
+        Returns:
+        - Dictionary {constraint class name: number of rows written}.
+        """
+        if csr is None:
+            csr = self.to_csr()
+        num_rows, num_columns = csr.shape
+        row_of_entry = np.repeat(np.arange(num_rows), np.diff(csr.indptr))
+        order = np.argsort(csr.indices, kind="stable")
+        column_starts = np.searchsorted(csr.indices[order], np.arange(num_columns + 1))
+        row_types = {b"<": "L", b">": "G", b"=": "E"}
+
+        with open(path, "w") as file:
+            file.write("NAME routing\nROWS\n N obj\n")
+            for row, row_sense in enumerate(csr.sense):
+                file.write(f" {row_types[bytes(row_sense)]} r{row}\n")
+
+            file.write("COLUMNS\n    MARKER 'MARKER' 'INTORG'\n")
+            for column in range(num_columns):
+                file.write(f"    x{column} obj {csr.objective[column]:.12g}\n")
+                for entry in order[column_starts[column]:column_starts[column + 1]]:
+                    file.write(f"    x{column} r{row_of_entry[entry]} {csr.data[entry]:.12g}\n")
+            file.write("    MARKER 'MARKER' 'INTEND'\n")
+
+            file.write("RHS\n")
+            for row in np.flatnonzero(csr.rhs):
+                file.write(f"    rhs r{row} {csr.rhs[row]:.12g}\n")
+
+            file.write("BOUNDS\n")
+            for column in range(num_columns):
+                file.write(f" BV bnd x{column}\n")
+            file.write("ENDATA\n")
+        return dict(csr.row_counts)
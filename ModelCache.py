@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from LPWriter import ModelIndex
+
+CACHE_VERSION = 2  # Bump when the model generation changes, so old entries are never reused
+INDEX_FILE = "index.json"
+
+
+class ModelCache:
+    """
+    On-disk cache of generated model files, keyed by a hash of everything the model depends on.
+
+    Each entry is a directory holding the model file written by StreamingModel (LP or MPS) and the
+    variable numbering (`ModelIndex`) needed to read a solution back. Entries are evicted least recently
+    used first once the cache grows beyond `max_bytes`; a hit refreshes the entry's access time.
+    """
+    def __init__(self, directory, max_bytes=2 ** 30, file_format="lp"):
+        """
+        Initialize a ModelCache object.
+
+        Parameters:
+        - directory: Cache directory (created if missing).
+        - max_bytes: Size bound of the cache on disk.
+        - file_format: "lp" or "mps".
+        """
+        if file_format not in ("lp", "mps"):
+            raise ValueError("file_format must be 'lp' or 'mps'")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.file_format = file_format
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, problem):
+        """
+        Hash of the instance data, the constraint list (class and parameters of each constraint) and the
+        formulation options of a RoutingProblem.
+
+        Returns:
+        - Hexadecimal SHA-256 digest.
+        """
+        digest = hashlib.sha256()
+
+        def feed(*values):
+            digest.update(repr(values).encode())
+            digest.update(b"\n")
+
+        feed("version", CACHE_VERSION, self.file_format)
+        feed("options", type(problem).__name__, problem.sparse, problem.time_grid.key(),
+             problem.FIXED_COST_ELECTRIC, problem.UNIT_COST_ELECTRIC, problem.FIXED_COST_DIESEL,
+             problem.UNIT_COST_DIESEL)
+        for constraint in problem.constraints:
+            feed("constraint", type(constraint).__module__, type(constraint).__qualname__,
+                 sorted(vars(constraint).items()))
+        for bus in problem.electric_buses:
+            feed("electric", bus.bus_id, bus.capacity, bus.consumption_rate, bus.max_range, bus.remaining_range,
+                 bus.charging_rate)
+        for bus in problem.diesel_buses:
+            feed("diesel", bus.bus_id, bus.capacity, bus.consumption_rate, bus.max_range, bus.remaining_range)
+        for trip in problem.trips:
+            feed("trip", trip.trip_id, trip.start_time, trip.end_time, trip.distance, trip.demand, trip.origin,
+                 trip.destination)
+        for charger in problem.depot.chargers:
+            feed("charger", charger.charger_id, charger.charging_rate, sorted(charger.schedule.items()))
+        feed("depot", problem.depot.location)
+        return digest.hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key)
+
+    def _model_path(self, key):
+        return os.path.join(self._entry(key), f"model.{self.file_format}")
+
+    def get(self, key):
+        """
+        Look up an entry.
+
+        Returns:
+        - Tuple (model_path, index) with the cached model file and its ModelIndex, or None on a miss.
+        """
+        model_path = self._model_path(key)
+        index_path = os.path.join(self._entry(key), INDEX_FILE)
+        if not (os.path.exists(model_path) and os.path.exists(index_path)):
+            return None
+        with open(index_path) as file:
+            index = ModelIndex.from_dict(json.load(file))
+        now = time.time()
+        os.utime(self._entry(key), (now, now))
+        return model_path, index
+
+    def put(self, key, stream):
+        """
+        Generate the model file of a StreamingModel into the cache, then evict old entries if needed.
+        The entry is written to a temporary directory and moved in place, so a crash never leaves a
+        half-written entry behind.
+
+        Returns:
+        - Tuple (model_path, index), as `get`.
+        """
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.directory)
+        try:
+            model_path = os.path.join(staging, f"model.{self.file_format}")
+            if self.file_format == "mps":
+                stream.write_mps(model_path)
+            else:
+                stream.write_lp(model_path)
+            with open(os.path.join(staging, INDEX_FILE), "w") as file:
+                json.dump(stream.index.to_dict(), file)
+            if os.path.exists(self._entry(key)):
+                shutil.rmtree(self._entry(key))
+            os.replace(staging, self._entry(key))
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self.evict(keep=key)
+        return self._model_path(key), stream.index
+
+    def entries(self):
+        """
+        Cache entries, least recently used first.
+
+        Returns:
+        - List of tuples (key, size_in_bytes, last_access_time).
+        """
+        entries = []
+        for key in os.listdir(self.directory):
+            path = self._entry(key)
+            if key.startswith(".") or not os.path.isdir(path):
+                continue
+            size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+            entries.append((key, size, os.path.getmtime(path)))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def evict(self, keep=None):
+        """
+        Remove least recently used entries until the cache fits in `max_bytes`.
+
+        Parameters:
+        - keep: Optional key that is never evicted (the entry just written).
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for key, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            total -= size
+            print(f"Evicted cached model {key[:12]}")
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        for key, _, _ in self.entries():
+            shutil.rmtree(self._entry(key), ignore_errors=True)
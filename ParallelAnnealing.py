@@ -0,0 +1,132 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from SimulationAnnealing import IncrementalCost, simulated_annealing_incremental
+
+
+def _chain_seeds(base_seed, count, *key):
+    """Derive `count` independent integer seeds from a base seed and an optional key."""
+    sequence = np.random.SeedSequence([base_seed, *key])
+    return [int(child.generate_state(1)[0]) for child in sequence.spawn(count)]
+
+
+def _run_chain(evaluator, initial_assign, seed, station_seed, initial_temp, cooling_rate, max_iterations):
+    """
+    Run one annealing chain in a worker process.
+
+    Every chain draws the route stations from the same `station_seed`, so all chains score states with
+    the same cost function; `seed` drives the moves of this chain only.
+
+    Returns:
+    - Tuple (best_assign, best_cost, final_assign, final_cost, stats).
+    """
+    start = time.perf_counter()
+    cost = IncrementalCost(evaluator, initial_assign, np.random.default_rng(station_seed))
+    stats = {}
+    best_assign, best_cost = simulated_annealing_incremental(
+        cost, initial_temp, cooling_rate, max_iterations, rng=np.random.default_rng(seed), stats=stats
+    )
+    stats["elapsed"] = time.perf_counter() - start
+    return best_assign, best_cost, np.array(cost.assign), cost.total(), stats
+
+
+def parallel_multistart(evaluator, n_chains, base_seed, initial_temp, cooling_rate, max_iterations,
+                        initial_assign=None, max_workers=None):
+    """
+    Run independent, seeded annealing chains in parallel and keep the best result.
+
+    Parameters:
+    - evaluator: VectorizedCost describing the instance.
+    - n_chains: Number of chains.
+    - base_seed: Seed from which every chain seed is derived; the result is reproducible from it.
+    - initial_temp, cooling_rate, max_iterations: Annealing schedule of each chain.
+    - initial_assign: Optional starting bus index vector; by default each chain starts from its own
+      random state.
+    - max_workers: Number of worker processes (default: one per CPU).
+
+    Returns:
+    - Tuple (best_assign, best_cost, chain_stats), where chain_stats holds one dict per chain.
+    """
+    seeds = _chain_seeds(base_seed, n_chains)
+    num_routes, num_buses = len(evaluator.routes), len(evaluator.buses)
+    starts = [initial_assign if initial_assign is not None
+              else np.random.default_rng(seed).integers(0, num_buses, size=num_routes)
+              for seed in seeds]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_run_chain, evaluator, start, seed, base_seed, initial_temp, cooling_rate,
+                                   max_iterations)
+                   for start, seed in zip(starts, seeds)]
+        results = [future.result() for future in futures]
+
+    chain_stats = []
+    best_assign, best_cost = None, float('inf')
+    for chain, (seed, (assign, cost, _, _, stats)) in enumerate(zip(seeds, results)):
+        chain_stats.append(dict(stats, chain=chain, seed=seed, best_cost=cost))
+        if cost < best_cost:
+            best_assign, best_cost = assign, cost
+    return best_assign, best_cost, chain_stats
+
+
+def parallel_tempering(evaluator, temperatures, base_seed, iterations_per_exchange, n_exchanges,
+                       initial_assign=None, max_workers=None):
+    """
+    Run one replica per temperature in parallel and periodically exchange states between neighboring
+    temperatures.
+
+    Each round, every replica runs `iterations_per_exchange` moves at its fixed temperature in the
+    process pool. Then adjacent replicas i and i+1 swap states with probability
+    min(1, exp((1/T_i - 1/T_{i+1}) * (E_i - E_{i+1}))), so good states drift to the cold replicas.
+
+    Parameters:
+    - evaluator: VectorizedCost describing the instance.
+    - temperatures: Replica temperatures, e.g. a geometric ladder.
+    - base_seed: Seed from which all replica and exchange randomness is derived.
+    - iterations_per_exchange: Moves per replica between two exchange rounds.
+    - n_exchanges: Number of exchange rounds.
+    - initial_assign: Optional starting bus index vector shared by all replicas.
+    - max_workers: Number of worker processes (default: one per CPU).
+
+    Returns:
+    - Tuple (best_assign, best_cost, chain_stats), where chain_stats holds one dict per temperature with
+      the accumulated move counts, the number of accepted exchanges and the best cost of that replica.
+    """
+    temperatures = sorted(temperatures)
+    num_routes, num_buses = len(evaluator.routes), len(evaluator.buses)
+    exchange_rng = np.random.default_rng(_chain_seeds(base_seed, 1, 1)[0])
+    if initial_assign is None:
+        initial_assign = exchange_rng.integers(0, num_buses, size=num_routes)
+    states = [np.array(initial_assign) for _ in temperatures]
+    energies = [None] * len(temperatures)
+    chain_stats = [dict(chain=i, temperature=temperature, iterations=0, accepted=0, improvements=0,
+                        exchanges=0, elapsed=0.0, best_cost=float('inf'))
+                   for i, temperature in enumerate(temperatures)]
+    best_assign, best_cost = None, float('inf')
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for round_index in range(n_exchanges):
+            seeds = _chain_seeds(base_seed, len(temperatures), 0, round_index)
+            futures = [executor.submit(_run_chain, evaluator, states[i], seeds[i], base_seed, temperature, 1.0,
+                                       iterations_per_exchange)
+                       for i, temperature in enumerate(temperatures)]
+            for i, future in enumerate(futures):
+                assign, cost, final_assign, final_cost, stats = future.result()
+                states[i], energies[i] = final_assign, final_cost
+                record = chain_stats[i]
+                for key in ("iterations", "accepted", "improvements", "elapsed"):
+                    record[key] += stats[key]
+                record["best_cost"] = min(record["best_cost"], cost)
+                if cost < best_cost:
+                    best_assign, best_cost = assign, cost
+
+            for i in range(len(temperatures) - 1):
+                log_ratio = (1 / temperatures[i] - 1 / temperatures[i + 1]) * (energies[i] - energies[i + 1])
+                if log_ratio >= 0 or exchange_rng.random() < np.exp(log_ratio):
+                    states[i], states[i + 1] = states[i + 1], states[i]
+                    energies[i], energies[i + 1] = energies[i + 1], energies[i]
+                    chain_stats[i]["exchanges"] += 1
+                    chain_stats[i + 1]["exchanges"] += 1
+
+    return best_assign, best_cost, chain_stats
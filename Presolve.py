@@ -0,0 +1,217 @@
+import math
+import time
+
+from pyomo.environ import Constraint, Objective, Var, maximize, value
+from pyomo.repn.standard_repn import generate_standard_repn
+
+
+class Presolver:
+    """
+    Reduces a built Pyomo model before it is handed to the solver.
+
+    Three reductions are applied until none of them changes anything:
+    - Rows that hold for every value the variables can take (e.g. `refuel <= 1` on a binary, or a fleet
+      size row bounding a sum of binaries by its own length) are deactivated.
+    - Rows left with a single free variable are turned into bounds on that variable; an integer variable
+      whose bounds meet is fixed (e.g. `x * remaining_range >= energy` fixes a binary x to 1).
+    - Dominated variables are fixed: a variable whose cost does not favor a larger value and that only
+      appears where a smaller value keeps the rows satisfied is fixed at its lower bound (for example a
+      `z_e` left without rows), and symmetrically at its upper bound.
+
+    Fixed variables are written as constants by the Pyomo writers, so they leave the model. Their values
+    stay in the model, so the solution is read the usual way. A row that can never hold is reported
+    with a ValueError.
+    """
+    def __init__(self, model, fix_dominated=True, max_passes=20, tolerance=1e-9):
+        """
+        Initialize a Presolver object.
+
+        Parameters:
+        - model: Pyomo model with linear rows.
+        - fix_dominated: Fix dominated variables. Turn it off when rows are still to be added after
+          presolve (lazy constraints), since a variable is only dominated with respect to the rows seen.
+        - max_passes: Maximum number of passes over the rows touched by the previous pass.
+        - tolerance: Feasibility tolerance.
+        """
+        self.model = model
+        self.fix_dominated = fix_dominated
+        self.max_passes = max_passes
+        self.tolerance = tolerance
+        self.report = None
+
+    def run(self):
+        """
+        Presolve the model in place.
+
+        Returns:
+        - Dictionary with the rows and variables before and after, and per model component the rows
+          dropped as redundant (`rows_dropped`), the rows turned into bounds (`rows_to_bounds`) and the
+          variables fixed (`vars_fixed`).
+
+        Raises:
+        - ValueError if a row can never be satisfied.
+        """
+        start = time.perf_counter()
+        self.report = {"rows_dropped": {}, "rows_to_bounds": {}, "vars_fixed": {}}
+        self._collect()
+        rows_before = len(self.rows)
+        vars_before = sum(1 for var in self.model.component_data_objects(Var) if not var.fixed)
+
+        touched = range(len(self.rows))
+        passes = 0
+        while touched and passes < self.max_passes:
+            passes += 1
+            changed = {}  # id(var) -> var; Pyomo variables are not hashable
+            for row in touched:
+                if self.live[row]:
+                    changed.update((id(var), var) for var in self._reduce_row(row))
+            if self.fix_dominated:
+                candidates = changed.values() if passes > 1 else None
+                changed.update((id(var), var) for var in self._fix_dominated(candidates))
+            touched = sorted({row for key in changed for row, _ in self.columns.get(key, ()) if self.live[row]})
+
+        self.report.update({
+            "rows_before": rows_before,
+            "rows_after": sum(self.live),
+            "vars_before": vars_before,
+            "vars_after": sum(1 for var in self.model.component_data_objects(Var) if not var.fixed),
+            "passes": passes,
+            "seconds": time.perf_counter() - start,
+        })
+        print(f"Presolve: {rows_before - sum(self.live)} of {rows_before} rows and "
+              f"{vars_before - self.report['vars_after']} of {vars_before} variables removed")
+        return self.report
+
+    def _collect(self):
+        """
+        Read the linear rows, the column appearances and the objective coefficients.
+        """
+        self.rows = []      # (constraint, variables, coefficients, lower, upper)
+        self.live = []
+        self.columns = {}   # id(var) -> list of (row, coefficient)
+        self.names = {}     # id(component) -> name
+        for constraint in self.model.component_data_objects(Constraint, active=True):
+            lower, body, upper = constraint.to_bounded_expression(evaluate_bounds=True)
+            repn = generate_standard_repn(body, compute_values=True, quadratic=False)
+            if not repn.is_linear():
+                continue
+            lower = None if lower is None else value(lower) - repn.constant
+            upper = None if upper is None else value(upper) - repn.constant
+            row = len(self.rows)
+            self.rows.append((constraint, repn.linear_vars, repn.linear_coefs, lower, upper))
+            self.live.append(True)
+            for var, coefficient in zip(repn.linear_vars, repn.linear_coefs):
+                self.columns.setdefault(id(var), []).append((row, coefficient))
+
+        self.costs = {}
+        for objective in self.model.component_data_objects(Objective, active=True):
+            repn = generate_standard_repn(objective.expr, compute_values=True, quadratic=False)
+            sign = -1 if objective.sense == maximize else 1
+            for var, coefficient in zip(repn.linear_vars, repn.linear_coefs):
+                self.costs[id(var)] = self.costs.get(id(var), 0) + sign * coefficient
+
+    def _count(self, key, component):
+        counts = self.report[key]
+        parent = component.parent_component()
+        name = self.names.get(id(parent))
+        if name is None:
+            name = self.names[id(parent)] = parent.name
+        counts[name] = counts.get(name, 0) + 1
+
+    def _reduce_row(self, row):
+        """
+        Drop a redundant row or turn a singleton row into bounds.
+
+        Returns:
+        - Variables whose bounds changed.
+        """
+        constraint, variables, coefficients, lower, upper = self.rows[row]
+        tolerance = self.tolerance
+        constant = low = high = 0.0
+        free = []
+        for var, coefficient in zip(variables, coefficients):
+            if var.fixed:
+                constant += coefficient * var.value
+                continue
+            free.append((var, coefficient))
+            bounds = (-math.inf if var.lb is None else var.lb, math.inf if var.ub is None else var.ub)
+            low += coefficient * (bounds[0] if coefficient > 0 else bounds[1])
+            high += coefficient * (bounds[1] if coefficient > 0 else bounds[0])
+        low += constant
+        high += constant
+
+        if (lower is None or low >= lower - tolerance) and (upper is None or high <= upper + tolerance):
+            self._drop(row, "rows_dropped")
+            return []
+        if (lower is not None and high < lower - tolerance) or (upper is not None and low > upper + tolerance):
+            raise ValueError(f"Row {constraint.name} can never be satisfied")
+        if len(free) != 1:
+            return []
+
+        var, coefficient = free[0]
+        bounds = [None if lower is None else (lower - constant) / coefficient,
+                  None if upper is None else (upper - constant) / coefficient]
+        new_lb, new_ub = bounds if coefficient > 0 else bounds[::-1]
+        if var.is_integer():
+            new_lb = None if new_lb is None else math.ceil(new_lb - tolerance)
+            new_ub = None if new_ub is None else math.floor(new_ub + tolerance)
+        new_lb = var.lb if new_lb is None or (var.lb is not None and var.lb >= new_lb) else new_lb
+        new_ub = var.ub if new_ub is None or (var.ub is not None and var.ub <= new_ub) else new_ub
+        if new_lb is not None and new_ub is not None and new_lb > new_ub + tolerance:
+            raise ValueError(f"Row {constraint.name} can never be satisfied")
+
+        self._drop(row, "rows_to_bounds")
+        if new_lb is not None and new_ub is not None and new_ub - new_lb <= tolerance:
+            var.fix(new_lb)
+            self._count("vars_fixed", var)
+            return [var]
+        if new_lb == var.lb and new_ub == var.ub:
+            return []
+        var.setlb(new_lb)
+        var.setub(new_ub)
+        return [var]
+
+    def _drop(self, row, key):
+        self.live[row] = False
+        self.rows[row][0].deactivate()
+        self._count(key, self.rows[row][0])
+
+    def _fix_dominated(self, candidates=None):
+        """
+        Fix the variables that can move to a bound without making any live row tighter and without
+        raising the cost.
+
+        Parameters:
+        - candidates: Variables whose rows changed; None to check every variable.
+
+        Returns:
+        - Variables fixed.
+        """
+        if candidates is None:
+            candidates = [var for var in self.model.component_data_objects(Var) if not var.fixed]
+        else:
+            candidates = {id(row_var): row_var for var in candidates for row, _ in self.columns.get(id(var), ())
+                          for row_var in self.rows[row][1] if not row_var.fixed}.values()
+        fixed = []
+        for var in candidates:
+            if var.fixed:
+                continue
+            down, up = True, True  # moving the variable down or up keeps every live row satisfied
+            for row, coefficient in self.columns.get(id(var), ()):
+                if not self.live[row]:
+                    continue
+                lower, upper = self.rows[row][3], self.rows[row][4]
+                down = down and (upper is None if coefficient < 0 else lower is None)
+                up = up and (upper is None if coefficient > 0 else lower is None)
+                if not (down or up):
+                    break
+            cost = self.costs.get(id(var), 0)
+            if down and cost >= 0 and var.lb is not None:
+                var.fix(var.lb)
+            elif up and cost <= 0 and var.ub is not None:
+                var.fix(var.ub)
+            else:
+                continue
+            self._count("vars_fixed", var)
+            fixed.append(var)
+        return fixed
@@ -0,0 +1,227 @@
+import time
+
+from pyomo.opt import TerminationCondition
+
+from RoutingProblem import RoutingProblem
+from SolverConfig import SolverConfig
+
+
+class RollingHorizonSolver:
+    """
+    Solves a full-day schedule as a sequence of overlapping time windows instead of one monolithic MILP.
+
+    Each window holds the trips starting inside it and is solved as its own RoutingProblem. Only the
+    decisions in the non-overlapping head of the window (trips starting, charging and refueling slots
+    before the start of the next window) are committed; the overlap is solved again as part of the next
+    window. Committing a decision updates the state the next window starts from:
+    - the remaining range of the bus (`remaining_range`, restored by `recharge`/`refuel`),
+    - the time the bus is back from its last trip,
+    - the charger bookings in `Charger.schedule`, which the charging capacity constraint of later
+      windows takes into account.
+
+    The bus and charger objects are updated in place as the day is committed, the same way
+    `Depot.assign_bus` and `Depot.schedule_charging` do. Like the RoutingProblem model, the windows do
+    not track where a bus is: a bus may start a trip anywhere once it is back from its last one.
+    """
+    def __init__(self, electric_buses, diesel_buses, trips, depot, constraints, window=4, overlap=1,
+                 horizon=RoutingProblem.NUM_TIME_SLOTS, sparse=True, solver_name='glpk', time_limit=None,
+                 tee=False, time_grid=None, config=None):
+        """
+        Initialize a RollingHorizonSolver object.
+
+        Parameters:
+        - electric_buses: List of ElectricBus objects.
+        - diesel_buses: List of FuelBus objects.
+        - trips: List of Trip objects to be served.
+        - depot: Depot object holding the chargers.
+        - constraints: List of Constraint objects applied to every window model.
+        - window: Length of a window in time slots.
+        - overlap: Number of slots shared by two consecutive windows; must be smaller than `window`.
+        - horizon: Number of time slots of the day.
+        - sparse: Build the window models with sparse assignment variables (see RoutingProblem).
+        - solver_name: Pyomo solver name.
+        - time_limit: Optional time limit in seconds for each window.
+        - tee: Show the solver output.
+        - time_grid: Optional TimeGrid of the window models' charge and refuel variables; the window,
+          overlap and horizon stay in hours.
+        - config: Optional SolverConfig (MIP gap, threads) for every window; it replaces `solver_name` and
+          `time_limit`.
+        """
+        if not 0 <= overlap < window:
+            raise ValueError("The overlap must be non-negative and smaller than the window")
+        self.electric_buses = electric_buses
+        self.diesel_buses = diesel_buses
+        self.trips = trips
+        self.depot = depot
+        self.constraints = constraints
+        self.window = window
+        self.overlap = overlap
+        self.horizon = horizon
+        self.sparse = sparse
+        self.config = config or SolverConfig(solver_name, time_limit=time_limit)
+        self.tee = tee
+        self.time_grid = time_grid
+
+        self.bus_type = {}
+        for bus in electric_buses:
+            self.bus_type[bus.bus_id] = "electric"
+        for bus in diesel_buses:
+            self.bus_type[bus.bus_id] = "diesel"
+        self.buses = {bus.bus_id: bus for bus in electric_buses + diesel_buses}
+
+        self.assignment = None
+        self.charging = {}     # bus_id -> list of committed charging slots
+        self.refueling = {}    # bus_id -> list of committed refueling slots
+        self.unassigned = []   # trip IDs left unserved by a window without solution
+        self.bus_state = {}    # bus_id -> {"available_time": ...}
+        self.window_stats = []
+
+    def windows(self):
+        """
+        Time windows of the day.
+
+        Returns:
+        - List of tuples (start, end, commit_end): the window covers slots [start, end) and commits the
+          decisions in [start, commit_end).
+        """
+        step = self.window - self.overlap
+        windows = []
+        start = 0
+        while start < self.horizon:
+            end = min(start + self.window, self.horizon)
+            commit_end = self.horizon if end >= self.horizon else start + step
+            windows.append((start, end, commit_end))
+            if end >= self.horizon:
+                break
+            start += step
+        return windows
+
+    def solve(self):
+        """
+        Solve the windows in sequence and commit each one.
+
+        Returns:
+        - Assignment dictionary {"electric": {bus_id: [trip_ids]}, "diesel": {bus_id: [trip_ids]}}.
+        """
+        self.assignment = {"electric": {}, "diesel": {}}
+        self.charging = {}
+        self.refueling = {}
+        self.unassigned = []
+        self.window_stats = []
+        self.bus_state = {bus_id: {"available_time": 0} for bus_id in self.buses}
+
+        # Trips starting before the first slot are handled by the first window, the rest by start time
+        pending = sorted(self.trips, key=lambda trip: (trip.start_time, trip.end_time))
+        for start, end, commit_end in self.windows():
+            window_trips = [trip for trip in pending
+                            if trip.start_time < end or end >= self.horizon]
+            window_start = time.perf_counter()
+            problem, solved = self._solve_window(window_trips, start)
+            committed = [trip for trip in window_trips if trip.start_time < commit_end or commit_end >= self.horizon]
+            if solved and problem is not None:
+                self._commit(problem, committed, start, commit_end)
+            elif not solved:
+                print(f"Window [{start}, {end}) has no solution; its committed trips stay unassigned.")
+                self.unassigned.extend(trip.trip_id for trip in committed)
+
+            committed_ids = {trip.trip_id for trip in committed}
+            pending = [trip for trip in pending if trip.trip_id not in committed_ids]
+            self.window_stats.append({
+                "window": (start, end),
+                "trips": len(window_trips),
+                "committed": len(committed),
+                "solved": solved,
+                "seconds": time.perf_counter() - window_start,
+            })
+            print(f"Window [{start}, {end}): {len(window_trips)} trips, {len(committed)} committed")
+
+        return self.assignment
+
+    def _solve_window(self, window_trips, start):
+        """
+        Build and solve the model of one window from the current bus and charger state.
+
+        Returns:
+        - Tuple (problem, solved), where problem is the window RoutingProblem (None for a window without
+          trips) and solved tells whether a solution was loaded into its model.
+        """
+        if not window_trips:
+            return None, True  # Nothing to decide
+
+        problem = RoutingProblem(self.electric_buses, self.diesel_buses, window_trips, self.depot, self.constraints,
+                                 sparse=self.sparse, time_grid=self.time_grid)
+
+        trips_by_id = {trip.trip_id: trip for trip in window_trips}
+        # A bus cannot start a trip before it is back from its last committed one
+        for variables in (problem.model.x_e, problem.model.x_d):
+            for (bus_id, trip_id), var in variables.items():
+                if trips_by_id[trip_id].start_time < self.bus_state[bus_id]["available_time"]:
+                    var.fix(0)
+        # Slots before the window are in the past
+        for variables in (problem.model.charge, problem.model.refuel):
+            for (bus_id, time_slot), var in variables.items():
+                if problem.time_grid.start_of(time_slot) < start:
+                    var.fix(0)
+
+        solver = self.config.create()
+        results = solver.solve(problem.model, tee=self.tee, load_solutions=False)
+        solved = (len(results.solution) > 0 and
+                  results.solver.termination_condition in (TerminationCondition.optimal,
+                                                            TerminationCondition.feasible,
+                                                            TerminationCondition.maxTimeLimit))
+        if solved:
+            problem.model.solutions.load_from(results)
+        return problem, solved
+
+    def _commit(self, problem, committed, start, commit_end):
+        """
+        Fix the decisions of the non-overlapping part of a window and update the bus and charger state.
+        """
+        committed_ids = {trip.trip_id for trip in committed}
+        trips_by_id = {trip.trip_id: trip for trip in committed}
+
+        # Events in time order; at equal times charging and refueling come before a departure
+        events = []
+        for variables in (problem.model.x_e, problem.model.x_d):
+            for (bus_id, trip_id), var in variables.items():
+                if trip_id in committed_ids and var.value is not None and var.value > 0.5:
+                    trip = trips_by_id[trip_id]
+                    events.append((trip.start_time, 1, bus_id, trip))
+        for variables in (problem.model.charge, problem.model.refuel):
+            for (bus_id, time_slot), var in variables.items():
+                time = problem.time_grid.start_of(time_slot)
+                if start <= time < commit_end and var.value is not None and var.value > 0.5:
+                    events.append((time, 0, bus_id, time_slot))
+        events.sort(key=lambda event: (event[0], event[1]))
+
+        served = set()
+        for _, kind, bus_id, item in events:
+            bus = self.buses[bus_id]
+            bus_type = self.bus_type[bus_id]
+            state = self.bus_state[bus_id]
+            if kind == 0:
+                self._replenish(bus_type, bus, item)  # time slot of the charging or refueling
+                continue
+            trip = item
+            bus.remaining_range = max(0, bus.remaining_range - trip.distance * bus.consumption_rate)
+            state["available_time"] = max(state["available_time"], trip.end_time)
+            self.assignment[bus_type].setdefault(bus_id, []).append(trip.trip_id)
+            served.add(trip.trip_id)
+
+        self.unassigned.extend(trip.trip_id for trip in committed if trip.trip_id not in served)
+
+    def _replenish(self, bus_type, bus, time_slot):
+        """
+        Book a committed charging slot on a depot charger, or record a committed refueling.
+        """
+        if bus_type == "diesel":
+            self.depot.refuel_or_recharge(bus)
+            self.refueling.setdefault(bus.bus_id, []).append(time_slot)
+            return
+        try:
+            self.depot.schedule_charging(bus, time_slot)
+        except ValueError:
+            print(f"No charger free for bus {bus.bus_id} at slot {time_slot}; charging session dropped.")
+            return
+        self.depot.refuel_or_recharge(bus)
+        self.charging.setdefault(bus.bus_id, []).append(time_slot)
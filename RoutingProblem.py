@@ -1,164 +1,595 @@
-from pyomo.environ import ConcreteModel, Var, Objective, Constraint, SolverFactory, Binary, minimize
-import random
+from pyomo.environ import ConcreteModel, Var, Objective, Constraint, Binary, minimize
+from pyomo.opt import TerminationCondition
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from TripSuccessionIndex import TripSuccessionIndex
+from FleetRegistry import FleetRegistry
+from ColumnGeneration import ColumnGenerationSolver
+from GreedyScheduler import GreedyScheduler
+from AnnealingSolver import AnnealingSolver
+from ModelProfiler import ModelProfiler
+from LPWriter import StreamingModel
+from FileSolver import solve_file
+from SolverConfig import SolverConfig
+from SolverRace import SolverRace
+from DeltaReoptimizer import DeltaReoptimizer
+from TimeGrid import TimeGrid
+from Presolve import Presolver
+from FleetTable import FleetTable
+from TripTable import TripTable
 
 class RoutingProblem:
     """
     Represents the central routing optimization problem for scheduling a fleet of electric and diesel buses
     on various routes, considering recharging, refueling, and scheduling constraints.
     """
-    def __init__(self, electric_buses, diesel_buses, trips, depot, constraints):
+    NUM_TIME_SLOTS = 24  # Default planning horizon in hours (see TimeGrid)
+    FIXED_COST_ELECTRIC = 5  # placeholder for fixed cost of charging
+    UNIT_COST_ELECTRIC = 0.2  # placeholder for unit cost of electricity per charge unit
+    FIXED_COST_DIESEL = 3  # placeholder for fixed cost of refueling
+    UNIT_COST_DIESEL = 0.1  # placeholder for unit cost of diesel per unit
+
+    def __init__(self, electric_buses, diesel_buses, trips, depot, constraints, sparse=False, build_model=True,
+                 profile=False, cache=None, time_grid=None, presolve=False):
+        """
+        Parameters:
+        - electric_buses: List of ElectricBus objects.
+        - diesel_buses: List of FuelBus objects.
+        - trips: List of Trip objects to be served.
+        - depot: Depot object holding the chargers.
+        - constraints: List of Constraint objects applied to the model.
+        - sparse: If True, only create assignment variables for bus-trip pairs the bus can actually
+          serve (enough range, enough capacity, trip inside the planning horizon).
+        - build_model: If False, the compact MILP is not built; use this with column generation,
+          which works on its own master problem.
+        - profile: True or a ModelProfiler to record the time, peak memory, rows and nonzeros of every
+          build phase, each constraint and the solve in `self.profiler` (see `profile_report`).
+        - cache: Optional ModelCache. The model is then generated as a file by StreamingModel instead of
+          a Pyomo model, and taken from the cache when the same instance, constraints and options were
+          built before; `solve` solves that file.
+        - time_grid: TimeGrid of the charge and refuel variables; defaults to hourly slots over
+          NUM_TIME_SLOTS hours with a variable in every slot.
+        - presolve: Presolve the built model (see `presolve`). Not available with a model cache, whose
+          model file is generated without a Pyomo model.
+
+        Raises:
+        - ValueError if both `cache` and `presolve` are given.
+        """
+        if cache is not None and presolve:
+            raise ValueError("presolve works on the Pyomo model and cannot be combined with a model cache")
         self.electric_buses = electric_buses
         self.diesel_buses = diesel_buses
         self.trips = trips
         self.depot = depot
         self.constraints = constraints
+        self.sparse = sparse
+        self.time_grid = time_grid or TimeGrid(self.NUM_TIME_SLOTS)
+        depot.set_time_grid(self.time_grid)  # Charger bookings in the slots of the charge variables
+        self.registry = FleetRegistry(electric_buses, diesel_buses, trips, depot.chargers)
+        self.succession_index = TripSuccessionIndex(trips)
+        self.assignment = None
+        self.greedy_scheduler = None  # Last GreedyScheduler, holding its charger bookings
+        if profile is True:
+            profile = ModelProfiler()
+        self.profiler = profile or None
+        self.cache = cache
+        self.cached_model = None  # (model_path, ModelIndex) when the model comes from the cache
+        self.presolve_report = None
         self.model = ConcreteModel()
-        self._define_variables()
-        self._apply_constraints()
-        self._define_objective()
+        if build_model and cache is not None:
+            self._load_cached_model()
+        elif build_model:
+            self._measure("_define_variables", self._define_variables)
+            self._apply_constraints()
+            self._measure("_define_objective", self._define_objective)
+            if presolve:
+                self.presolve()
+
+    def presolve(self):
+        """
+        Presolve the built model in place with a Presolver: rows that always hold are dropped, rows with
+        a single free variable become bounds and forced or dominated variables are fixed, so they are not
+        written to the solver. With lazy constraints dominated variables are kept, since rows are still
+        added after presolve.
+
+        Returns:
+        - The Presolver report, also stored in `self.presolve_report`.
+
+        Raises:
+        - ValueError if a row can never be satisfied, or if the model comes from a model cache.
+        """
+        if self.cache is not None:
+            raise ValueError("presolve works on the Pyomo model and cannot be combined with a model cache")
+        lazy = any(getattr(constraint, "lazy", False) for constraint in self.constraints)
+        presolver = Presolver(self.model, fix_dominated=not lazy)
+        self.presolve_report = self._measure("presolve", presolver.run)
+        return self.presolve_report
+
+    def _load_cached_model(self):
+        """
+        Take the model file from the cache, or generate it into the cache on a miss. No Pyomo component
+        is built either way.
+        """
+        key = self.cache.key(self)
+        self.cached_model = self.cache.get(key)
+        if self.cached_model is not None:
+            print(f"Model cache hit {key[:12]}")
+            return
+        print(f"Model cache miss {key[:12]}; generating the model file")
+        self.cached_model = self._measure("generate_model_file", self.cache.put, key, StreamingModel(self))
+
+    def _measure(self, name, function, *args, kind="phase", **kwargs):
+        """
+        Run a build or solve phase, through the profiler when profiling is enabled.
+        """
+        if self.profiler is None:
+            return function(*args, **kwargs)
+        with self.profiler.measure(name, self.model, kind=kind):
+            return function(*args, **kwargs)
+
+    def profile_report(self, show=False):
+        """
+        Per-phase build and solve profile.
+
+        Parameters:
+        - show: Also print the profile as a table, slowest phase first.
+
+        Returns:
+        - List of dictionaries (see ModelProfiler.report), or None when profiling is disabled.
+        """
+        if self.profiler is None:
+            return None
+        if show:
+            print(self.profiler.table())
+        return self.profiler.report()
 
     def _define_variables(self):
         """
         Define decision variables for the optimization problem.
         """
+        self.electric_pairs = self._assignment_pairs(self.electric_buses)
+        self.diesel_pairs = self._assignment_pairs(self.diesel_buses)
+
         # Binary variables for assigning trips to electric buses
-        self.model.x_e = Var(
-            [(e.bus_id, trip.trip_id) for e in self.electric_buses for trip in self.trips],
-            domain=Binary
-        )
+        self.model.x_e = Var(self.electric_pairs, domain=Binary)
 
         # Binary variables for assigning trips to diesel buses
-        self.model.x_d = Var(
-            [(d.bus_id, trip.trip_id) for d in self.diesel_buses for trip in self.trips],
-            domain=Binary
-        )
-
-        # Binary variables for charging and refueling
-        self.model.charge = Var(
-            [(e.bus_id, t) for e in self.electric_buses for t in range(24)],  # assuming 24 time slots
-            domain=Binary
-        )
+        self.model.x_d = Var(self.diesel_pairs, domain=Binary)
 
-        self.model.refuel = Var(
-            [(d.bus_id, t) for d in self.diesel_buses for t in range(24)],  # assuming 24 time slots
-            domain=Binary
-        )
+        # Binary variables for charging and refueling, in the time grid slots
+        self.model.charge = Var(self._replenish_keys(self.electric_buses, self.electric_pairs), domain=Binary)
+        self.model.refuel = Var(self._replenish_keys(self.diesel_buses, self.diesel_pairs), domain=Binary)
 
         # Binary variables for tracking if a bus is in use
         self.model.z_e = Var([e.bus_id for e in self.electric_buses], domain=Binary)
         self.model.z_d = Var([d.bus_id for d in self.diesel_buses], domain=Binary)
         print("Binary variable assigned")
 
-    def _apply_constraints(self, initial_assignments=None):
+    def _replenish_keys(self, buses, pairs):
+        """
+        Build the (bus_id, time_slot) index set of the charge or refuel variables of the given buses:
+        every slot of the time grid, or with an event-based grid the candidate idle slots of each bus
+        (see TimeGrid.candidate_slots), derived from the trips of its assignment pairs.
+        """
+        grid = self.time_grid
+        if not grid.event_based:
+            return [(bus.bus_id, time_slot) for bus in buses for time_slot in grid.slots()]
+        served = {bus.bus_id: [] for bus in buses}
+        for bus_id, trip_id in pairs:
+            served[bus_id].append(self.registry.trip(trip_id))
+        return [(bus.bus_id, time_slot) for bus in buses for time_slot in grid.candidate_slots(served[bus.bus_id])]
+
+    def _fits_time_window(self, trip):
+        """
+        Check if a trip lies inside the planning horizon.
+        """
+        return 0 <= trip.start_time and trip.end_time <= self.time_grid.horizon
+
+    def _can_serve(self, bus, trip):
+        """
+        Check if a bus is able to serve a trip: enough range, enough seats and a trip inside the horizon.
+        """
+        return (bus.can_serve_trip(trip.distance) and bus.capacity >= trip.demand
+                and self._fits_time_window(trip))
+
+    def _compatibility(self):
+        """
+        Check every bus against every trip at once on the columnar FleetTable and TripTable.
+
+        Returns:
+        - Tuple (matrix, rows): boolean matrix [bus, trip] of the pairs passing `_can_serve`, with the
+          trips in the order of `trips`, and a dictionary bus_id -> row of the matrix.
+        """
+        buses = self.electric_buses + self.diesel_buses
+        fleet = FleetTable.from_objects(self.electric_buses, self.diesel_buses)
+        matrix = fleet.can_serve(TripTable.from_objects(self.trips), self.time_grid.horizon)
+        return matrix, {bus.bus_id: row for row, bus in enumerate(buses)}
+
+    def _assignment_pairs(self, buses):
+        """
+        Build the (bus_id, trip_id) index set of the assignment variables for the given buses.
+
+        In dense mode every pair is returned. In sparse mode only the pairs passing `_can_serve` are
+        kept; they are read from the compatibility matrix (see `_compatibility`).
+        """
+        if not self.sparse:
+            return [(bus.bus_id, trip.trip_id) for bus in buses for trip in self.trips]
+
+        matrix, rows = self._compatibility()
+        pairs = []
+        for bus in buses:
+            pairs.extend((bus.bus_id, self.trips[column].trip_id)
+                         for column in np.flatnonzero(matrix[rows[bus.bus_id]]))
+        return pairs
+
+    def _apply_constraints(self):
         """
         Apply each constraint in the constraints list to the model.
         """
         for constraint in self.constraints:
-            constraint.apply(self.model, electric_buses=self.electric_buses, diesel_buses=self.diesel_buses,
-                             trips=self.trips, chargers=self.depot.chargers)
+            self._measure(type(constraint).__name__, self._apply_constraint, constraint, kind="constraint")
+
+    def _apply_constraint(self, constraint):
+        """
+        Apply one constraint to the model.
+        """
+        constraint.apply(self.model, electric_buses=self.electric_buses, diesel_buses=self.diesel_buses,
+                         trips=self.trips, chargers=self.depot.chargers, registry=self.registry,
+                         succession_index=self._succession_index_for(constraint), time_grid=self.time_grid)
+
+    def _succession_index_for(self, constraint):
+        """
+        Return the shared trip-succession index, or None when the constraint asks for its own
+        capped index (built from its `max_successors`).
+        """
+        if getattr(constraint, "max_successors", None) is not None:
+            return None
+        return self.succession_index
 
     def _define_objective(self):
         """
         Define the objective function to minimize total operating costs (charging and refueling costs).
         """
-        fixed_cost_electric = 5  # placeholder for fixed cost of charging
-        unit_cost_electric = 0.2  # placeholder for unit cost of electricity per charge unit
-        fixed_cost_diesel = 3  # placeholder for fixed cost of refueling
-        unit_cost_diesel = 0.1  # placeholder for unit cost of diesel per unit
+        fixed_cost_electric = self.FIXED_COST_ELECTRIC
+        unit_cost_electric = self.UNIT_COST_ELECTRIC
+        fixed_cost_diesel = self.FIXED_COST_DIESEL
+        unit_cost_diesel = self.UNIT_COST_DIESEL
 
         # Objective function: Minimize total operational costs
         self.model.objective = Objective(
-            expr=sum(self.model.charge[e.bus_id, t] * (fixed_cost_electric + unit_cost_electric) for e in self.electric_buses for t in range(24)) +
-                 sum(self.model.refuel[d.bus_id, t] * (fixed_cost_diesel + unit_cost_diesel) for d in self.diesel_buses for t in range(24)),
+            expr=sum(var * (fixed_cost_electric + unit_cost_electric) for var in self.model.charge.values()) +
+                 sum(var * (fixed_cost_diesel + unit_cost_diesel) for var in self.model.refuel.values()),
             sense=minimize
         )
 
-    def _initialize_columns(self, initial_fraction=0.1):
+    def solve_with_column_generation(self, tolerance=1e-6, max_iterations=100, solver_name=None, integer_config=None):
         """
-        Initialize a subset of bus-route assignments to create a restricted model.
+        Solve the routing problem using column generation over bus duties.
+
+        Parameters:
+        - tolerance: A duty enters the master only if its reduced cost is below -tolerance.
+        - max_iterations: Maximum number of pricing rounds.
+        - solver_name: Solver used for the master LP and the final integer solve (default: "highs" when
+          highspy is installed, "glpk" otherwise).
+        - integer_config: Optional SolverConfig bounding the final integer solve (see ColumnGenerationSolver).
+
+        Returns:
+        - Assignment dictionary {"electric": {bus_id: [trip_ids]}, "diesel": {bus_id: [trip_ids]}}.
         """
-        num_assignments = int(len(self.electric_buses) * len(self.trips) * initial_fraction)
-        self.initial_assignments = random.sample(
-            [(e.bus_id, t.trip_id) for e in self.electric_buses for t in self.trips],
-            num_assignments
-        )
+        self.column_generation = ColumnGenerationSolver(self, solver_name=solver_name,
+                                                        reduced_cost_tolerance=tolerance,
+                                                        integer_config=integer_config)
+        self.assignment = self.column_generation.solve(max_iterations=max_iterations)
+        return self.assignment
 
-    def _solve_restricted_problem(self):
-        """
-        Solve the restricted problem using the initial subset of assignments.
-        """
-        # Add only the initial assignments to the model
-        for assignment in self.initial_assignments:
-            e_id, t_id = assignment
-            self.model.x_e[e_id, t_id] = Var(domain=Binary)
-        
-        # Define constraints only for the restricted set
-        self._apply_constraints(initial_assignments=self.initial_assignments)
-        
-        # Solve the restricted problem
-        self.solve()
-
-    def _add_columns(self):
-        """
-        Add new columns (bus-route assignments) to the model based on solution feedback.
-        """
-        # Find unserved trips
-        unserved_trips = [t for t in self.trips if not any(self.model.x_e[e.bus_id, t.trip_id].value == 1 for e in self.electric_buses)]
-        
-        # Randomly assign an electric bus to each unserved trip to create a new assignment
-        for trip in unserved_trips:
-            bus = random.choice(self.electric_buses)
-            new_assignment = (bus.bus_id, trip.trip_id)
-            
-            # Only add if it’s not already in the model
-            if new_assignment not in self.initial_assignments:
-                self.initial_assignments.append(new_assignment)
-                self.model.x_e[bus.bus_id, trip.trip_id] = Var(domain=Binary)
-
-    def solve_with_column_generation(self, tolerance=1e-4, max_iterations=10):
-        """
-        Solve the routing problem using column generation.
-        """
-        self._initialize_columns()
-        
-        last_objective_value = float('inf')
-        for iteration in range(max_iterations):
-            print(f"Iteration {iteration + 1}")
-            
-            # Solve the restricted problem with current columns
-            self._solve_restricted_problem()
-            
-            # Check for improvement
-            current_objective_value = self.model.objective.expr()
-            improvement = last_objective_value - current_objective_value
-            print(f"Objective value: {current_objective_value}, Improvement: {improvement}")
-            
-            if improvement < tolerance:
-                print("Convergence achieved.")
-                break
-            
-            # Update last objective and add new columns
-            last_objective_value = current_objective_value
-            self._add_columns()
+    def solve_with_annealing(self, time_budget=5.0, seed=None):
+        """
+        Solve the routing problem with simulated annealing over bus duties, starting from the greedy
+        schedule. Use this for instances too large for the MILP.
+
+        Parameters:
+        - time_budget: Search time in seconds.
+        - seed: Seed of the random moves.
+
+        Returns:
+        - Assignment dictionary {"electric": {bus_id: [trip_ids]}, "diesel": {bus_id: [trip_ids]}}.
+        """
+        self.annealing = AnnealingSolver(self, time_budget=time_budget, seed=seed)
+        self.assignment = self.annealing.solve()
+        return self.assignment
+
+    def reoptimize(self, delta, previous_assignment=None, charging=None, refueling=None, neighborhood=10,
+                   solver_name='glpk', time_limit=None):
+        """
+        Repair a previous schedule after a change to the instance, reopening only the assignments near
+        the change (see DeltaReoptimizer). The reoptimizer is kept in `self.reoptimizer` and holds the new
+        instance; further deltas go to `self.reoptimizer.reoptimize`.
+
+        Parameters:
+        - delta: ScheduleDelta.
+        - previous_assignment: Assignment dictionary of the previous schedule; defaults to `self.assignment`.
+        - charging: Optional dictionary {bus_id: [time_slots]} of the previous charging sessions.
+        - refueling: Optional dictionary {bus_id: [time_slots]} of the previous refueling events.
+        - neighborhood: Number of assigned trips, nearest in start time, reopened around each changed trip.
+        - solver_name: Pyomo solver name.
+        - time_limit: Optional time limit in seconds.
 
-    def solve(self):
+        Returns:
+        - Assignment dictionary {"electric": {bus_id: [trip_ids]}, "diesel": {bus_id: [trip_ids]}}.
         """
-        Solve the optimization problem.
+        if previous_assignment is None:
+            previous_assignment = self.assignment if self.assignment is not None else self.extract_assignment()
+        self.reoptimizer = DeltaReoptimizer(self, previous_assignment, charging, refueling,
+                                            neighborhood=neighborhood, solver_name=solver_name,
+                                            time_limit=time_limit)
+        self.assignment = self.reoptimizer.reoptimize(delta)
+        return self.assignment
+
+    def solve_with_file(self, path, solver_name='glpk', time_limit=None, config=None):
+        """
+        Stream the model to an LP file (or MPS, if `path` ends with ".mps") without building Pyomo
+        expressions, and solve that file with the solver executable. Use with `build_model=False`.
+
+        Parameters:
+        - path: Model file to write.
+        - solver_name: "glpk", "cbc" or "highs".
+        - time_limit: Optional time limit in seconds.
+        - config: Optional SolverConfig; it replaces `solver_name` and `time_limit`.
+
+        Returns:
+        - Assignment dictionary {"electric": {bus_id: [trip_ids]}, "diesel": {bus_id: [trip_ids]}}, or None
+          if the solver found no solution.
         """
-        solver = SolverFactory('glpk')  # Placeholder solver; replace with 'gurobi' or other suitable solver
-        solution = solver.solve(self.model, tee=True)
+        config = config or SolverConfig(solver_name, time_limit=time_limit)
+        index = self._write_model_file(path)
+        result = solve_file(path, config=config)
+        print(f"{config.solver_name} finished with status {result['status']}")
+        self.assignment = index.assignment(result["values"]) if result["values"] else None
+        return self.assignment
+
+    def _write_model_file(self, path):
+        """
+        Stream the model to `path` (MPS if it ends with ".mps", LP otherwise).
+
+        Returns:
+        - The ModelIndex to read the solution back.
+        """
+        stream = StreamingModel(self)
+        if path.endswith(".mps"):
+            stream.write_mps(path)
+        else:
+            stream.write_lp(path)
+        return stream.index
+
+    def solve_race(self, configs, deadline, path=None, mode="first"):
+        """
+        Race several solvers or solver settings on the model file in parallel processes (see SolverRace)
+        and keep the first proven result or the best solution found within the deadline. The model file is
+        written to `path` (a temporary file by default), or taken from the model cache. Writing it is not
+        counted in the deadline.
+
+        Parameters:
+        - configs: List of SolverConfig objects with solver name "glpk", "cbc" or "highs".
+        - deadline: Wall-clock bound of the race in seconds.
+        - path: Optional model file to write.
+        - mode: "first" or "best".
+
+        Returns:
+        - Assignment dictionary {"electric": {bus_id: [trip_ids]}, "diesel": {bus_id: [trip_ids]}}, or None
+          if no contender found a solution. The race, with one entry per contender, is kept in `self.race`.
+        """
+        self.race = SolverRace(configs, deadline, mode=mode)
+        if self.cached_model is not None:
+            model_path, index = self.cached_model
+            result = self._measure("solve", self.race.run, model_path)
+        else:
+            directory = None
+            if path is None:
+                directory = tempfile.mkdtemp(prefix="routing-")
+                path = os.path.join(directory, "model.lp")
+            try:
+                index = self._measure("generate_model_file", self._write_model_file, path)
+                result = self._measure("solve", self.race.run, path)
+            finally:
+                if directory is not None:
+                    shutil.rmtree(directory, ignore_errors=True)
+        print(f"Race finished with status {result['status']} ({result['solver'] or 'no solver'})")
+        self.assignment = index.assignment(result["values"]) if result["values"] else None
+        return self.assignment
+
+    def solve(self, warm_start=False, time_limit=None, solver_name='glpk', max_lazy_rounds=50, config=None):
+        """
+        Solve the optimization problem. With lazy constraints (e.g. `ChargerSchedulingConstraint(lazy=True)`)
+        the model is solved in rounds; see `_solve_lazily`.
+
+        Parameters:
+        - warm_start: If True, pass the current variable values (see `load_warm_start`) to solvers
+          that accept a MIP start.
+        - time_limit: Optional time limit in seconds, per round with lazy constraints.
+        - solver_name: Pyomo solver name; with a model cache, "glpk", "cbc" or "highs".
+        - max_lazy_rounds: Maximum number of solve rounds with lazy constraints.
+        - config: Optional SolverConfig (time limit, MIP gap, threads, verbosity); it replaces
+          `solver_name` and `time_limit`. Without it the solver log is shown.
+
+        Returns:
+        - The Pyomo results, or with a model cache the FileSolver result dictionary (the assignment is
+          stored in `self.assignment`).
+        """
+        config = config or SolverConfig(solver_name, time_limit=time_limit, verbose=True)
+        if self.cached_model is not None:
+            model_path, index = self.cached_model
+            result = self._measure("solve", solve_file, model_path, config=config)
+            print(f"{config.solver_name} finished with status {result['status']}")
+            self.assignment = index.assignment(result["values"]) if result["values"] else None
+            return result
+
+        solver = config.create()
+        lazy = [constraint for constraint in self.constraints if getattr(constraint, "lazy", False)]
+        if lazy:
+            return self._solve_lazily(solver, lazy, warm_start, max_lazy_rounds, tee=config.verbose)
+        if warm_start and solver.warm_start_capable():
+            solution = self._measure("solve", solver.solve, self.model, tee=config.verbose, warmstart=True)
+        else:
+            solution = self._measure("solve", solver.solve, self.model, tee=config.verbose)
         return solution
 
-    def display_solution(self):
+    def _solve_lazily(self, solver, lazy, warm_start, max_rounds, tee=True):
+        """
+        Solve without the rows of the lazy constraints, add the rows the solution violates and solve
+        again, until no row is violated. Rounds after the first start from the previous solution when the
+        solver accepts a MIP start. The rows added per round are recorded in `self.lazy_rounds`.
+
+        Returns:
+        - The Pyomo results of the last round.
+        """
+        self.lazy_rounds = []
+        results = None
+        for round_number in range(1, max_rounds + 1):
+            start = time.perf_counter()
+            options = {'warmstart': True} if (warm_start or round_number > 1) and solver.warm_start_capable() else {}
+            results = self._measure(f"solve_round_{round_number}", solver.solve, self.model, tee=tee,
+                                    load_solutions=False, **options)
+            if (len(results.solution) == 0 or
+                    results.solver.termination_condition not in (TerminationCondition.optimal,
+                                                                 TerminationCondition.feasible,
+                                                                 TerminationCondition.maxTimeLimit)):
+                print(f"Lazy round {round_number}: no solution ({results.solver.termination_condition})")
+                break
+            self.model.solutions.load_from(results)
+            added = 0
+            for constraint in lazy:
+                added += constraint.separate(self.model, electric_buses=self.electric_buses,
+                                             diesel_buses=self.diesel_buses, trips=self.trips,
+                                             chargers=self.depot.chargers, registry=self.registry,
+                                             succession_index=self._succession_index_for(constraint),
+                                             time_grid=self.time_grid)
+            self.lazy_rounds.append({"round": round_number, "rows_added": added,
+                                     "seconds": time.perf_counter() - start})
+            print(f"Lazy round {round_number}: {added} violated rows added")
+            if not added:
+                break
+        else:
+            print(f"Rows were still violated after {max_rounds} rounds")
+        return results
+
+    def schedule_greedily(self):
+        """
+        Build a schedule with the constructive GreedyScheduler. Charging sessions are booked on the
+        depot chargers; the sessions of the previous greedy schedule are released first.
+
+        Returns:
+        - The GreedyScheduler holding the assignment, charging and refueling plans.
+        """
+        if self.greedy_scheduler is not None:
+            self.greedy_scheduler.release()
+        scheduler = GreedyScheduler(self.electric_buses, self.diesel_buses, self.trips, self.depot)
+        scheduler.schedule()
+        self.greedy_scheduler = scheduler
+        return scheduler
+
+    def load_warm_start(self, assignment, charging=None, refueling=None):
+        """
+        Set the model variables to a given schedule, to be used as a MIP start.
+
+        Parameters:
+        - assignment: Assignment dictionary {"electric": {bus_id: [trip_ids]}, "diesel": {...}}.
+        - charging: Optional dictionary {bus_id: [times]} of electric bus charging sessions.
+        - refueling: Optional dictionary {bus_id: [times]} of diesel bus refueling events.
+          Times are in hours and are mapped to the slot of the time grid holding them.
+        """
+        charging = charging or {}
+        refueling = refueling or {}
+        for bus_type, x, z in (("electric", self.model.x_e, self.model.z_e),
+                               ("diesel", self.model.x_d, self.model.z_d)):
+            served = {(bus_id, trip_id) for bus_id, trip_ids in assignment[bus_type].items() for trip_id in trip_ids}
+            for key, var in x.items():
+                if not var.fixed:
+                    var.set_value(1 if key in served else 0)
+            for bus_id, var in z.items():
+                if not var.fixed:
+                    var.set_value(1 if assignment[bus_type].get(bus_id) else 0)
+
+        for variables, events in ((self.model.charge, charging), (self.model.refuel, refueling)):
+            booked = {(bus_id, self.time_grid.slot_at(time)) for bus_id, times in events.items() for time in times}
+            for key, var in variables.items():
+                if not var.fixed:  # Fixed by presolve
+                    var.set_value(1 if key in booked else 0)
+
+    def solve_with_fallback(self, time_limit, solver_name='glpk', config=None):
+        """
+        Solve the model warm-started from the greedy schedule, and fall back to that schedule when the
+        solver returns no solution within the time limit. The greedy charging sessions stay booked on the
+        depot chargers only when the greedy schedule is used.
+
+        Parameters:
+        - time_limit: Solver time budget in seconds.
+        - solver_name: Pyomo solver name.
+        - config: Optional SolverConfig (MIP gap, threads, verbosity); it replaces `solver_name`, and its
+          time limit is capped at `time_limit`.
+
+        Returns:
+        - Assignment dictionary {"electric": {bus_id: [trip_ids]}, "diesel": {bus_id: [trip_ids]}}.
+        """
+        scheduler = self.schedule_greedily()
+        slot_length = self.depot.booking.slot_length
+        charging = {bus_id: [time_slot * slot_length for time_slot in time_slots]
+                    for bus_id, time_slots in scheduler.charging.items()}
+        self.load_warm_start(scheduler.assignment, charging, scheduler.refueling)
+
+        config = (config or SolverConfig(solver_name, verbose=True)).capped(time_limit)
+        solver = config.create()
+        options = {'warmstart': True} if solver.warm_start_capable() else {}
+        try:
+            results = solver.solve(self.model, tee=config.verbose, load_solutions=False, **options)
+        except Exception as error:  # solver missing or crashed
+            print(f"Solver failed ({error}); using the greedy schedule.")
+            results = None
+
+        solved = (results is not None and len(results.solution) > 0 and
+                  results.solver.termination_condition in (TerminationCondition.optimal,
+                                                            TerminationCondition.feasible,
+                                                            TerminationCondition.maxTimeLimit))
+        if solved:
+            self.model.solutions.load_from(results)
+            self.assignment = self.extract_assignment()
+            scheduler.release()
+        else:
+            print("No solver solution within the time budget; using the greedy schedule.")
+            self.assignment = scheduler.assignment
+        return self.assignment
+
+    def extract_assignment(self):
+        """
+        Read the bus-trip assignment from the solved compact model.
+
+        Returns:
+        - Assignment dictionary {"electric": {bus_id: [trip_ids]}, "diesel": {bus_id: [trip_ids]}}.
+        """
+        assignment = {"electric": {}, "diesel": {}}
+        for bus_type, variables in (("electric", self.model.x_e), ("diesel", self.model.x_d)):
+            for (bus_id, trip_id), var in variables.items():
+                if var.value == 1:
+                    assignment[bus_type].setdefault(bus_id, []).append(trip_id)
+        return assignment
+
+    def display_solution(self, assignment=None):
         """
         Display the solution in a readable format.
+
+        Parameters:
+        - assignment: Optional assignment dictionary; defaults to the last column generation result,
+          or to the solved compact model.
         """
-        for e in self.electric_buses:
-            for trip in self.trips:
-                if self.model.x_e[e.bus_id, trip.trip_id].value == 1:
-                    print(f"Electric Bus {e.bus_id} assigned to Trip {trip.trip_id}")
+        if assignment is None:
+            assignment = self.assignment if self.assignment is not None else self.extract_assignment()
+
+        for bus_id, trip_ids in assignment["electric"].items():
+            for trip_id in trip_ids:
+                print(f"Electric Bus {bus_id} assigned to Trip {trip_id}")
 
-        for d in self.diesel_buses:
-            for trip in self.trips:
-                if self.model.x_d[d.bus_id, trip.trip_id].value == 1:
-                    print(f"Diesel Bus {d.bus_id} assigned to Trip {trip.trip_id}")
+        for bus_id, trip_ids in assignment["diesel"].items():
+            for trip_id in trip_ids:
+                print(f"Diesel Bus {bus_id} assigned to Trip {trip_id}")
@@ -91,6 +91,250 @@ def calculate_cost(state, return_separate_costs=False):
         return operational_cost, penalties
     return operational_cost + penalties
 
+class VectorizedCost:
+    """
+    Array-encoded cost evaluation.
+
+    A state is a vector holding, for each route, the index of its bus. Capacities, consumptions and
+    station options are NumPy arrays, so all cost terms of `calculate_cost` are computed without Python
+    loops, and a whole batch of candidate states can be scored in one call.
+    """
+    def __init__(self, routes, buses, energy_capacity, energy_consumption, charging_capacity,
+                 opportunity_charging_stations, opportunity_charging_capacity, route_to_opportunity_chargers,
+                 refueling_stations, refueling_station_capacity, route_to_refueling_stations, rng=None):
+        self.routes = list(routes)
+        self.buses = list(buses)
+        self.capacity = np.array([energy_capacity[bus] for bus in self.buses], dtype=float)
+        self.consumption = np.array([energy_consumption[route] for route in self.routes], dtype=float)
+        self.is_beb = np.array([bus.startswith("BEB") for bus in self.buses])
+        self.is_fceb = np.array([bus.startswith("FCEB") for bus in self.buses])
+        self.charging_capacity = charging_capacity
+        self.avg_energy = self.consumption.sum() / len(self.buses)
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        self.opp_options, self.opp_counts = self._station_options(
+            opportunity_charging_stations, route_to_opportunity_chargers)
+        self.opp_capacity = np.full(len(opportunity_charging_stations), opportunity_charging_capacity)
+        self.refuel_options, self.refuel_counts = self._station_options(
+            refueling_stations, route_to_refueling_stations)
+        self.refuel_capacity = np.array([refueling_station_capacity[station] for station in refueling_stations])
+
+    def _station_options(self, stations, route_to_stations):
+        """Padded (routes x max options) matrix of station indices and the number of options per route."""
+        position = {station: i for i, station in enumerate(stations)}
+        options = [[position[station] for station in route_to_stations.get(route, [])] for route in self.routes]
+        width = max(1, max(len(row) for row in options))
+        matrix = np.zeros((len(self.routes), width), dtype=np.int64)
+        for r, row in enumerate(options):
+            matrix[r, :len(row)] = row
+        return matrix, np.array([len(row) for row in options])
+
+    def encode(self, state):
+        """Convert a {route: bus} state into a bus index vector."""
+        index = {bus: b for b, bus in enumerate(self.buses)}
+        return np.array([index[state[route]] for route in self.routes], dtype=np.int64)
+
+    def decode(self, assign):
+        """Convert a bus index vector back into a {route: bus} state."""
+        return {route: self.buses[b] for route, b in zip(self.routes, assign)}
+
+    def _station_penalties(self, assign, uses_station, options, counts, capacity):
+        """Penalties of a station type for a (k x routes) batch: missing stations and overloads."""
+        k, num_routes = assign.shape
+        users = uses_station[assign]
+        missing = users & (counts == 0)[None, :]
+        penalties = 1000 * missing.sum(axis=1)
+
+        # Random station among each route's options, as in calculate_cost
+        choice = (self.rng.random((k, num_routes)) * np.maximum(counts, 1)).astype(np.int64)
+        station = options[np.arange(num_routes)[None, :], choice]
+        weights = (users & (counts > 0)[None, :]).ravel().astype(float)
+        num_stations = len(capacity)
+        usage = np.bincount((station + num_stations * np.arange(k)[:, None]).ravel(),
+                            weights=weights, minlength=k * num_stations).reshape(k, num_stations)
+        penalties += 1000 * (usage > capacity[None, :]).any(axis=1)
+        return penalties
+
+    def batch_cost(self, assigns, return_separate_costs=False):
+        """Score a (k x routes) batch of bus index vectors; returns an array of k costs."""
+        assigns = np.atleast_2d(assigns)
+        k = assigns.shape[0]
+        num_buses = len(self.buses)
+        consumption = self.consumption[None, :]
+
+        infeasible = consumption > self.capacity[assigns]
+        operational_cost = np.where(infeasible, 0.0, consumption * 10).sum(axis=1)
+        penalties = 5000.0 * infeasible.sum(axis=1)
+
+        # Charger utilization and energy balance from per-row bincounts
+        offsets = (assigns + num_buses * np.arange(k)[:, None]).ravel()
+        usage = np.bincount(offsets, minlength=k * num_buses).reshape(k, num_buses)
+        penalties += 1000 * (usage.max(axis=1) > self.charging_capacity)
+        energy = np.bincount(offsets, weights=np.broadcast_to(consumption, assigns.shape).ravel(),
+                             minlength=k * num_buses).reshape(k, num_buses)
+        penalties += 10 * np.abs(energy - self.avg_energy).sum(axis=1)
+
+        penalties += self._station_penalties(assigns, self.is_beb, self.opp_options, self.opp_counts,
+                                             self.opp_capacity)
+        penalties += self._station_penalties(assigns, self.is_fceb, self.refuel_options, self.refuel_counts,
+                                              self.refuel_capacity)
+
+        if return_separate_costs:
+            return operational_cost, penalties
+        return operational_cost + penalties
+
+    def cost(self, assign, return_separate_costs=False):
+        """Score a single bus index vector."""
+        result = self.batch_cost(assign, return_separate_costs)
+        if return_separate_costs:
+            return result[0][0], result[1][0]
+        return result[0]
+
+    def neighbors(self, assign, k):
+        """Generate k neighbors of a state, each moving one route to a different feasible bus."""
+        num_routes, num_buses = len(self.routes), len(self.buses)
+        batch = np.repeat(assign[None, :], k, axis=0)
+        route = self.rng.integers(0, num_routes, size=k)
+        current = assign[route]
+        new_bus = (current + self.rng.integers(1, num_buses, size=k)) % num_buses
+        feasible = self.consumption[route] <= self.capacity[new_bus]
+        batch[np.arange(k), route] = np.where(feasible, new_bus, current)
+        return batch
+
+class IncrementalCost:
+    """
+    Stateful cost evaluation with O(1) move deltas.
+
+    Keeps per-bus usage and energy totals, per-station usage counters and the running sums of every
+    cost term of `calculate_cost`. A reassignment or swap is applied tentatively and its cost delta
+    returned; it is then kept with `commit` or undone with `rollback`. Each route's opportunity charger
+    and refueling station is drawn once at construction, so the cost is deterministic.
+    """
+    def __init__(self, evaluator, assign, rng=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        self.capacity = evaluator.capacity.tolist()
+        self.consumption = evaluator.consumption.tolist()
+        self.is_beb = evaluator.is_beb.tolist()
+        self.is_fceb = evaluator.is_fceb.tolist()
+        self.charging_capacity = evaluator.charging_capacity
+        self.avg_energy = float(evaluator.avg_energy)
+        self.opp_station = self._draw_stations(evaluator.opp_options, evaluator.opp_counts, rng)
+        self.refuel_station = self._draw_stations(evaluator.refuel_options, evaluator.refuel_counts, rng)
+        self.opp_capacity = evaluator.opp_capacity.tolist()
+        self.refuel_capacity = evaluator.refuel_capacity.tolist()
+
+        num_buses = len(self.capacity)
+        self.assign = [int(b) for b in assign]
+        self.usage = [0] * num_buses
+        self.energy = [0.0] * num_buses
+        self.opp_usage = [0] * len(self.opp_capacity)
+        self.refuel_usage = [0] * len(self.refuel_capacity)
+        self.operational_cost = 0.0
+        self.infeasible = 0
+        self.overloaded_buses = 0
+        self.missing_stations = 0
+        self.overloaded_opp = 0
+        self.overloaded_refuel = 0
+        self.imbalance = num_buses * self.avg_energy  # every bus starts with zero energy
+        self._undo = []
+        for route, bus in enumerate(self.assign):
+            self._add(route, bus)
+
+    @staticmethod
+    def _draw_stations(options, counts, rng):
+        """Pick one station per route among its options, or -1 when it has none."""
+        return [int(options[r, rng.integers(0, count)]) if count else -1 for r, count in enumerate(counts)]
+
+    def _add(self, route, bus):
+        """Add a route to a bus and update every counter."""
+        consumption = self.consumption[route]
+        if consumption > self.capacity[bus]:
+            self.infeasible += 1
+        else:
+            self.operational_cost += consumption * 10
+
+        self.usage[bus] += 1
+        if self.usage[bus] == self.charging_capacity + 1:
+            self.overloaded_buses += 1
+        before = self.energy[bus]
+        self.energy[bus] = before + consumption
+        self.imbalance += abs(self.energy[bus] - self.avg_energy) - abs(before - self.avg_energy)
+
+        if self.is_beb[bus]:
+            self.overloaded_opp += self._use_station(self.opp_station[route], self.opp_usage, self.opp_capacity, 1)
+        elif self.is_fceb[bus]:
+            self.overloaded_refuel += self._use_station(self.refuel_station[route], self.refuel_usage,
+                                                        self.refuel_capacity, 1)
+        self.assign[route] = bus
+
+    def _remove(self, route):
+        """Remove a route from its bus and update every counter."""
+        bus = self.assign[route]
+        consumption = self.consumption[route]
+        if consumption > self.capacity[bus]:
+            self.infeasible -= 1
+        else:
+            self.operational_cost -= consumption * 10
+
+        if self.usage[bus] == self.charging_capacity + 1:
+            self.overloaded_buses -= 1
+        self.usage[bus] -= 1
+        before = self.energy[bus]
+        self.energy[bus] = before - consumption
+        self.imbalance += abs(self.energy[bus] - self.avg_energy) - abs(before - self.avg_energy)
+
+        if self.is_beb[bus]:
+            self.overloaded_opp += self._use_station(self.opp_station[route], self.opp_usage, self.opp_capacity, -1)
+        elif self.is_fceb[bus]:
+            self.overloaded_refuel += self._use_station(self.refuel_station[route], self.refuel_usage,
+                                                        self.refuel_capacity, -1)
+        return bus
+
+    def _use_station(self, station, usage, capacity, step):
+        """Add or remove one use of a station; returns the change in the number of overloaded stations."""
+        if station < 0:
+            self.missing_stations += step
+            return 0
+        was_overloaded = usage[station] > capacity[station]
+        usage[station] += step
+        return int(usage[station] > capacity[station]) - int(was_overloaded)
+
+    def total(self):
+        """Current total cost."""
+        return (self.operational_cost + 5000 * self.infeasible + 1000 * (self.overloaded_buses > 0)
+                + 10 * self.imbalance + 1000 * self.missing_stations
+                + 1000 * (self.overloaded_opp > 0) + 1000 * (self.overloaded_refuel > 0))
+
+    def _move(self, route, bus):
+        """Reassign a route and log the previous bus for rollback."""
+        self._undo.append((route, self._remove(route)))
+        self._add(route, bus)
+
+    def reassign(self, route, bus):
+        """Tentatively move a route to another bus; returns the cost delta."""
+        before = self.total()
+        self._move(route, bus)
+        return self.total() - before
+
+    def swap(self, route_a, route_b):
+        """Tentatively exchange the buses of two routes; returns the cost delta."""
+        before = self.total()
+        bus_a, bus_b = self.assign[route_a], self.assign[route_b]
+        self._move(route_a, bus_b)
+        self._move(route_b, bus_a)
+        return self.total() - before
+
+    def commit(self):
+        """Keep the tentative moves."""
+        self._undo.clear()
+
+    def rollback(self):
+        """Undo the tentative moves."""
+        while self._undo:
+            route, bus = self._undo.pop()
+            self._remove(route)
+            self._add(route, bus)
+
 def validate_and_recalculate(state):
     """Validate the final state against all constraints and recalculate the cost."""
     operational_cost, penalties = calculate_cost(state, return_separate_costs=True)
@@ -176,23 +420,105 @@ def simulated_annealing(initial_state, initial_temp, cooling_rate, max_iteration
 
     return best_state, best_cost
 
-# Parameters
-initial_state = initialize_state()
-initial_temp = 1000
-cooling_rate = 0.95
-max_iterations = 1000
-
-# Run Simulated Annealing
-best_state, best_cost = simulated_annealing(initial_state, initial_temp, cooling_rate, max_iterations)
-
-print("Best State:", best_state)
-print("Best Cost:", best_cost)
-
-# Validate final solution
-final_operational_cost, penalties, violations = validate_and_recalculate(best_state)
-print("Final Operational Cost:", final_operational_cost)
-print("Penalties:", penalties)
-if violations:
-    print("Violations:", violations)
-else:
-    print("No violations found. Solution is valid.")
+def simulated_annealing_vectorized(evaluator, initial_assign, initial_temp, cooling_rate, max_iterations,
+                                   batch_size=32):
+    """Simulated Annealing over array states, scoring a batch of neighbors per iteration.
+
+    Each neighbor of the batch gets its own Metropolis test, in order, and the first one accepted becomes
+    the current state; the batch only saves rejected proposals a round trip. Taking the cheapest neighbor
+    instead would turn the search into a greedy best-of-batch descent.
+    """
+    current = initial_assign.copy()
+    current_cost = evaluator.cost(current)
+    best, best_cost = current.copy(), current_cost
+    temperature = initial_temp
+
+    for iteration in range(max_iterations):
+        candidates = evaluator.neighbors(current, batch_size)
+        costs = evaluator.batch_cost(candidates)
+
+        delta_cost = costs - current_cost
+        accepted = np.exp(-np.maximum(delta_cost, 0) / temperature) > evaluator.rng.random(len(costs))
+        accepted |= delta_cost < 0
+        if accepted.any():
+            pick = int(np.argmax(accepted))  # First accepted neighbor
+            current, current_cost = candidates[pick], costs[pick]
+            if current_cost < best_cost:
+                best, best_cost = current.copy(), current_cost
+
+        temperature *= cooling_rate
+        if temperature < 1e-3:
+            break
+
+    return best, best_cost
+
+def simulated_annealing_incremental(cost, initial_temp, cooling_rate, max_iterations, rng=None, swap_rate=0.3,
+                                    stats=None):
+    """Simulated Annealing with O(1) delta evaluation of reassignment and swap moves.
+
+    If a `stats` dict is given, it is filled with the number of iterations, accepted and improving moves.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    num_routes, num_buses = len(cost.assign), len(cost.capacity)
+    current_cost = cost.total()
+    best, best_cost = list(cost.assign), current_cost
+    temperature = initial_temp
+    stats = stats if stats is not None else {}
+    stats.update(iterations=0, accepted=0, improvements=0)
+
+    for iteration in range(max_iterations):
+        stats["iterations"] += 1
+        if num_routes > 1 and rng.random() < swap_rate:
+            route_a, route_b = rng.choice(num_routes, size=2, replace=False)
+            delta_cost = cost.swap(int(route_a), int(route_b))
+        else:
+            route = int(rng.integers(0, num_routes))
+            current_bus = cost.assign[route]
+            new_bus = (current_bus + int(rng.integers(1, num_buses))) % num_buses
+            if cost.consumption[route] > cost.capacity[new_bus]:
+                continue  # Same feasibility filter as generate_neighbor
+            delta_cost = cost.reassign(route, new_bus)
+
+        if delta_cost < 0 or np.exp(-delta_cost / temperature) > rng.random():
+            cost.commit()
+            current_cost += delta_cost
+            stats["accepted"] += 1
+            if current_cost < best_cost:
+                best, best_cost = list(cost.assign), current_cost
+                stats["improvements"] += 1
+        else:
+            cost.rollback()
+
+        temperature *= cooling_rate
+        if temperature < 1e-3:
+            break
+
+    return np.array(best), best_cost
+
+if __name__ == "__main__":
+    # Parameters
+    initial_state = initialize_state()
+    initial_temp = 1000
+    cooling_rate = 0.95
+    max_iterations = 1000
+
+    # Run Simulated Annealing on the array encoding
+    evaluator = VectorizedCost(routes, buses, energy_capacity, energy_consumption, charging_capacity,
+                               opportunity_charging_stations, opportunity_charging_capacity,
+                               route_to_opportunity_chargers, refueling_stations, refueling_station_capacity,
+                               route_to_refueling_stations)
+    best_assign, best_cost = simulated_annealing_vectorized(evaluator, evaluator.encode(initial_state), initial_temp,
+                                                            cooling_rate, max_iterations)
+    best_state = evaluator.decode(best_assign)
+
+    print("Best State:", best_state)
+    print("Best Cost:", best_cost)
+
+    # Validate final solution
+    final_operational_cost, penalties, violations = validate_and_recalculate(best_state)
+    print("Final Operational Cost:", final_operational_cost)
+    print("Penalties:", penalties)
+    if violations:
+        print("Violations:", violations)
+    else:
+        print("No violations found. Solution is valid.")
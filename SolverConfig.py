@@ -0,0 +1,90 @@
+class SolverConfig:
+    """
+    Solver settings shared by the Pyomo solvers (`RoutingProblem.solve`) and the solver executables run on
+    model files (`FileSolver.solve_file`, `SolverRace`): time limit, relative MIP gap, thread count and
+    log verbosity, mapped to each solver's own option names. GLPK is single-threaded and ignores `threads`.
+    """
+    PYOMO_OPTIONS = {
+        "glpk": {"time_limit": "tmlim", "mip_gap": "mipgap"},
+        "cbc": {"time_limit": "sec", "mip_gap": "ratio", "threads": "threads"},
+        "highs": {"time_limit": "time_limit", "mip_gap": "mip_rel_gap", "threads": "threads"},
+        "appsi_highs": {"time_limit": "time_limit", "mip_gap": "mip_rel_gap", "threads": "threads"},
+        "gurobi": {"time_limit": "TimeLimit", "mip_gap": "MIPGap", "threads": "Threads"},
+        "cplex": {"time_limit": "timelimit", "mip_gap": "mipgap", "threads": "threads"},
+    }
+
+    def __init__(self, solver_name='glpk', time_limit=None, mip_gap=None, threads=None, verbose=False,
+                 options=None, name=None):
+        """
+        Initialize a SolverConfig object.
+
+        Parameters:
+        - solver_name: Pyomo solver name, or for model files "glpk", "cbc" or "highs".
+        - time_limit: Optional time limit in seconds.
+        - mip_gap: Optional relative MIP gap at which the solver stops (0.01 for 1%).
+        - threads: Optional number of solver threads.
+        - verbose: Show the solver log.
+        - options: Optional dictionary of further solver options, passed under the solver's own names.
+        - name: Label of the configuration in race reports (default: solver name and settings).
+        """
+        if time_limit is not None and time_limit <= 0:
+            raise ValueError("The time limit must be positive")
+        if mip_gap is not None and mip_gap < 0:
+            raise ValueError("The MIP gap must not be negative")
+        self.solver_name = solver_name
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+        self.threads = threads
+        self.verbose = verbose
+        self.options = dict(options or {})
+        self.name = name or str(self)
+
+    def capped(self, time_limit):
+        """
+        Copy of the configuration whose time limit is at most `time_limit` seconds.
+        """
+        if self.time_limit is not None:
+            time_limit = min(self.time_limit, time_limit)
+        return SolverConfig(self.solver_name, time_limit, self.mip_gap, self.threads, self.verbose,
+                            self.options, self.name)
+
+    def to_dict(self):
+        """
+        JSON-serializable form of the configuration.
+        """
+        return {"solver_name": self.solver_name, "time_limit": self.time_limit, "mip_gap": self.mip_gap,
+                "threads": self.threads, "verbose": self.verbose, "options": self.options, "name": self.name}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild a configuration written by `to_dict`.
+        """
+        return cls(**data)
+
+    def pyomo_options(self):
+        """
+        Options dictionary for the Pyomo solver; settings the solver has no option for are left out.
+        """
+        names = self.PYOMO_OPTIONS.get(self.solver_name, {})
+        options = {}
+        for setting in ("time_limit", "mip_gap", "threads"):
+            if getattr(self, setting) is not None and setting in names:
+                options[names[setting]] = getattr(self, setting)
+        options.update(self.options)
+        return options
+
+    def create(self):
+        """
+        Pyomo solver with the options set; pass `tee=config.verbose` to its `solve`.
+        """
+        from pyomo.environ import SolverFactory  # Kept out of the race processes, which only run executables
+        solver = SolverFactory(self.solver_name)
+        for option, value in self.pyomo_options().items():
+            solver.options[option] = value
+        return solver
+
+    def __str__(self):
+        settings = [f"{setting}={getattr(self, setting)}" for setting in ("time_limit", "mip_gap", "threads")
+                    if getattr(self, setting) is not None]
+        return f"{self.solver_name}({', '.join(settings)})"
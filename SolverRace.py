@@ -0,0 +1,164 @@
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from FileSolver import solve_file
+from SolverConfig import SolverConfig
+
+CONCLUSIVE = ("optimal", "infeasible")
+POLL_INTERVAL = 0.05  # Seconds between checks of the running contenders
+
+
+def _contend(model_path, config, stop_at, result_path):
+    """
+    Solve the model file with one configuration, stopping the solver at the wall-clock time `stop_at`
+    (seconds since the epoch), and write the result to `result_path`.
+    """
+    config = config.capped(max(1.0, stop_at - time.time()))  # Start-up time is not given to the solver
+    tempfile.tempdir = os.path.dirname(result_path)  # Files of a killed solver are removed with the race
+    try:
+        result = solve_file(model_path, config=config)
+    except Exception as error:  # solver missing or crashed
+        result = {"status": "error", "objective": None, "values": {}, "message": str(error)}
+    with open(result_path + ".tmp", "w") as file:
+        json.dump(result, file)
+    os.replace(result_path + ".tmp", result_path)
+
+
+def _kill(process):
+    """
+    Kill a contender together with the solver executable it started.
+    """
+    if process.poll() is None:
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(process.pid, signal.SIGKILL)  # The contender leads its own session
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
+    process.wait()
+
+
+class SolverRace:
+    """
+    Races several solvers or solver settings on the same model file, each in its own process, within a
+    wall-clock deadline.
+
+    With `mode="first"` the race ends as soon as a contender proves optimality or infeasibility. With
+    `mode="best"` it waits for every contender. Either way it ends at the deadline. The contenders still
+    running are then killed together with their solver executables, and the best solution found is
+    kept: the lowest objective, optimal before feasible on a tie. Each contender's time limit is capped
+    at `(1 - margin) * deadline`, so that a solver stopping on time still has room to write its incumbent
+    before the hard kill. A contender is a fresh Python process that only imports FileSolver, so it starts
+    in a fraction of a second.
+    """
+    def __init__(self, configs, deadline, mode="first", margin=0.1):
+        """
+        Initialize a SolverRace object.
+
+        Parameters:
+        - configs: List of SolverConfig objects with solver name "glpk", "cbc" or "highs".
+        - deadline: Wall-clock bound of the race in seconds.
+        - mode: "first" or "best".
+        - margin: Share of the deadline kept free between the solver time limits and the hard kill.
+        """
+        if mode not in ("first", "best"):
+            raise ValueError("mode must be 'first' or 'best'")
+        if not configs:
+            raise ValueError("The race needs at least one solver configuration")
+        if deadline <= 0:
+            raise ValueError("The deadline must be positive")
+        self.configs = configs
+        self.deadline = deadline
+        self.mode = mode
+        self.margin = margin
+        self.entries = []
+
+    @staticmethod
+    def _better(result, best):
+        if not result["values"] or result["objective"] is None:
+            return False
+        if best is None:
+            return True
+        if result["objective"] != best["objective"]:
+            return result["objective"] < best["objective"]
+        return result["status"] == "optimal" and best["status"] != "optimal"
+
+    def run(self, model_path):
+        """
+        Race the configurations on a model file.
+
+        Parameters:
+        - model_path: LP or MPS file, e.g. written by StreamingModel.
+
+        Returns:
+        - Result dictionary of the winning contender as returned by `FileSolver.solve_file`, with the
+          keys `solver` (the configuration name) and `seconds` added; status "infeasible" if a contender
+          proved infeasibility, otherwise "no solution" without any solution within the deadline. One
+          entry per contender (name, status, objective, seconds, with status "killed" for the
+          contenders stopped by the race) is kept in `self.entries`.
+        """
+        start = time.monotonic()
+        stop_at = time.time() + (1 - self.margin) * self.deadline
+        directory = tempfile.mkdtemp(prefix="solver-race-")
+        processes, pending = [], set()
+        self.entries = [{"solver": config.name, "status": "killed", "objective": None, "seconds": None}
+                        for config in self.configs]
+        best, proof = None, None
+        try:
+            for position, config in enumerate(self.configs):
+                result_path = os.path.join(directory, f"result-{position}.json")
+                command = [sys.executable, os.path.abspath(__file__), os.path.abspath(model_path),
+                           json.dumps(config.to_dict()), repr(stop_at), result_path]
+                processes.append((subprocess.Popen(command, start_new_session=True), result_path))
+                pending.add(position)
+
+            while pending:
+                remaining = start + self.deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                finished = [position for position in pending if processes[position][0].poll() is not None]
+                if not finished:
+                    time.sleep(min(POLL_INTERVAL, remaining))
+                    continue
+                for position in finished:
+                    pending.discard(position)
+                    result_path = processes[position][1]
+                    if os.path.exists(result_path):
+                        with open(result_path) as file:
+                            result = json.load(file)
+                    else:
+                        result = {"status": "error", "objective": None, "values": {}}
+                    result["solver"] = self.configs[position].name
+                    result["seconds"] = time.monotonic() - start
+                    self.entries[position].update({key: result[key] for key in ("status", "objective", "seconds")})
+                    if self._better(result, best):
+                        best = result
+                    if result["status"] == "infeasible" and proof is None:
+                        proof = result
+                if self.mode == "first" and any(entry["status"] in CONCLUSIVE for entry in self.entries):
+                    break
+        finally:
+            for process, _ in processes:
+                _kill(process)
+            shutil.rmtree(directory, ignore_errors=True)
+
+        if best is None:
+            best = proof or {"status": "no solution", "objective": None, "values": {}, "solver": None,
+                             "seconds": time.monotonic() - start}
+        for entry in self.entries:
+            print(f"{entry['solver']}: {entry['status']}"
+                  + (f", objective {entry['objective']}" if entry["objective"] is not None else "")
+                  + (f" after {entry['seconds']:.1f} s" if entry["seconds"] is not None else ""))
+        return best
+
+
+if __name__ == "__main__":
+    # Contender started by SolverRace.run: model file, configuration as JSON, stop time, result file
+    _contend(sys.argv[1], SolverConfig.from_dict(json.loads(sys.argv[2])), float(sys.argv[3]), sys.argv[4])
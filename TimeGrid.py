@@ -0,0 +1,69 @@
+import math
+
+
+class TimeGrid:
+    """
+    Discretization of the planning horizon into slots for the charging and refueling variables.
+
+    The horizon and the trip times are in hours; `slot_length` sets the resolution (1.0 for the hourly
+    slots used so far, 1 / 12 for 5 minutes). With `event_based=False` every bus gets a charge or refuel
+    variable in every slot. With `event_based=True` a bus only gets variables in the slots where it can
+    actually be idle at the depot: the start of the day and the slots in which the trips it can serve
+    end. The model size then follows the number of trip events rather than the number of slots, which
+    keeps fine resolutions affordable.
+    """
+    def __init__(self, horizon=24, slot_length=1.0, event_based=False):
+        """
+        Initialize a TimeGrid object.
+
+        Parameters:
+        - horizon: Length of the planning horizon in hours.
+        - slot_length: Length of a slot in hours.
+        - event_based: Only create variables in the candidate idle slots of each bus.
+        """
+        if slot_length <= 0 or horizon <= 0:
+            raise ValueError("The horizon and the slot length must be positive")
+        self.horizon = horizon
+        self.slot_length = slot_length
+        self.event_based = event_based
+        self.num_slots = max(1, math.ceil(horizon / slot_length - 1e-9))
+
+    def slots(self):
+        """
+        All slot indices of the horizon.
+        """
+        return range(self.num_slots)
+
+    def slot_at(self, time):
+        """
+        Slot holding a time given in hours; times outside the horizon go to the first or last slot.
+        """
+        return min(max(0, math.floor(time / self.slot_length + 1e-9)), self.num_slots - 1)
+
+    def start_of(self, time_slot):
+        """
+        Start time of a slot in hours.
+        """
+        return time_slot * self.slot_length
+
+    def candidate_slots(self, trips):
+        """
+        Slots in which a bus serving some of the given trips can be idle at the depot.
+
+        Returns:
+        - Sorted list of slot indices: all slots, or with `event_based` the first slot and the slots in
+          which the trips end.
+        """
+        if not self.event_based:
+            return list(self.slots())
+        return sorted({0} | {self.slot_at(trip.end_time) for trip in trips})
+
+    def key(self):
+        """
+        Tuple identifying the discretization, e.g. for cache keys.
+        """
+        return self.horizon, self.slot_length, self.event_based
+
+    def __str__(self):
+        kind = "event-based" if self.event_based else "full"
+        return f"TimeGrid - {self.num_slots} slots of {self.slot_length * 60:g} min over {self.horizon} h, {kind}"
@@ -2,6 +2,8 @@ class Trip:
     """
     Represents a specific trip in the schedule.
     """
+    __slots__ = ("trip_id", "start_time", "end_time", "distance", "demand", "origin", "destination")
+
     def __init__(self, trip_id, start_time, end_time, distance, demand, origin, destination):
         """
         Initialize a Trip object.
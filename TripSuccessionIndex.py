@@ -0,0 +1,84 @@
+from bisect import bisect_left, bisect_right
+
+
+class TripSuccessionIndex:
+    """
+    Index of feasible trip successions. A trip `n` can follow a trip `t` on the same bus when
+    `t.end_time <= n.start_time`. Trips are sorted by start time once and the first successor of each
+    trip is found by bisection, so the successors of a trip are a contiguous, time-ordered slice. The
+    trips are also sorted by end time, so the predecessors of a trip are a slice as well.
+    """
+    def __init__(self, trips, max_successors=None):
+        """
+        Initialize a TripSuccessionIndex object.
+
+        Parameters:
+        - trips: List of Trip objects.
+        - max_successors: Optional cap K; only the K successors starting soonest are kept per trip.
+        """
+        self.max_successors = max_successors
+        self.sorted_trips = sorted(trips, key=lambda trip: (trip.start_time, trip.end_time))
+        self.start_times = [trip.start_time for trip in self.sorted_trips]
+        self.trips_by_id = {trip.trip_id: trip for trip in trips}
+        # Position of the first trip starting at or after each trip's end time
+        self._first_successor = {
+            trip.trip_id: bisect_left(self.start_times, trip.end_time) for trip in trips
+        }
+        self._by_end = sorted(trips, key=lambda trip: trip.end_time)
+        self._end_times = [trip.end_time for trip in self._by_end]
+
+    def successors(self, trip_id):
+        """
+        Return the feasible successors of a trip in order of start time.
+
+        Parameters:
+        - trip_id: ID of the trip.
+
+        Returns:
+        - List of Trip objects that can be served after the trip, at most `max_successors` long.
+        """
+        first = self._first_successor[trip_id]
+        if self.max_successors is None:
+            candidates = self.sorted_trips[first:]
+        else:
+            # One extra slot in case the trip itself shows up (zero-duration trips)
+            candidates = self.sorted_trips[first:first + self.max_successors + 1]
+        successors = [trip for trip in candidates if trip.trip_id != trip_id]
+        if self.max_successors is not None:
+            successors = successors[:self.max_successors]
+        return successors
+
+    def predecessors(self, trip_id):
+        """
+        Return the trips a trip can follow: the trips `t` such that (t, trip) is one of the `pairs`.
+
+        Parameters:
+        - trip_id: ID of the trip.
+
+        Returns:
+        - List of Trip objects ending before the trip starts, in order of end time.
+        """
+        trip = self.trips_by_id[trip_id]
+        candidates = self._by_end[:bisect_right(self._end_times, trip.start_time)]
+        predecessors = [other for other in candidates if other.trip_id != trip_id]
+        if self.max_successors is not None:
+            predecessors = [other for other in predecessors
+                            if any(successor is trip for successor in self.successors(other.trip_id))]
+        return predecessors
+
+    def pairs(self):
+        """
+        Iterate over all feasible (trip, next_trip) pairs, ordered by the start time of the first trip.
+
+        Yields:
+        - Tuples of Trip objects (trip, next_trip).
+        """
+        for trip in self.sorted_trips:
+            for next_trip in self.successors(trip.trip_id):
+                yield trip, next_trip
+
+    def __len__(self):
+        """
+        Number of trips in the index.
+        """
+        return len(self.sorted_trips)
@@ -0,0 +1,175 @@
+import numpy as np
+
+
+def numeric_column(values):
+    """
+    NumPy column of the given values, keeping integer values as integers.
+    """
+    column = np.asarray(values)
+    return column if column.dtype.kind in "iuf" else column.astype(np.float64)
+
+
+class TripView:
+    """
+    Read-only view of one row of a TripTable with the attributes and methods of a Trip object.
+    """
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @property
+    def trip_id(self):
+        return str(self.table.trip_ids[self.index])
+
+    @property
+    def start_time(self):
+        return self.table.start_time[self.index].item()
+
+    @property
+    def end_time(self):
+        return self.table.end_time[self.index].item()
+
+    @property
+    def distance(self):
+        return self.table.distance[self.index].item()
+
+    @property
+    def demand(self):
+        return self.table.demand[self.index].item()
+
+    @property
+    def origin(self):
+        return self.table.locations[self.table.origin[self.index]]
+
+    @property
+    def destination(self):
+        return self.table.locations[self.table.destination[self.index]]
+
+    def duration(self):
+        """
+        Duration of the trip as the difference between end time and start time.
+        """
+        return self.end_time - self.start_time
+
+    def __str__(self):
+        return (f"Trip {self.trip_id} - From {self.origin} to {self.destination}, "
+                f"Start: {self.start_time}, End: {self.end_time}, Distance: {self.distance}, Demand: {self.demand}")
+
+
+class TripTable:
+    """
+    Struct-of-arrays storage of a trip list: one NumPy column per attribute instead of one object per trip.
+
+    Locations are stored once in `locations` and referenced by integer codes. Rows are read as TripView
+    objects (`table[i]`, iteration) or converted back with `to_objects`; vectorized code works on the
+    columns directly.
+    """
+    def __init__(self, trip_ids, start_time, end_time, distance, demand, origin, destination):
+        """
+        Initialize a TripTable object from column sequences of equal length.
+
+        Parameters:
+        - trip_ids: Unique trip identifiers.
+        - start_time, end_time: Start and end times of the trips.
+        - distance: Distances of the trips.
+        - demand: Passenger demands of the trips.
+        - origin, destination: Start and end locations of the trips.
+        """
+        self.trip_ids = np.asarray(trip_ids, dtype=str)
+        self.start_time = numeric_column(start_time)
+        self.end_time = numeric_column(end_time)
+        self.distance = numeric_column(distance)
+        self.demand = numeric_column(demand)
+        locations, codes = np.unique(np.concatenate([np.asarray(origin, dtype=str),
+                                                     np.asarray(destination, dtype=str)]), return_inverse=True)
+        self.locations = [str(location) for location in locations]
+        codes = codes.astype(np.int32)
+        self.origin, self.destination = codes[:len(self.trip_ids)], codes[len(self.trip_ids):]
+        self._positions = None
+
+    @classmethod
+    def from_objects(cls, trips):
+        """
+        Build a TripTable from a list of Trip objects.
+        """
+        return cls([trip.trip_id for trip in trips], [trip.start_time for trip in trips],
+                   [trip.end_time for trip in trips], [trip.distance for trip in trips],
+                   [trip.demand for trip in trips], [trip.origin for trip in trips],
+                   [trip.destination for trip in trips])
+
+    @classmethod
+    def from_arrays(cls, trip_ids, start_time, end_time, distance, demand, origin, destination, locations):
+        """
+        Build a TripTable directly on existing columns, without copying them (e.g. memory-mapped arrays).
+
+        Parameters:
+        - trip_ids, start_time, end_time, distance, demand: Columns as stored in a TripTable.
+        - origin, destination: Integer location codes into `locations`.
+        - locations: List of location names.
+        """
+        table = cls.__new__(cls)
+        table.trip_ids = trip_ids
+        table.start_time = start_time
+        table.end_time = end_time
+        table.distance = distance
+        table.demand = demand
+        table.origin = origin
+        table.destination = destination
+        table.locations = list(locations)
+        table._positions = None
+        return table
+
+    def to_objects(self):
+        """
+        Convert the table to a list of Trip objects.
+        """
+        from Trip import Trip
+        locations = self.locations
+        return [Trip(trip_id, start_time, end_time, distance, demand, locations[origin], locations[destination])
+                for trip_id, start_time, end_time, distance, demand, origin, destination
+                in zip(self.trip_ids.tolist(), self.start_time.tolist(), self.end_time.tolist(),
+                       self.distance.tolist(), self.demand.tolist(), self.origin.tolist(),
+                       self.destination.tolist())]
+
+    def position(self, trip_id):
+        """
+        Row index of a trip.
+
+        Raises:
+        - KeyError if the trip is unknown.
+        """
+        if self._positions is None:
+            self._positions = {str(trip_id): index for index, trip_id in enumerate(self.trip_ids)}
+        return self._positions[trip_id]
+
+    def fits_time_window(self, num_time_slots):
+        """
+        Boolean mask of the trips inside the planning horizon [0, num_time_slots].
+        """
+        return (self.start_time >= 0) & (self.end_time <= num_time_slots)
+
+    def start_order(self):
+        """
+        Row indices sorted by (start_time, end_time).
+        """
+        return np.lexsort((self.end_time, self.start_time))
+
+    def nbytes(self):
+        """
+        Memory held by the columns, in bytes.
+        """
+        return sum(column.nbytes for column in (self.trip_ids, self.start_time, self.end_time, self.distance,
+                                                 self.demand, self.origin, self.destination))
+
+    def __len__(self):
+        return len(self.trip_ids)
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError("trip index out of range")
+        return TripView(self, index % len(self))
+
+    def __iter__(self):
+        return (TripView(self, index) for index in range(len(self)))
@@ -0,0 +1,84 @@
+"""
+Benchmark of entity lookups while building the energy management rows.
+
+Compares the old per-row `next(...)` scans over the bus and trip lists with the shared FleetRegistry,
+for the (bus, trip) index set of the electric energy management constraint.
+
+Usage:
+    python benchmarks/registry_benchmark.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Bus.electricBus import ElectricBus
+from Trip import Trip
+from FleetRegistry import FleetRegistry
+
+SIZES = [(10, 50), (20, 100), (40, 200), (80, 400)]  # (electric buses, trips)
+
+
+def make_instance(num_buses, num_trips, seed=0):
+    """
+    Generate a small random fleet and trip list.
+    """
+    rng = random.Random(seed)
+    buses = [ElectricBus(f"E{i+1}", rng.randint(30, 60), round(rng.uniform(0.15, 0.3), 2),
+                         rng.randint(100, 200), rng.randint(10, 20)) for i in range(num_buses)]
+    trips = []
+    for i in range(num_trips):
+        start = rng.randint(6, 22)
+        trips.append(Trip(f"T{i+1}", start, start + rng.randint(1, 2), rng.randint(10, 50),
+                          rng.randint(20, 60), "Location1", "Location2"))
+    return buses, trips
+
+
+def build_rows_with_scans(buses, trips, index):
+    """
+    Build the row data the way the constraints used to: one linear scan per lookup.
+    """
+    rows = []
+    for bus_id, trip_id in index:
+        bus = next(e for e in buses if e.bus_id == bus_id)
+        trip = next(t for t in trips if t.trip_id == trip_id)
+        rows.append((bus.remaining_range, trip.distance * bus.consumption_rate))
+    return rows
+
+
+def build_rows_with_registry(buses, trips, index):
+    """
+    Build the same row data through a FleetRegistry built once.
+    """
+    registry = FleetRegistry(buses, [], trips, [])
+    rows = []
+    for bus_id, trip_id in index:
+        bus = registry.electric_bus(bus_id)
+        trip = registry.trip(trip_id)
+        rows.append((bus.remaining_range, trip.distance * bus.consumption_rate))
+    return rows
+
+
+def main():
+    print(f"{'buses':>6} {'trips':>6} {'rows':>8} {'scan (s)':>10} {'registry (s)':>13} {'speedup':>8}")
+    for num_buses, num_trips in SIZES:
+        buses, trips = make_instance(num_buses, num_trips)
+        index = [(e.bus_id, t.trip_id) for e in buses for t in trips]
+
+        start = time.perf_counter()
+        scanned = build_rows_with_scans(buses, trips, index)
+        scan_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        registered = build_rows_with_registry(buses, trips, index)
+        registry_time = time.perf_counter() - start
+
+        assert scanned == registered
+        print(f"{num_buses:>6} {num_trips:>6} {len(index):>8} {scan_time:>10.4f} {registry_time:>13.4f} "
+              f"{scan_time / registry_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
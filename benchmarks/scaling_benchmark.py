@@ -0,0 +1,152 @@
+"""
+Scaling benchmark of the compact MILP.
+
+Generates seeded instances over a size sweep and profiles each phase of the model with
+`RoutingProblem(profile=True)`: variable definition, the `apply` of every constraint, the objective, the
+solve and the solution extraction, each with its wall time, peak memory, rows and nonzeros. The instance
+generation is timed as well. Results are written as JSON, one record per size, so runs can be compared
+across commits, formulations (`--dense`) and solvers (`--solver`) on identical instances.
+
+Usage:
+    python benchmarks/scaling_benchmark.py
+    python benchmarks/scaling_benchmark.py --sizes 10,30,100,5 50,150,500,10 --solver cbc --output scaling.json
+    python benchmarks/scaling_benchmark.py --no-solve
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from InstanceGenerator import generate_instance
+from RoutingProblem import RoutingProblem
+from SolverConfig import SolverConfig
+from TimeGrid import TimeGrid
+from Constraints.chargeSchedulingConstraint import ChargerSchedulingConstraint
+from Constraints.chargingCapacityConstraint import ChargingCapacityConstraint
+from Constraints.depotConstraint import DepotReturnConstraint
+from Constraints.dieselRefuelCapacityConstraint import DieselRefuelCapacityConstraint
+from Constraints.energyManagementDieselBusConstraint import EnergyManagementDieselConstraint
+from Constraints.energyManagementElectricBusConstraint import EnergyManagementElectricConstraint
+from Constraints.fleetSizeConstraints import FleetSizeConstraint
+from Constraints.tripCompletionConstraints import TripCompletionConstraint
+
+# (electric buses, diesel buses, trips, chargers)
+SIZES = [(5, 15, 50, 2), (10, 30, 100, 5), (25, 75, 250, 10), (50, 150, 500, 20)]
+
+
+def make_constraints():
+    """
+    The constraint set of main.py.
+    """
+    return [
+        TripCompletionConstraint(),
+        FleetSizeConstraint(),
+        EnergyManagementElectricConstraint(),
+        ChargingCapacityConstraint(),
+        DieselRefuelCapacityConstraint(),
+        EnergyManagementDieselConstraint(),
+        ChargerSchedulingConstraint(),
+        DepotReturnConstraint()
+    ]
+
+
+def run(size, seed, time_slots, num_locations, sparse, solver_name, time_limit):
+    """
+    Build (and optionally solve) one instance, profiling every phase with the RoutingProblem profiler.
+
+    Returns:
+    - Dictionary describing the instance, the model size, the instance generation time and the
+      profile of the build and solve phases (see ModelProfiler.report).
+    """
+    num_electric, num_diesel, num_trips, num_chargers = size
+    start = time.perf_counter()
+    electric_buses, diesel_buses, trips, chargers, depot = generate_instance(
+        num_electric, num_diesel, num_trips, num_chargers, time_slots=time_slots, num_locations=num_locations,
+        seed=seed
+    )
+    create_objects = time.perf_counter() - start
+
+    problem = RoutingProblem(electric_buses, diesel_buses, trips, depot, make_constraints(), sparse=sparse,
+                             profile=True, time_grid=TimeGrid(time_slots))
+
+    record = {
+        "electric_buses": num_electric,
+        "diesel_buses": num_diesel,
+        "trips": num_trips,
+        "chargers": num_chargers,
+        "time_slots": time_slots,
+        "locations": num_locations,
+        "seed": seed,
+        "sparse": sparse,
+        "variables": problem.model.nvariables(),
+        "constraints": problem.model.nconstraints(),
+        "solver": solver_name,
+        "create_objects": create_objects,
+    }
+
+    if solver_name is not None:
+        try:
+            solver = SolverConfig(solver_name, time_limit=time_limit).create()
+            results = problem._measure("solve", solver.solve, problem.model, load_solutions=False)
+            record["termination"] = str(results.solver.termination_condition)
+            if len(results.solution) > 0:
+                problem.model.solutions.load_from(results)
+                assignment = problem._measure("extract_solution", problem.extract_assignment)
+                record["assigned_trips"] = sum(len(trip_ids) for bus_type in assignment.values()
+                                               for trip_ids in bus_type.values())
+        except Exception as error:  # solver missing or crashed
+            record["termination"] = f"error: {error}"
+
+    record["phases"] = problem.profile_report()
+    record["total"] = create_objects + sum(phase["seconds"] for phase in record["phases"])
+    return record
+
+
+def parse_size(text):
+    """
+    Parse "electric,diesel,trips,chargers".
+    """
+    values = tuple(int(value) for value in text.split(","))
+    if len(values) != 4:
+        raise argparse.ArgumentTypeError("a size is electric,diesel,trips,chargers")
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=parse_size, nargs="+", default=SIZES,
+                        help="instance sizes as electric,diesel,trips,chargers")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-slots", type=int, default=RoutingProblem.NUM_TIME_SLOTS)
+    parser.add_argument("--locations", type=int, default=10)
+    parser.add_argument("--dense", action="store_true", help="create all bus-trip variables")
+    parser.add_argument("--solver", default="glpk")
+    parser.add_argument("--no-solve", action="store_true", help="only build the models")
+    parser.add_argument("--time-limit", type=float, default=None, help="solver time limit in seconds")
+    parser.add_argument("--output", default=None, help="JSON file (default: standard output)")
+    args = parser.parse_args()
+
+    records = []
+    for size in args.sizes:
+        # The model building progress messages go to stderr so stdout only holds the JSON report
+        with contextlib.redirect_stdout(sys.stderr):
+            record = run(size, args.seed, args.time_slots, args.locations, not args.dense,
+                         None if args.no_solve else args.solver, args.time_limit)
+        records.append(record)
+        print(f"{size}: {record['variables']} variables, {record['constraints']} constraints, "
+              f"{record['total']:.3f} s", file=sys.stderr)
+
+    report = json.dumps(records, indent=2)
+    if args.output is None:
+        print(report)
+    else:
+        with open(args.output, "w") as file:
+            file.write(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from Charger import Charger
+from ChargerBooking import ChargerBooking
+
+
+def scan(chargers, start, num_slots, latest_start=None, horizon=None):
+    """
+    Earliest session found by scanning every charger's schedule, slot after slot.
+    """
+    slot = max(0, start)
+    last = max([slot] + [time_slot for charger in chargers for time_slot in charger.schedule]) + num_slots
+    while slot <= last:
+        if (latest_start is not None and slot > latest_start) or (horizon is not None and slot + num_slots > horizon):
+            return None
+        for charger in chargers:
+            if all(charger.is_available(time_slot) for time_slot in range(slot, slot + num_slots)):
+                return charger, slot
+        slot += 1
+    return None
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("horizon", [None, 30])
+def test_booking_agrees_with_schedule_scan(seed, horizon):
+    rng = random.Random(seed)
+    chargers = [Charger(f"C{i + 1}", 10) for i in range(4)]
+    booking = ChargerBooking(chargers, horizon=horizon)
+
+    for step in range(300):
+        start, num_slots = rng.randint(0, 24), rng.randint(1, 4)
+        latest_start = start + rng.randint(0, 6) if rng.random() < 0.3 else None
+        assert booking.earliest(start, num_slots, latest_start) == scan(chargers, start, num_slots, latest_start,
+                                                                        horizon)
+
+        action = rng.random()
+        if action < 0.6:
+            expected = scan(chargers, start, num_slots, latest_start, horizon)
+            if expected is None:
+                with pytest.raises(ValueError):
+                    booking.book(f"B{step}", start, num_slots, latest_start)
+            else:
+                assert booking.book(f"B{step}", start, num_slots, latest_start) == expected
+        elif action < 0.8 and booking.sessions:
+            booking.release(rng.choice(sorted(booking.sessions)))
+        elif action < 0.9 and booking.sessions:
+            bus_id = rng.choice(sorted(booking.sessions))
+            old_start = booking.sessions[bus_id][0][1]
+            try:
+                booking.reschedule(bus_id, old_start, start)
+            except ValueError:
+                pass
+        else:
+            # A booking made on a charger directly, which the engine only sees after refresh
+            charger, time_slot = rng.choice(chargers), rng.randint(0, 28)
+            if charger.is_available(time_slot):
+                charger.schedule_charging("X", time_slot)
+                booking.refresh()
+
+        # Every session is mirrored slot by slot in the charger schedules, and nothing else is
+        booked = {(charger_id, time_slot): bus_id for charger_id, charger in enumerate(chargers)
+                  for time_slot, bus_id in charger.schedule.items()}
+        sessions = {(position, time_slot): bus_id for bus_id, entries in booking.sessions.items()
+                    for position, slot, length in entries for time_slot in range(slot, slot + length)}
+        assert sessions == booked
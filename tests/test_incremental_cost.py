@@ -0,0 +1,63 @@
+import random
+
+import numpy as np
+import pytest
+
+import SimulationAnnealing
+from SimulationAnnealing import IncrementalCost, VectorizedCost, calculate_cost
+
+
+@pytest.fixture
+def instance(monkeypatch):
+    """
+    Random instance in the module globals read by `calculate_cost`. Each route has at most one station of
+    each type, so the station draws of `calculate_cost` and IncrementalCost agree.
+    """
+    rng = random.Random(7)
+    routes = [f"R{i + 1}" for i in range(12)]
+    buses = ["BEB1", "BEB2", "BEB3", "FCEB1", "FCEB2", "DB1"]
+    opp_stations, refuel_stations = ["OC1", "OC2"], ["RS1", "RS2", "RS3"]
+    values = {
+        "routes": routes,
+        "buses": buses,
+        "energy_capacity": {bus: rng.randint(60, 220) for bus in buses},
+        "energy_consumption": {route: rng.randint(20, 120) for route in routes},
+        "charging_capacity": 2,
+        "opportunity_charging_capacity": 2,
+        "opportunity_charging_stations": opp_stations,
+        "refueling_stations": refuel_stations,
+        "refueling_station_capacity": {station: 1 for station in refuel_stations},
+        "route_to_opportunity_chargers": {route: rng.sample(opp_stations, rng.randint(0, 1)) for route in routes},
+        "route_to_refueling_stations": {route: rng.sample(refuel_stations, rng.randint(0, 1)) for route in routes},
+    }
+    for name, value in values.items():
+        monkeypatch.setattr(SimulationAnnealing, name, value)
+    evaluator = VectorizedCost(routes, buses, values["energy_capacity"], values["energy_consumption"],
+                               values["charging_capacity"], opp_stations, values["opportunity_charging_capacity"],
+                               values["route_to_opportunity_chargers"], refuel_stations,
+                               values["refueling_station_capacity"], values["route_to_refueling_stations"],
+                               rng=np.random.default_rng(0))
+    return evaluator
+
+
+def test_totals_match_calculate_cost_over_random_moves(instance):
+    rng = np.random.default_rng(1)
+    num_routes, num_buses = len(instance.routes), len(instance.buses)
+    cost = IncrementalCost(instance, rng.integers(0, num_buses, size=num_routes), rng=rng)
+    assert cost.total() == pytest.approx(calculate_cost(instance.decode(cost.assign)))
+
+    for _ in range(500):
+        before = cost.total()
+        if rng.random() < 0.3:
+            route_a, route_b = rng.choice(num_routes, size=2, replace=False)
+            delta = cost.swap(int(route_a), int(route_b))
+        else:
+            delta = cost.reassign(int(rng.integers(0, num_routes)), int(rng.integers(0, num_buses)))
+        assert before + delta == pytest.approx(calculate_cost(instance.decode(cost.assign)))
+
+        if rng.random() < 0.5:
+            cost.commit()
+        else:
+            cost.rollback()
+            assert cost.total() == pytest.approx(before)
+        assert cost.total() == pytest.approx(calculate_cost(instance.decode(cost.assign)))
@@ -0,0 +1,83 @@
+import re
+from collections import Counter
+
+import pytest
+from pyomo.environ import Constraint as PyomoConstraint
+from pyomo.repn import generate_standard_repn
+
+from InstanceGenerator import generate_instance
+from LPWriter import StreamingModel
+from RoutingProblem import RoutingProblem
+from Constraints.chargeSchedulingConstraint import ChargerSchedulingConstraint
+from Constraints.chargingCapacityConstraint import ChargingCapacityConstraint
+from Constraints.depotConstraint import DepotReturnConstraint
+from Constraints.dieselRefuelCapacityConstraint import DieselRefuelCapacityConstraint
+from Constraints.energyManagementDieselBusConstraint import EnergyManagementDieselConstraint
+from Constraints.energyManagementElectricBusConstraint import EnergyManagementElectricConstraint
+from Constraints.fleetSizeConstraints import FleetSizeConstraint
+from Constraints.tripCompletionConstraints import TripCompletionConstraint
+
+
+def canonical(terms, sense, rhs):
+    """
+    Row as a hashable key, scaled so that equal rows compare equal: ">=" rows are turned into "<=" rows
+    and "=" rows start with a positive coefficient.
+    """
+    terms = sorted((name, coefficient) for name, coefficient in terms if coefficient != 0)
+    sign = -1 if sense == ">=" or (sense == "=" and terms and terms[0][1] < 0) else 1
+    return (tuple((name, round(sign * coefficient, 9)) for name, coefficient in terms),
+            "=" if sense == "=" else "<=", round(sign * rhs, 9))
+
+
+def pyomo_rows(model):
+    rows = Counter()
+    for constraint in model.component_data_objects(PyomoConstraint, active=True):
+        repn = generate_standard_repn(constraint.body)
+        terms = [((var.parent_component().local_name, var.index()), coefficient)
+                 for var, coefficient in zip(repn.linear_vars, repn.linear_coefs)]
+        if not any(coefficient != 0 for _, coefficient in terms):
+            continue
+        if constraint.equality:
+            rows[canonical(terms, "=", constraint.ub - repn.constant)] += 1
+            continue
+        if constraint.lb is not None:
+            rows[canonical(terms, ">=", constraint.lb - repn.constant)] += 1
+        if constraint.ub is not None:
+            rows[canonical(terms, "<=", constraint.ub - repn.constant)] += 1
+    return rows
+
+
+def lp_rows(path, index):
+    names = {}
+    for block in ("x_e", "x_d", "charge", "refuel", "z_e", "z_d"):
+        for key, column in getattr(index, block).items():
+            names[f"x{column}"] = (block, key)
+    text = open(path).read()
+    body = text[text.index("Subject To\n") + len("Subject To\n"):text.index("Binaries\n")]
+    rows = Counter()
+    for row in re.split(r"\n(?= r\d+:)", body.strip("\n")):
+        tokens = row.split(":", 1)[1].split()
+        sense, rhs = tokens[-2], float(tokens[-1])
+        terms = [(names[tokens[i + 1]], float(tokens[i])) for i in range(0, len(tokens) - 2, 2)]
+        rows[canonical(terms, sense, rhs)] += 1
+    return rows
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_streamed_lp_rows_match_pyomo_model(tmp_path, seed):
+    electric_buses, diesel_buses, trips, chargers, depot = generate_instance(6, 4, 25, 2, seed=seed)
+    for bus in electric_buses[::2]:
+        bus.remaining_range = 40 * bus.consumption_rate  # Some charge scheduling rows bind, others do not
+    chargers[0].schedule_charging("X", 12)
+    constraints = [TripCompletionConstraint(), FleetSizeConstraint(), EnergyManagementElectricConstraint(),
+                   ChargingCapacityConstraint(), DieselRefuelCapacityConstraint(),
+                   EnergyManagementDieselConstraint(), ChargerSchedulingConstraint(), DepotReturnConstraint()]
+    problem = RoutingProblem(electric_buses, diesel_buses, trips, depot, constraints, sparse=True)
+
+    streaming = StreamingModel(problem)
+    row_counts = streaming.write_lp(tmp_path / "model.lp")
+
+    expected = pyomo_rows(problem.model)
+    assert row_counts["ChargerSchedulingConstraint"] > 0
+    assert sum(row_counts.values()) == sum(expected.values())
+    assert lp_rows(tmp_path / "model.lp", streaming.index) == expected